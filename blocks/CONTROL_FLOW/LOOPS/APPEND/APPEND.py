@@ -1,30 +1,74 @@
-from numpy import append
-from flojoy import flojoy, OrderedPair, Matrix, DataFrame, Vector, Scalar
-
-
-@flojoy
+import numpy as np
+from pandas import DataFrame as PandasDataFrame
+from flojoy import (
+    flojoy,
+    DefaultParams,
+    OrderedPair,
+    OrderedTriple,
+    Matrix,
+    DataFrame,
+    Vector,
+    Scalar,
+    SmallMemory,
+    Stream,
+    StreamBuffer,
+)
+
+memory_key = "append-buffer"
+
+
+@flojoy(inject_node_metadata=True)
 def APPEND(
-    primary_dp: OrderedPair | Matrix | DataFrame | Scalar | Vector | None,
-    secondary_dp: OrderedPair | Matrix | DataFrame | Scalar | Vector,
-) -> OrderedPair | Matrix | DataFrame | Vector | Scalar:
+    default_params: DefaultParams,
+    primary_dp: OrderedPair | Matrix | DataFrame | Scalar | Vector | Stream | None,
+    secondary_dp: OrderedPair | OrderedTriple | Matrix | DataFrame | Scalar | Vector,
+    stream: bool = False,
+    max_length: int = 0,
+) -> OrderedPair | Matrix | DataFrame | Vector | Scalar | Stream:
     """Append a single data point to an array.
 
     The large array must be passed to the bottom "array" connection.
 
     For ordered pair, the single point must have a shape of 1 (or (1,)).
 
+    The points are appended to a buffer kept by the block whose capacity
+    doubles when full, and the output holds views on it: appending costs
+    the same whatever the number of points already appended, as long as
+    the output of the block is connected back to its "primary_dp" input.
+
+    Appending to a Stream costs the same at every iteration, instead of
+    growing with the number of points already appended: use it for long
+    acquisitions.
+
     Parameters
     ----------
-    primary_dp : OrderedPair|Vector|Scalar|Matrix|DataFrame|None
+    primary_dp : OrderedPair|Vector|Scalar|Matrix|DataFrame|Stream|None
         Input that ends up "on top" of the resulting DataContainer.
-    secondary_dp : OrderedPair|Vector|Scalar|Matrix|DataFrame
+    secondary_dp : OrderedPair|OrderedTriple|Vector|Scalar|Matrix|DataFrame
         Input that ends up "on the bottom" of the resulting DataContainer.
+    stream : bool
+        Start a Stream during the first loop instead of returning the input.
+    max_length : int
+        Maximum number of points kept in the Stream, the oldest ones are
+        dropped; 0 keeps all of them.
 
     Returns
     -------
-    OrderedPair, Matrix, DataFrame, Vector
+    OrderedPair, Matrix, DataFrame, Vector, Stream
     """
 
+    if isinstance(primary_dp, Stream):
+        primary_dp.append_container(secondary_dp)
+        return primary_dp
+
+    if primary_dp is None and stream:
+        buffer = StreamBuffer(maxlen=max_length if max_length > 0 else None)
+        result = Stream(stream=buffer)
+        result.append_container(secondary_dp)
+        return result
+
+    node_id = default_params.node_id
+
     if isinstance(primary_dp, OrderedPair) and isinstance(secondary_dp, OrderedPair):
         x0 = primary_dp.x
         y0 = primary_dp.y
@@ -41,42 +85,39 @@ def APPEND(
                 )
             )
 
-        x = append(x0, x1)
-        y = append(y0, y1)
-        return OrderedPair(x=x, y=y)
+        columns = accumulate(node_id, {"x": x0, "y": y0}, {"x": x1, "y": y1})
+        return OrderedPair(x=columns["x"], y=columns["y"])
 
     elif isinstance(primary_dp, Matrix) and isinstance(secondary_dp, Matrix):
-        m0 = primary_dp.m
-        m1 = secondary_dp.m
-
-        m = append(m0, m1, axis=0)
-        return Matrix(m=m)
+        columns = accumulate(node_id, {"m": primary_dp.m}, {"m": secondary_dp.m})
+        return Matrix(m=columns["m"])
 
     elif isinstance(primary_dp, Vector) and isinstance(secondary_dp, Vector):
-        v0 = primary_dp.v
-        v1 = secondary_dp.v
-
-        v = append(v0, v1, axis=0)
-        return Vector(v=v)
+        columns = accumulate(node_id, {"v": primary_dp.v}, {"v": secondary_dp.v})
+        return Vector(v=columns["v"])
 
     elif isinstance(primary_dp, Vector) and isinstance(secondary_dp, Scalar):
-        v0 = primary_dp.v
-        v1 = secondary_dp.c
+        v1 = np.atleast_1d(secondary_dp.c)
 
-        v = append(v0, [v1], axis=0)
-        return Vector(v=v)
+        columns = accumulate(node_id, {"v": primary_dp.v}, {"v": v1})
+        return Vector(v=columns["v"])
 
     elif isinstance(primary_dp, Scalar) and isinstance(secondary_dp, Scalar):
-        c0 = primary_dp.c
-        c1 = secondary_dp.c
+        v0 = np.atleast_1d(primary_dp.c)
+        v1 = np.atleast_1d(secondary_dp.c)
 
-        v = append([c0], [c1], axis=0)
-        return Vector(v=v)
+        columns = accumulate(node_id, {"v": v0}, {"v": v1})
+        return Vector(v=columns["v"])
 
     elif isinstance(primary_dp, DataFrame) and isinstance(secondary_dp, DataFrame):
         df0 = primary_dp.m
         df1 = secondary_dp.m
-        df = df0._append(df1, ignore_index=True)
+        if not is_columnar(df0, df1):
+            df = df0._append(df1, ignore_index=True)
+            return DataFrame(df=df)
+
+        columns = accumulate(node_id, split_columns(df0), split_columns(df1))
+        df = PandasDataFrame(dict(zip(df1.columns, columns.values())), copy=False)
         return DataFrame(df=df)
 
     # When primary_dp is None during the first loop:
@@ -93,3 +134,50 @@ def APPEND(
                 f"The types passed were: {type(primary_dp)} and {type(secondary_dp)}"
             )
         )
+
+
+def accumulate(
+    node_id: str, previous: dict[str, np.ndarray], chunk: dict[str, np.ndarray]
+) -> dict[str, np.ndarray]:
+    """
+    Appends the chunk to the buffer of the block and returns views on all
+    its points. The buffer is started over from the previous points unless
+    they are the views returned by the last call.
+    """
+    memory = SmallMemory()
+    buffer: StreamBuffer | None = memory.read_memory(node_id, memory_key)
+    if (
+        buffer is None
+        or set(buffer.columns) != previous.keys()
+        or not all(is_same_view(previous[name], buffer[name]) for name in previous)
+    ):
+        buffer = StreamBuffer()
+        buffer.append(**previous)
+        memory.write_to_memory(node_id, memory_key, buffer)
+    buffer.append(**chunk)
+    return buffer.to_dict()
+
+
+def is_same_view(a: np.ndarray, b: np.ndarray) -> bool:
+    return (
+        isinstance(a, np.ndarray)
+        and a.shape == b.shape
+        and a.strides == b.strides
+        and a.dtype == b.dtype
+        and a.__array_interface__["data"][0] == b.__array_interface__["data"][0]
+    )
+
+
+def is_columnar(df0: PandasDataFrame, df1: PandasDataFrame) -> bool:
+    """Whether the columns of the DataFrames can be appended one by one"""
+    return (
+        list(df0.columns) == list(df1.columns)
+        and df1.columns.is_unique
+        and all(isinstance(dtype, np.dtype) for dtype in df0.dtypes)
+        and all(isinstance(dtype, np.dtype) for dtype in df1.dtypes)
+    )
+
+
+def split_columns(df: PandasDataFrame) -> dict[str, np.ndarray]:
+    # labels may not be strings, the columns are named by position
+    return {str(i): df.iloc[:, i].to_numpy() for i in range(df.shape[1])}
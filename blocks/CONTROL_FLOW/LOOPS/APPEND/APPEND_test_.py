@@ -0,0 +1,97 @@
+import numpy
+import pandas
+from flojoy import DataFrame, DefaultParams, Matrix, OrderedPair
+
+
+def default_params(node_id: str = "APPEND-test"):
+    return DefaultParams(
+        node_id=node_id, job_id=node_id, jobset_id="test", node_type="default"
+    )
+
+
+def test_APPEND(mock_flojoy_decorator):
+    # create the two ordered pair datacontainers
+    import APPEND
+
+    element_a = OrderedPair(x=numpy.linspace(0, 10, 10), y=numpy.linspace(0, 10, 10))
+
+    element_b = OrderedPair(x=numpy.linspace(11, 12, 1), y=numpy.linspace(11, 12, 1))
+
+    # node under test
+    res = APPEND.APPEND(default_params(), element_a, element_b)
+
+    # check that the correct number of elements
+    assert (len(res.y)) == 11
+    assert res.y[-1] == 11
+
+    # create the two matrix datacontainers
+    element_a = Matrix(m=numpy.ones((10, 10)))
+    element_b = Matrix(m=numpy.ones((1, 10)))
+
+    # node under test
+    res = APPEND.APPEND(default_params(), element_a, element_b)
+
+    # check that the correct number of elements
+    assert (res.m.shape) == (11, 10)
+
+    # create the two dataframe datacontainers
+    element_a = DataFrame(df=pandas.DataFrame(numpy.ones((10, 10))))
+    element_b = DataFrame(df=pandas.DataFrame(numpy.ones((1, 10))))
+
+    # node under test
+    res = APPEND.APPEND(default_params(), element_a, element_b)
+
+    # check that the correct number of elements
+    assert (res.m.shape) == (11, 10)
+
+
+def test_APPEND_stream(mock_flojoy_decorator):
+    import APPEND
+    from flojoy import Stream
+
+    res = APPEND.APPEND(
+        default_params(), None, OrderedPair(x=[0], y=[0]), stream=True, max_length=3
+    )
+    assert isinstance(res, Stream)
+
+    for i in range(1, 5):
+        assert (
+            APPEND.APPEND(default_params(), res, OrderedPair(x=[i], y=[2 * i])) is res
+        )
+
+    # only the last 3 points are kept
+    assert list(res.stream["x"]) == [2, 3, 4]
+    assert list(res.stream["y"]) == [4, 6, 8]
+
+
+def test_APPEND_reuses_its_buffer(mock_flojoy_decorator):
+    import APPEND
+
+    params = default_params("APPEND-buffer")
+    res = OrderedPair(x=[0], y=[0])
+    outputs = []
+    for i in range(1, 2000):
+        res = APPEND.APPEND(params, res, OrderedPair(x=[i], y=[i]))
+        outputs.append(res)
+
+    numpy.testing.assert_array_equal(res.y, numpy.arange(2000))
+    # the outputs are views on the same buffer, earlier ones are unchanged
+    assert numpy.shares_memory(outputs[-1].y, outputs[-2].y)
+    numpy.testing.assert_array_equal(outputs[9].y, numpy.arange(11))
+
+    # a different input starts the buffer over
+    other = APPEND.APPEND(params, OrderedPair(x=[5], y=[5]), OrderedPair(x=[6], y=[6]))
+    numpy.testing.assert_array_equal(other.y, [5, 6])
+
+    df = DataFrame(df=pandas.DataFrame({"a": [1, 2], 3: ["x", "y"]}))
+    for value in [2.5, 3.5]:
+        chunk = DataFrame(df=pandas.DataFrame({"a": [value], 3: ["z"]}))
+        df = APPEND.APPEND(params, df, chunk)
+    assert list(df.m.columns) == ["a", 3]
+    assert list(df.m["a"]) == [1, 2, 2.5, 3.5]
+    assert list(df.m[3]) == ["x", "y", "z", "z"]
+
+    # the next run of the loop starts over, even from the same values
+    res = APPEND.APPEND(params, OrderedPair(x=[0], y=[0]), OrderedPair(x=[1], y=[1]))
+    numpy.testing.assert_array_equal(res.y, [0, 1])
+    numpy.testing.assert_array_equal(outputs[-1].y, numpy.arange(2000))
@@ -1,5 +1,5 @@
 import plotly.graph_objects as go
-from flojoy import DataFrame, Matrix, OrderedPair, Plotly, Vector, flojoy
+from flojoy import DataFrame, Matrix, OrderedPair, Plotly, Stream, Vector, flojoy
 from blocks.DATA.VISUALIZATION.template import plot_layout
 from numpy import arange
 from pandas.api.types import is_datetime64_any_dtype
@@ -7,7 +7,7 @@ from pandas.api.types import is_datetime64_any_dtype
 
 @flojoy
 def LINE(
-    default: OrderedPair | DataFrame | Matrix | Vector,
+    default: OrderedPair | DataFrame | Matrix | Vector | Stream,
     xaxis_title: str = "",
     yaxis_title: str = "",
     x_log_scale: bool = False,
@@ -17,8 +17,9 @@ def LINE(
 
     Parameters
     ----------
-    default : OrderedPair|DataFrame|Matrix|Vector
-        the DataContainer to be visualized
+    default : OrderedPair|DataFrame|Matrix|Vector|Stream
+        the DataContainer to be visualized, the columns of a Stream are
+        plotted against its "x" column if it has one
     xaxis_title: str
         Choose the label for the x axis.
     yaxis_title: str
@@ -86,6 +87,11 @@ def LINE(
             y = default.v
             x = arange(len(y))
             fig.add_trace(go.Scatter(x=x, y=y, mode="lines"))
+        case Stream():
+            columns = default.stream.to_dict()
+            x = columns.pop("x", arange(len(default.stream)))
+            for name, y in columns.items():
+                fig.add_trace(go.Scatter(x=x, y=y, mode="lines", name=name))
 
     if xaxis_title != "":
         fig.update_layout(
@@ -1,7 +1,7 @@
 import os
-from flojoy.env_var import get_flojoy_cloud_url
 import pandas as pd
 from flojoy import (
+    CloudOutbox,
     DataContainer,
     flojoy,
     get_env_var,
@@ -10,6 +10,7 @@ from flojoy import (
     DataFrame,
     OrderedPair,
     OrderedTriple,
+    make_measurement_payload,
 )
 from flojoy.data_container import (
     ParametricOrderedPair,
@@ -18,7 +19,6 @@ from flojoy.data_container import (
     Surface,
     Vector,
 )
-import flojoy_cloud
 from typing import Optional
 from datetime import datetime
 
@@ -47,6 +47,10 @@ def FLOJOY_CLOUD_UPLOAD(
 
     Flojoy Cloud is still in beta, feel free to try it out and give us feedback!
 
+    The data is queued on the disk and uploaded in the background by Studio,
+    so the flowchart does not wait for the network and nothing is lost if
+    the upload fails: it is retried later.
+
     Parameters
     ----------
     default : DataContainer
@@ -75,9 +79,6 @@ def FLOJOY_CLOUD_UPLOAD(
 
     if default:
         # Only upload if the data is not empty, otherwise pass through
-        cloud = flojoy_cloud.FlojoyCloud(
-            workspace_secret=api_key, api_url=get_flojoy_cloud_url()
-        )
         data = None
         # Optimist approach, assume that the data is at a castable dimension
         if isinstance(default, DataFrame):
@@ -121,13 +122,17 @@ def FLOJOY_CLOUD_UPLOAD(
         else:
             # TODO: Add other data types as they become available
             raise TypeError(f"Unsupported data type: {type(default)}")
-        cloud.upload(
-            data=data,
-            test_id=test_id,
-            hardware_id=hardware_id,
-            name=name,
-            created_at=datetime.now(),
-            passed=pass_fail.b if pass_fail is not None else None,
-        )
+        body = {
+            "testId": test_id,
+            "hardwareId": hardware_id,
+            "data": make_measurement_payload(data),
+            "name": name,
+            "tagNames": [],
+            "pass": pass_fail.b if pass_fail is not None else None,
+            "createdAt": datetime.now().isoformat(),
+        }
+        outbox = CloudOutbox()
+        outbox.enqueue("measurements", {k: v for k, v in body.items() if v is not None})
+        outbox.close()
 
     return default
@@ -0,0 +1,37 @@
+from unittest.mock import patch
+
+import pandas as pd
+from flojoy import Boolean, CloudOutbox, DataFrame
+
+
+def test_FLOJOY_CLOUD_UPLOAD_dataframe(mock_flojoy_decorator, tmp_path):
+    import FLOJOY_CLOUD_UPLOAD
+
+    path = str(tmp_path / "outbox.sqlite")
+    df = pd.DataFrame({"x": [1, 2, 3], "y": [0.5, 1.5, 2.5]})
+    with patch.object(
+        FLOJOY_CLOUD_UPLOAD, "get_env_var", return_value="secret"
+    ), patch.object(FLOJOY_CLOUD_UPLOAD, "CloudOutbox", lambda: CloudOutbox(path)):
+        output = FLOJOY_CLOUD_UPLOAD.FLOJOY_CLOUD_UPLOAD(
+            default=DataFrame(df=df),
+            hardware_id="hardware",
+            test_id="test",
+            pass_fail=Boolean(b=True),
+        )
+
+    # the input is passed through
+    assert output.m.equals(df)
+
+    outbox = CloudOutbox(path)
+    [entry] = outbox.due(limit=10)
+    outbox.close()
+    assert entry.endpoint == "measurements"
+    payload = entry.payload
+    assert payload["testId"] == "test"
+    assert payload["hardwareId"] == "hardware"
+    assert payload["pass"] is True
+    assert "name" not in payload
+    assert payload["data"] == {
+        "type": "dataframe",
+        "value": {"x": [1, 2, 3], "y": [0.5, 1.5, 2.5]},
+    }
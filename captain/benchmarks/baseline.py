@@ -0,0 +1,85 @@
+import json
+import platform
+import sys
+from typing import Any
+
+"""
+JSON baselines of the benchmarks.
+
+A baseline holds the results of a benchmark, by case and metric, along
+with the machine they were recorded on. Comparing new results against it
+lists the metrics that got worse by more than a tolerance.
+"""
+
+# results by case, then by metric
+Results = dict[str, dict[str, float]]
+
+# metric -> (whether higher is better, absolute change below which a
+# difference is noise)
+Metrics = dict[str, tuple[bool, float]]
+
+
+def save_baseline(path: str, results: Results, **settings: Any):
+    """Writes the results, `settings` (benchmark size, ...) must match to compare"""
+    with open(path, "w") as f:
+        json.dump(
+            {
+                "machine": {
+                    "python": sys.version.split()[0],
+                    "platform": platform.platform(),
+                    "processor": platform.processor(),
+                },
+                "settings": settings,
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+
+
+def load_baseline(path: str, **settings: Any) -> Results:
+    with open(path) as f:
+        baseline = json.load(f)
+    if baseline.get("settings") != settings:
+        raise ValueError(
+            f"The baseline was recorded with {baseline.get('settings')}, not {settings}"
+        )
+    return baseline["results"]
+
+
+def compare_results(
+    results: Results, baseline: Results, metrics: Metrics, tolerance: float
+) -> list[str]:
+    """Metrics that got worse than the baseline by more than the tolerance (a ratio)"""
+    regressions: list[str] = []
+    for case, values in results.items():
+        for metric, (higher_is_better, noise) in metrics.items():
+            expected = baseline.get(case, {}).get(metric)
+            value = values.get(metric)
+            if not expected or value is None or abs(value - expected) <= noise:
+                continue
+            change = (value - expected) / expected
+            if (higher_is_better and change < -tolerance) or (
+                not higher_is_better and change > tolerance
+            ):
+                regressions.append(
+                    f"{case}.{metric}: {value:.4g} vs {expected:.4g} ({change:+.0%})"
+                )
+    return regressions
+
+
+def check_baseline(
+    results: Results, path: str, metrics: Metrics, tolerance: float, **settings: Any
+):
+    """Prints the regressions against the baseline and exits with an error if any"""
+    try:
+        baseline = load_baseline(path, **settings)
+    except ValueError as e:
+        sys.exit(str(e))
+    regressions = compare_results(results, baseline, metrics, tolerance)
+    if regressions:
+        print("Regressions against the baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print("No regression against the baseline")
@@ -0,0 +1,225 @@
+"""
+Benchmarks of the DataContainer framework overhead.
+
+For every DCType and size (number of elements of each array), measures the
+time of:
+
+- `construct`: building the DataContainer from existing arrays
+- `copy`: `DataContainer.copy()`
+- `validate`: `DataContainer.validate()`
+- `json`: serializing it with `PlotlyJSONEncoder`, as sent to the front-end
+- `plotly`: `data_container_to_plotly`
+
+Operations that raise (e.g. `data_container_to_plotly` on parametric types)
+are reported as errors. Types without a size (Scalar, Boolean, Stateful)
+only run at the smallest size.
+
+The serializations turn the arrays into Python lists, they are skipped
+above `--max-serialized` elements. Sizes up to 10^8 can be run with
+`--sizes`, which needs a few GB of memory.
+
+Usage:
+    python -m captain.benchmarks.data_container_benchmark
+    python -m captain.benchmarks.data_container_benchmark --sizes 10 100000000 --types OrderedPair
+    python -m captain.benchmarks.data_container_benchmark --compare baseline.json
+"""
+
+import argparse
+import json
+import math
+import timeit
+from typing import Any, Callable, get_args
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from flojoy import (
+    Boolean,
+    Bytes,
+    DataContainer,
+    DataFrame,
+    Grayscale,
+    Image,
+    Matrix,
+    OrderedPair,
+    OrderedTriple,
+    ParametricDataFrame,
+    ParametricGrayscale,
+    ParametricImage,
+    ParametricMatrix,
+    ParametricOrderedPair,
+    ParametricOrderedTriple,
+    ParametricPlotly,
+    ParametricScalar,
+    ParametricSurface,
+    ParametricVector,
+    Plotly,
+    Scalar,
+    Stateful,
+    Stream,
+    StreamBuffer,
+    String,
+    Surface,
+    Vector,
+    data_container_to_plotly,
+)
+from flojoy.data_container import DCType
+from flojoy.utils import PlotlyJSONEncoder
+
+from captain.benchmarks.baseline import (
+    Metrics,
+    Results,
+    check_baseline,
+    save_baseline,
+)
+
+DEFAULT_SIZES = [10, 1_000, 100_000, 1_000_000]
+
+OPERATIONS = ["construct", "copy", "validate", "json", "plotly"]
+
+# microseconds of jitter at the smallest sizes
+METRICS: Metrics = {f"{op}_us": (False, 5.0) for op in OPERATIONS}
+
+# types whose containers do not grow with the size
+UNSIZED_TYPES = ["Scalar", "Boolean", "Stateful"]
+
+
+def data_container_factory(dc_type: DCType, size: int) -> Callable[[], DataContainer]:
+    """Builds the DataContainer from arrays of `size` elements made beforehand"""
+    side = max(1, math.isqrt(size))
+    x = np.arange(size, dtype=np.float64)
+    t = np.arange(size, dtype=np.float64)
+    square = np.ones((side, side))
+    axis = np.arange(side, dtype=np.float64)
+    df = pd.DataFrame({"a": x})
+    buffer = StreamBuffer()
+    buffer.append(x=x, y=x)
+    factories: dict[str, Callable[[], DataContainer]] = {
+        "OrderedPair": lambda: OrderedPair(x=x, y=x),
+        "OrderedTriple": lambda: OrderedTriple(x=x, y=x, z=x),
+        "Surface": lambda: Surface(x=axis, y=axis, z=square),
+        "Scalar": lambda: Scalar(c=1.0),
+        "Vector": lambda: Vector(v=x),
+        "Matrix": lambda: Matrix(m=square),
+        "Grayscale": lambda: Grayscale(img=square),
+        "Image": lambda: Image(r=square, g=square, b=square, a=square),
+        "DataFrame": lambda: DataFrame(df=df),
+        "Plotly": lambda: Plotly(fig=go.Figure(go.Scatter(x=x, y=x))),
+        "Bytes": lambda: Bytes(b=bytes(size)),
+        "String": lambda: String(s="a" * size),
+        "Boolean": lambda: Boolean(b=True),
+        "Stateful": lambda: Stateful(obj=object()),
+        "Stream": lambda: Stream(stream=buffer),
+        "ParametricOrderedPair": lambda: ParametricOrderedPair(x=x, y=x, t=t),
+        "ParametricOrderedTriple": lambda: ParametricOrderedTriple(x=x, y=x, z=x, t=t),
+        "ParametricSurface": lambda: ParametricSurface(
+            x=axis, y=axis, z=square, t=axis
+        ),
+        "ParametricScalar": lambda: ParametricScalar(c=1.0, t=t),
+        "ParametricVector": lambda: ParametricVector(v=x, t=t),
+        "ParametricMatrix": lambda: ParametricMatrix(m=square, t=axis),
+        "ParametricGrayscale": lambda: ParametricGrayscale(img=square, t=axis),
+        "ParametricImage": lambda: ParametricImage(
+            r=square, g=square, b=square, a=square, t=axis
+        ),
+        "ParametricDataFrame": lambda: ParametricDataFrame(df=df, t=t),
+        "ParametricPlotly": lambda: ParametricPlotly(
+            fig=go.Figure(go.Scatter(x=x, y=x)), t=t
+        ),
+    }
+    return factories[dc_type]
+
+
+def time_call(fn: Callable[[], Any], repeat: int = 3, min_time: float = 0.05):
+    """Best time of one call, in seconds, None if the call raises"""
+    timer = timeit.Timer(fn)
+    try:
+        first = timer.timeit(1)
+    except Exception:
+        return None
+    # calls per measure, so that each measure takes about `min_time`
+    number = max(1, min(100_000, int(min_time / max(first, 1e-9))))
+    return min(timer.repeat(repeat, number)) / number
+
+
+def benchmark_data_container(
+    dc_type: DCType,
+    size: int,
+    max_serialized: int = 1_000_000,
+    repeat: int = 3,
+    min_time: float = 0.05,
+) -> dict[str, float | None]:
+    make = data_container_factory(dc_type, size)
+    dc = make()
+    operations: dict[str, Callable[[], Any]] = {
+        "construct": make,
+        "copy": dc.copy,
+        "validate": dc.validate,
+    }
+    if size <= max_serialized:
+        operations["json"] = lambda: json.dumps(dc, cls=PlotlyJSONEncoder)
+        operations["plotly"] = lambda: data_container_to_plotly(dc)
+
+    timings: dict[str, float | None] = {}
+    for op, fn in operations.items():
+        seconds = time_call(fn, repeat, min_time)
+        timings[f"{op}_us"] = None if seconds is None else seconds * 1e6
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--sizes", nargs="*", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--types", nargs="*", help="run only these DCTypes")
+    parser.add_argument("--max-serialized", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON baseline to compare the results to")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="relative change of a metric tolerated before it is a regression",
+    )
+    args = parser.parse_args()
+
+    dc_types = args.types or list(get_args(DCType))
+    sizes = sorted(args.sizes)
+
+    results: Results = {}
+    print(
+        f"{'type':<24} {'size':>10} "
+        + " ".join(f"{op + ' us':>12}" for op in OPERATIONS)
+    )
+    for dc_type in dc_types:
+        for size in sizes[:1] if dc_type in UNSIZED_TYPES else sizes:
+            timings = benchmark_data_container(
+                dc_type, size, args.max_serialized, args.repeat
+            )
+            results[f"{dc_type}/{size}"] = {
+                k: v for k, v in timings.items() if v is not None
+            }
+            cells = []
+            for op in OPERATIONS:
+                key = f"{op}_us"
+                if key not in timings:
+                    cells.append(f"{'-':>12}")
+                elif timings[key] is None:
+                    cells.append(f"{'error':>12}")
+                else:
+                    cells.append(f"{timings[key]:>12.1f}")
+            print(f"{dc_type:<24} {size:>10} " + " ".join(cells))
+
+    settings = {"sizes": sizes, "max_serialized": args.max_serialized}
+    if args.save:
+        save_baseline(args.save, results, **settings)
+        print(f"Saved the results to {args.save}")
+
+    if args.compare:
+        check_baseline(results, args.compare, METRICS, args.tolerance, **settings)
+
+
+if __name__ == "__main__":
+    main()
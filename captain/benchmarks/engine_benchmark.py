@@ -0,0 +1,355 @@
+"""
+Benchmarks of the flowchart execution engine.
+
+Synthetic flowcharts (chain, wide fan-out, nested LOOPs, CONDITIONAL
+branches) of no-op blocks are run through the real Producer/Worker pair,
+so the numbers cover the scheduler, `fetch_inputs`, the @flojoy wrapper and
+the job service, but not the blocks themselves. For each graph it reports:
+
+- the time to compile the flowchart (`flowchart_to_nx_graph` + `Topology`)
+- the jobs per second of the scheduler alone and of the whole engine
+- the scheduling latency percentiles, from a job being queued to a worker
+  picking it up
+- the peak memory allocated during a run (measured in a separate run, as
+  tracemalloc slows everything down)
+
+With `--fast-loops`, the LOOP bodies that can be compiled are run by the
+worker in a tight loop (see `FastLoop`), the jobs per second count every
+block run and the latencies only the jobs that went through the queue.
+
+The results can be saved as a JSON baseline and compared against one,
+the command exits with an error when a metric regressed by more than the
+tolerance.
+
+Usage:
+    python -m captain.benchmarks.engine_benchmark --save baseline.json
+    python -m captain.benchmarks.engine_benchmark --compare baseline.json
+    python -m captain.benchmarks.engine_benchmark --size full  # 100k loop iterations
+    python -m captain.benchmarks.engine_benchmark --fast-loops --cases loop
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from queue import Queue
+from typing import Any, Callable, Literal, Optional
+
+import networkx as nx
+from flojoy import (
+    DataContainer,
+    DefaultParams,
+    JobFailure,
+    JobResultBuilder,
+    JobSuccess,
+    Scalar,
+    flojoy,
+)
+
+from captain.benchmarks.baseline import (
+    Metrics,
+    Results,
+    check_baseline,
+    save_baseline,
+)
+from captain.benchmarks.scheduler_benchmark import simulate_run
+from captain.benchmarks.synthetic_graphs import (
+    chain_flowchart,
+    conditional_flowchart,
+    loop_flowchart,
+    wide_flowchart,
+)
+from captain.models.topology import Topology
+from captain.services.consumer.worker import Worker
+from captain.services.producer.producer import Producer
+from captain.types.worker import JobInfo, PoisonPill
+from captain.utils.flowchart_utils import flowchart_to_nx_graph
+
+BenchmarkSize = Literal["quick", "full"]
+
+JOBSET_ID = "engine-benchmark"
+
+# sub-millisecond latencies easily vary by 50% between two runs
+METRICS: Metrics = {
+    "compile_ms": (False, 1.0),
+    "scheduler_jobs_per_second": (True, 0.0),
+    "engine_jobs_per_second": (True, 0.0),
+    "latency_p50_ms": (False, 0.1),
+    "latency_p95_ms": (False, 0.1),
+    "latency_p99_ms": (False, 0.1),
+    "peak_memory_mb": (False, 0.1),
+}
+
+
+def benchmark_cases(size: BenchmarkSize) -> dict[str, dict[str, Any]]:
+    loops = 100_000 if size == "full" else 1_000
+    return {
+        "chain": chain_flowchart(1_000 if size == "full" else 200),
+        "wide": wide_flowchart(1_000 if size == "full" else 200),
+        "loop": loop_flowchart(body_length=1, num_loops=loops),
+        "nested_loop": loop_flowchart(
+            body_length=1, num_loops=int(loops**0.5), depth=2
+        ),
+        "conditional": conditional_flowchart(num_loops=loops, branch_length=2),
+    }
+
+
+def synthetic_blocks() -> dict[str, Callable[..., Any]]:
+    """No-op blocks by command, LOOP and CONDITIONAL keep their state per node"""
+    iterations: dict[str, int] = {}
+
+    @flojoy
+    def NOOP(default: Optional[list[DataContainer]] = None) -> Scalar:
+        return Scalar(c=0)
+
+    @flojoy(inject_node_metadata=True)
+    def LOOP(
+        default_params: DefaultParams,
+        default: Optional[list[DataContainer]] = None,
+        num_loops: int = -1,
+    ) -> dict[str, Any]:
+        node_id = default_params.node_id
+        iteration = iterations.get(node_id, 0) + 1
+        is_finished = iteration > num_loops
+        iterations[node_id] = 0 if is_finished else iteration
+        data = Scalar(c=iteration)
+        return {
+            "body": JobResultBuilder()
+            .from_data(data)
+            .flow_by_flag(
+                flag=is_finished, false_direction=["body"], true_direction=["end"]
+            )
+            .build(),
+            "end": JobResultBuilder()
+            .from_data(data)
+            .flow_by_flag(
+                flag=is_finished, false_direction=["body"], true_direction=["end"]
+            )
+            .build(),
+        }
+
+    @flojoy(inject_node_metadata=True)
+    def CONDITIONAL(
+        default_params: DefaultParams,
+        default: Optional[list[DataContainer]] = None,
+    ) -> dict[str, Any]:
+        node_id = default_params.node_id
+        iteration = iterations.get(node_id, 0) + 1
+        iterations[node_id] = iteration
+        direction = "true" if iteration % 2 else "false"
+        data = Scalar(c=iteration)
+        return {
+            branch: JobResultBuilder()
+            .from_data(data)
+            .flow_to_directions([direction])
+            .build()
+            for branch in ("true", "false")
+        }
+
+    return {"NOOP": NOOP, "LOOP": LOOP, "CONDITIONAL": CONDITIONAL}
+
+
+class LatencyQueue(Queue[Any]):
+    """Task queue recording how long each job waited before a worker got it"""
+
+    def __init__(self):
+        super().__init__()
+        self.latencies: list[float] = []
+
+    def get(self, block: bool = True, timeout: float | None = None) -> Any:
+        item = super().get(block, timeout)
+        if isinstance(item, JobInfo):
+            self.latencies.append(time.perf_counter() - item.queued_at)
+        return item
+
+
+@dataclass
+class EngineRun:
+    jobs: int
+    seconds: float
+    latencies: list[float] = field(repr=False)
+
+
+def run_engine(
+    graph: nx.MultiDiGraph,
+    workers: int = 1,
+    timeout: float = 600,
+    fast_loops: bool = False,
+):
+    """Runs the flowchart with the producer/worker threads used by /wfc"""
+    topology = Topology(graph=graph, jobset_id=JOBSET_ID, fast_loops=fast_loops)
+    blocks = synthetic_blocks()
+    imported_functions = {
+        job_id: blocks[cmd]
+        for job_id, cmd in zip(topology.compiled.ids, topology.compiled.cmds)
+    }
+    task_queue = LatencyQueue()
+    finish_queue: Queue[Any] = Queue()
+    done = threading.Event()
+    failures: list[str] = []
+
+    def process_task(response: JobSuccess | JobFailure):
+        new_jobs = topology.process_worker_response(response)
+        if topology.is_finished() or topology.is_cancelled():
+            done.set()
+        return new_jobs
+
+    producer = Producer(
+        task_queue=task_queue,
+        finish_queue=finish_queue,
+        process_task=process_task,
+        queue_task=topology.run_job,
+        init_func=topology.run,
+    )
+
+    def run_worker():
+        worker = Worker(
+            task_queue=task_queue,
+            finish_queue=finish_queue,
+            imported_functions=imported_functions,
+            observe_blocks=[],
+        )
+        try:
+            asyncio.run(worker.run())
+        except Exception as e:
+            # the worker stops on a failed job
+            failures.append(str(e))
+            done.set()
+
+    threads = [threading.Thread(target=asyncio.run, args=(producer.run(),))]
+    threads += [threading.Thread(target=run_worker) for _ in range(workers)]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    finished = done.wait(timeout)
+    seconds = time.perf_counter() - start
+
+    finish_queue.put(PoisonPill())
+    for _ in range(workers):
+        task_queue.put(PoisonPill())
+    for thread in threads:
+        thread.join()
+
+    if not finished:
+        raise TimeoutError(f"The flowchart did not finish within {timeout} seconds")
+    if failures:
+        raise RuntimeError(f"Synthetic blocks failed: {failures}")
+    return EngineRun(len(task_queue.latencies), seconds, task_queue.latencies)
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+def peak_memory(run: Callable[[], Any]) -> int:
+    """Peak memory (bytes) allocated by the call, in every thread"""
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark_flowchart(
+    flowchart: dict[str, Any],
+    workers: int = 1,
+    repeat: int = 3,
+    fast_loops: bool = False,
+) -> dict[str, float]:
+    compile_seconds = float("inf")
+    scheduler_seconds = float("inf")
+    best: EngineRun | None = None
+    jobs = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        graph = flowchart_to_nx_graph(flowchart)
+        topology = Topology(graph=graph, jobset_id=JOBSET_ID)
+        compile_seconds = min(compile_seconds, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        jobs = len(simulate_run(topology))
+        scheduler_seconds = min(scheduler_seconds, time.perf_counter() - start)
+
+        run = run_engine(graph, workers, fast_loops=fast_loops)
+        if best is None or run.seconds < best.seconds:
+            best = run
+
+    assert best is not None
+    memory = peak_memory(
+        lambda: run_engine(
+            flowchart_to_nx_graph(flowchart), workers, fast_loops=fast_loops
+        )
+    )
+    return {
+        "jobs": jobs,
+        "compile_ms": compile_seconds * 1e3,
+        "scheduler_jobs_per_second": jobs / scheduler_seconds,
+        "engine_jobs_per_second": jobs / best.seconds,
+        "latency_p50_ms": percentile(best.latencies, 50) * 1e3,
+        "latency_p95_ms": percentile(best.latencies, 95) * 1e3,
+        "latency_p99_ms": percentile(best.latencies, 99) * 1e3,
+        "peak_memory_mb": memory / 2**20,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--size", choices=["quick", "full"], default="quick")
+    parser.add_argument("--cases", nargs="*", help="run only these graphs")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--fast-loops", action="store_true", help="run the LOOP bodies as fast loops"
+    )
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON baseline to compare the results to")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="relative change of a metric tolerated before it is a regression",
+    )
+    args = parser.parse_args()
+
+    cases = benchmark_cases(args.size)
+    if args.cases:
+        cases = {name: cases[name] for name in args.cases}
+
+    results: Results = {}
+    print(
+        f"{'graph':<12} {'jobs':>8} {'compile ms':>11} {'sched jobs/s':>13} "
+        f"{'engine jobs/s':>14} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'peak MB':>8}"
+    )
+    for name, flowchart in cases.items():
+        r = benchmark_flowchart(flowchart, args.workers, args.repeat, args.fast_loops)
+        results[name] = r
+        print(
+            f"{name:<12} {r['jobs']:>8.0f} {r['compile_ms']:>11.2f} "
+            f"{r['scheduler_jobs_per_second']:>13.0f} {r['engine_jobs_per_second']:>14.0f} "
+            f"{r['latency_p50_ms']:>8.3f} {r['latency_p95_ms']:>8.3f} "
+            f"{r['latency_p99_ms']:>8.3f} {r['peak_memory_mb']:>8.2f}"
+        )
+
+    settings: dict[str, Any] = {"size": args.size, "workers": args.workers}
+    if args.fast_loops:
+        settings["fast_loops"] = True
+    if args.save:
+        save_baseline(args.save, results, **settings)
+        print(f"Saved the results to {args.save}")
+
+    if args.compare:
+        check_baseline(results, args.compare, METRICS, args.tolerance, **settings)
+
+
+if __name__ == "__main__":
+    main()
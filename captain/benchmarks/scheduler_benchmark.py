@@ -0,0 +1,119 @@
+"""
+Compares the scheduling overhead of the compiled Topology against the legacy
+networkx edge-mutation scheduler.
+
+Blocks are not executed: jobs are popped from the task queue and answered
+right away, with LOOP blocks emulated by a per-node iteration counter and
+CONDITIONAL blocks alternating between their "true" and "false" branches.
+
+Usage: python -m captain.benchmarks.scheduler_benchmark [--loops 10000]
+"""
+
+import argparse
+import time
+from queue import Queue
+from typing import Any, Callable
+
+from flojoy import JobSuccess
+from flojoy.flojoy_instruction import FLOJOY_INSTRUCTION
+
+from captain.benchmarks.legacy_topology import LegacyTopology
+from captain.benchmarks.synthetic_graphs import (
+    chain_flowchart,
+    loop_flowchart,
+    wide_flowchart,
+)
+from captain.models.topology import Topology
+from captain.types.worker import JobInfo
+from captain.utils.flowchart_utils import flowchart_to_nx_graph
+
+
+def simulate_run(topology: Topology | LegacyTopology) -> list[str]:
+    """
+    Drives a topology like the producer/worker pair would, returns the
+    order in which the jobs were executed.
+    """
+    task_queue: Queue[JobInfo] = Queue()
+    iterations: dict[str, int] = {}
+    executed: list[str] = []
+    topology.run(task_queue)
+
+    while not task_queue.empty() and not topology.is_finished():
+        job = task_queue.get()
+        executed.append(job.job_id)
+        result: dict[str, Any] | None = None
+        if "num_loops" in job.ctrls:
+            iteration = iterations.get(job.job_id, 0) + 1
+            is_finished = iteration > job.ctrls["num_loops"]["value"]
+            iterations[job.job_id] = 0 if is_finished else iteration
+            result = {
+                FLOJOY_INSTRUCTION.FLOW_TO_DIRECTIONS: ["end"]
+                if is_finished
+                else ["body"]
+            }
+        elif job.job_id.startswith("CONDITIONAL"):
+            iteration = iterations.get(job.job_id, 0) + 1
+            iterations[job.job_id] = iteration
+            result = {
+                FLOJOY_INSTRUCTION.FLOW_TO_DIRECTIONS: ["true"]
+                if iteration % 2
+                else ["false"]
+            }
+        response = JobSuccess(
+            result=result, fn="NOOP", node_id=job.job_id, jobset_id=job.jobset_id
+        )
+        for new_job in topology.process_worker_response(response) or []:
+            topology.run_job(new_job, task_queue)
+
+    return executed
+
+
+def time_run(
+    make_topology: Callable[[], Topology | LegacyTopology], repeat: int
+) -> tuple[float, int]:
+    best = float("inf")
+    jobs = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        topology = make_topology()
+        jobs = len(simulate_run(topology))
+        best = min(best, time.perf_counter() - start)
+    return best, jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--width", type=int, default=500)
+    parser.add_argument("--length", type=int, default=500)
+    parser.add_argument("--loops", type=int, default=1000)
+    parser.add_argument("--body", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    cases = {
+        "wide": wide_flowchart(args.width),
+        "deep": chain_flowchart(args.length),
+        "loop": loop_flowchart(body_length=args.body, num_loops=args.loops),
+        "nested loop": loop_flowchart(
+            body_length=args.body // 2, num_loops=int(args.loops**0.5), depth=2
+        ),
+    }
+
+    print(f"{'graph':<12} {'jobs':>8} {'legacy (s)':>12} {'compiled (s)':>13} {'x':>7}")
+    for name, flowchart in cases.items():
+        graph = flowchart_to_nx_graph(flowchart)
+        legacy, jobs = time_run(
+            lambda: LegacyTopology(graph=graph, jobset_id="bench"), args.repeat
+        )
+        compiled, _ = time_run(
+            lambda: Topology(graph=graph, jobset_id="bench"), args.repeat
+        )
+        print(
+            f"{name:<12} {jobs:>8} {legacy:>12.4f} {compiled:>13.4f} {legacy / compiled:>7.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+from typing import Any
+
+"""
+Builders for synthetic flowcharts used by the benchmarks.
+
+The builders return flowcharts in the same format the front-end sends to
+/wfc, so they can be fed through `flowchart_to_nx_graph` like a real app.
+"""
+
+
+def make_node(
+    node_id: str, func: str = "NOOP", ctrls: dict[str, Any] | None = None
+) -> dict[str, Any]:
+    return {
+        "id": node_id,
+        "position": {"x": 0, "y": 0},
+        "data": {
+            "id": node_id,
+            "label": func,
+            "func": func,
+            "ctrls": ctrls or {},
+            "initCtrls": {},
+            "inputs": [
+                {"name": "default", "id": "default", "type": "Any", "multiple": True}
+            ],
+            "path": "",
+        },
+    }
+
+
+def make_edge(
+    source: str, target: str, source_handle: str = "default"
+) -> dict[str, Any]:
+    return {
+        "id": f"{source}->{target}:{source_handle}",
+        "source": source,
+        "target": target,
+        "sourceHandle": source_handle,
+        "targetHandle": "default",
+    }
+
+
+def loop_ctrls(num_loops: int) -> dict[str, Any]:
+    return {
+        "num_loops": {
+            "type": "int",
+            "default": -1,
+            "functionName": "LOOP",
+            "param": "num_loops",
+            "value": num_loops,
+        }
+    }
+
+
+def chain_flowchart(length: int) -> dict[str, Any]:
+    """source -> n1 -> n2 -> ... -> n<length>"""
+    nodes = [make_node(f"NOOP-{i}") for i in range(length)]
+    edges = [make_edge(f"NOOP-{i}", f"NOOP-{i + 1}") for i in range(length - 1)]
+    return {"nodes": nodes, "edges": edges}
+
+
+def wide_flowchart(width: int) -> dict[str, Any]:
+    """source -> <width> independent blocks -> sink"""
+    nodes = [make_node("NOOP-source"), make_node("NOOP-sink")]
+    edges = []
+    for i in range(width):
+        nodes.append(make_node(f"NOOP-{i}"))
+        edges.append(make_edge("NOOP-source", f"NOOP-{i}"))
+        edges.append(make_edge(f"NOOP-{i}", "NOOP-sink"))
+    return {"nodes": nodes, "edges": edges}
+
+
+def loop_flowchart(
+    body_length: int, num_loops: int, body_width: int = 1, depth: int = 1
+) -> dict[str, Any]:
+    """
+    source -> LOOP -body-> <body_width> chains of <body_length> blocks
+                   -end--> end
+
+    With depth > 1, the body of each loop contains another loop (nested loops).
+    """
+    nodes = [make_node("NOOP-source")]
+    edges = []
+    parent, handle = "NOOP-source", "default"
+    for level in range(depth):
+        loop_id = f"LOOP-{level}"
+        end_id = f"NOOP-end-{level}"
+        nodes.append(make_node(loop_id, "LOOP", loop_ctrls(num_loops)))
+        nodes.append(make_node(end_id))
+        edges.append(make_edge(parent, loop_id, handle))
+        edges.append(make_edge(loop_id, end_id, "end"))
+        for branch in range(body_width):
+            previous, previous_handle = loop_id, "body"
+            for i in range(body_length):
+                node_id = f"NOOP-{level}-{branch}-{i}"
+                nodes.append(make_node(node_id))
+                edges.append(make_edge(previous, node_id, previous_handle))
+                previous, previous_handle = node_id, "default"
+        parent, handle = loop_id, "body"
+    return {"nodes": nodes, "edges": edges}
+
+
+def conditional_flowchart(num_loops: int, branch_length: int) -> dict[str, Any]:
+    """
+    source -> LOOP -body-> CONDITIONAL -true--> chain of <branch_length> blocks
+                                       -false-> chain of <branch_length> blocks
+                   -end--> end
+
+    The benchmarks alternate the branch taken by the CONDITIONAL.
+    """
+    nodes = [
+        make_node("NOOP-source"),
+        make_node("LOOP-0", "LOOP", loop_ctrls(num_loops)),
+        make_node("CONDITIONAL-0", "CONDITIONAL"),
+        make_node("NOOP-end"),
+    ]
+    edges = [
+        make_edge("NOOP-source", "LOOP-0"),
+        make_edge("LOOP-0", "CONDITIONAL-0", "body"),
+        make_edge("LOOP-0", "NOOP-end", "end"),
+    ]
+    for branch in ("true", "false"):
+        previous, previous_handle = "CONDITIONAL-0", branch
+        for i in range(branch_length):
+            node_id = f"NOOP-{branch}-{i}"
+            nodes.append(make_node(node_id))
+            edges.append(make_edge(previous, node_id, previous_handle))
+            previous, previous_handle = node_id, "default"
+    return {"nodes": nodes, "edges": edges}
@@ -0,0 +1,193 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from itertools import count
+from typing import Any, Awaitable, Callable, Hashable
+
+from captain.internal.ws_protocol import BINARY_PROTOCOL, encode_binary, encode_text
+from captain.utils.run_trace import get_run_trace
+
+"""
+Outbound queues used by the ConnectionManager.
+
+Workers only enqueue messages, every connection has a sender task running
+in the event loop of the connection which sends them at a bounded frame
+rate, so a slow client never blocks the workers.
+
+Messages that supersede each other are coalesced while they wait in the
+queue: only the latest "running node" status of a jobset and the latest
+result of each node are sent. Results are never dropped, the latest one
+of a node may be its final one: coalescing already bounds them to one per
+node, and when more than `max_pending_results` are waiting the sender
+stops waiting for the next frame until it has caught up. Other messages
+(status changes, failures, ...) are always delivered, in order.
+"""
+
+# frames per second sent to a connection
+DEFAULT_MAX_FRAME_RATE = 30
+# results waiting to be sent before the frame rate is no longer enforced
+DEFAULT_MAX_PENDING_RESULTS = 64
+
+
+class OutboundMessage:
+    """A message shared by the queues of all connections, encoded at most once per protocol"""
+
+    def __init__(self, message: Any):
+        self.message = message
+        self.key = coalesce_key(message)
+        self._encoded: dict[str, str | bytes] = {}
+        self._lock = threading.Lock()
+
+    def encode(self, protocol: str) -> str | bytes:
+        with self._lock:
+            encoded = self._encoded.get(protocol)
+            if encoded is None:
+                start = time.perf_counter()
+                encoded = (
+                    encode_binary(self.message)
+                    if protocol == BINARY_PROTOCOL
+                    else encode_text(self.message)
+                )
+                self._encoded[protocol] = encoded
+                self._trace_encoding(protocol, start)
+            return encoded
+
+    def _trace_encoding(self, protocol: str, start: float):
+        if not isinstance(self.message, dict):
+            return
+        trace = get_run_trace(self.message.get("jobsetId", ""))
+        if trace is None:
+            return
+        node_results = self.message.get("NODE_RESULTS")
+        args = {"protocol": protocol}
+        if node_results:
+            args["job_id"] = node_results.get("id")
+        trace.add_span("encode", "broadcast", start, time.perf_counter(), args)
+
+
+def coalesce_key(message: Any) -> Hashable | None:
+    """Messages with the same key supersede each other, None is never coalesced"""
+    if not isinstance(message, dict) or message.get("type") != "worker_response":
+        return None
+    if message.get("FAILED_NODES"):
+        return None
+    node_results = message.get("NODE_RESULTS")
+    if node_results:
+        return ("result", message.get("jobsetId"), node_results.get("id"))
+    if message.get("RUNNING_NODE"):
+        return ("running_node", message.get("jobsetId"))
+    return None
+
+
+def is_result(key: Hashable | None) -> bool:
+    return isinstance(key, tuple) and key[0] == "result"
+
+
+class OutboundQueue:
+    def __init__(
+        self,
+        send: Callable[[OutboundMessage], Awaitable[None]],
+        max_frame_rate: float = DEFAULT_MAX_FRAME_RATE,
+        max_pending_results: int = DEFAULT_MAX_PENDING_RESULTS,
+    ):
+        self.send = send
+        self.min_interval = 1 / max_frame_rate if max_frame_rate > 0 else 0
+        self.max_pending_results = max_pending_results
+        self.pending: OrderedDict[Hashable, OutboundMessage] = OrderedDict()
+        self.pending_results = 0
+        self.lock = threading.Lock()
+        self.sequence = count()
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.wakeup: asyncio.Event | None = None
+        self.backlogged: asyncio.Event | None = None
+        self.sending = False
+        self.task: asyncio.Task[None] | None = None
+        # counters
+        self.enqueued = 0
+        self.sent = 0
+        self.coalesced = 0
+        self.backlogged_frames = 0
+
+    def start(self):
+        """Starts the sender task, must be called from the loop of the connection"""
+        self.loop = asyncio.get_running_loop()
+        self.wakeup = asyncio.Event()
+        self.backlogged = asyncio.Event()
+        self.task = self.loop.create_task(self._run())
+
+    def stop(self):
+        if self.task is not None and self.loop is not None:
+            self.loop.call_soon_threadsafe(self.task.cancel)
+
+    def put(self, message: OutboundMessage):
+        """Enqueues a message, can be called from any thread"""
+        with self.lock:
+            self.enqueued += 1
+            key = message.key
+            if key is None:
+                key = ("message", next(self.sequence))
+            elif key in self.pending:
+                del self.pending[key]
+                self.coalesced += 1
+                if is_result(key):
+                    self.pending_results -= 1
+            self.pending[key] = message
+            if is_result(key):
+                self.pending_results += 1
+            backlogged = self.pending_results > self.max_pending_results
+        if self.loop is not None and self.wakeup is not None:
+            self.loop.call_soon_threadsafe(self.wakeup.set)
+            if backlogged and self.backlogged is not None:
+                self.loop.call_soon_threadsafe(self.backlogged.set)
+
+    async def flush(self, poll_interval: float = 0.005):
+        """Waits until every pending message has been sent"""
+        while self.task is not None and not self.task.done():
+            with self.lock:
+                if not self.pending and not self.sending:
+                    return
+            await asyncio.sleep(poll_interval)
+
+    def stats(self) -> dict[str, int]:
+        with self.lock:
+            return {
+                "pending": len(self.pending),
+                "enqueued": self.enqueued,
+                "sent": self.sent,
+                "coalesced": self.coalesced,
+                "backlogged_frames": self.backlogged_frames,
+            }
+
+    def _take(self) -> list[OutboundMessage]:
+        with self.lock:
+            messages = list(self.pending.values())
+            self.pending.clear()
+            self.pending_results = 0
+            self.sending = True
+        return messages
+
+    async def _run(self):
+        assert self.wakeup is not None and self.backlogged is not None
+        while True:
+            await self.wakeup.wait()
+            self.wakeup.clear()
+            self.backlogged.clear()
+            started = time.monotonic()
+            try:
+                for message in self._take():
+                    await self.send(message)
+                    self.sent += 1
+            finally:
+                self.sending = False
+            # messages arriving meanwhile are coalesced until the next frame,
+            # unless too many results are waiting
+            elapsed = time.monotonic() - started
+            if elapsed < self.min_interval:
+                try:
+                    await asyncio.wait_for(
+                        self.backlogged.wait(), self.min_interval - elapsed
+                    )
+                    self.backlogged_frames += 1
+                except asyncio.TimeoutError:
+                    pass
@@ -0,0 +1,142 @@
+import json
+import struct
+from typing import Any
+
+import numpy as np
+from flojoy.utils import PlotlyJSONEncoder
+
+"""
+Wire formats of the messages sent to the front-end over WebSocket.
+
+Clients connect with `/ws/{socket_id}?protocol=binary` to receive binary
+frames, other clients keep receiving the JSON text protocol.
+
+A binary frame is laid out as:
+
+    uint32 (little-endian)  length of the header
+    header                  UTF-8 JSON of the message, every numeric ndarray
+                            replaced by {"__ndarray__": i, "dtype", "shape"}
+    padding                 up to a multiple of 8 bytes
+    buffers                 raw little-endian array data, buffer i starts
+                            `header["__buffers__"][i]` bytes after the
+                            padding (8-byte aligned)
+
+so large plot traces are copied as-is instead of being turned into text,
+and the front-end can view them as typed arrays without parsing.
+"""
+
+TEXT_PROTOCOL = "text"
+BINARY_PROTOCOL = "binary"
+
+NDARRAY_KEY = "__ndarray__"
+BUFFERS_KEY = "__buffers__"
+
+_HEADER_LENGTH = struct.Struct("<I")
+_ALIGNMENT = 8
+
+# dtypes the front-end can view as a typed array, others are sent as JSON.
+# 64-bit integers are sent as float64 since the plots can't use BigInt arrays
+_WIRE_DTYPES: dict[str, str] = {
+    "b": "bool",
+    "i1": "int8",
+    "i2": "int16",
+    "i4": "int32",
+    "u1": "uint8",
+    "u2": "uint16",
+    "u4": "uint32",
+    "f4": "float32",
+    "f8": "float64",
+}
+_CAST_DTYPES: dict[str, str] = {"i8": "f8", "u8": "f8", "f2": "f4"}
+
+
+def encode_text(message: Any) -> str:
+    return json.dumps(message, cls=PlotlyJSONEncoder)
+
+
+def encode_binary(message: Any) -> bytes:
+    buffers: list[np.ndarray] = []
+    header = _extract_arrays(message, buffers)
+
+    # offsets are relative to the start of the buffers, right after the header
+    offsets: list[int] = []
+    offset = 0
+    for buffer in buffers:
+        offsets.append(offset)
+        offset = _align(offset + buffer.nbytes)
+    if isinstance(header, dict):
+        header[BUFFERS_KEY] = offsets
+    header_bytes = encode_text(header).encode()
+
+    position = _HEADER_LENGTH.size + len(header_bytes)
+    data_start = _align(position)
+    parts: list[Any] = [
+        _HEADER_LENGTH.pack(len(header_bytes)),
+        header_bytes,
+        b"\0" * (data_start - position),
+    ]
+    position = 0
+    for offset, buffer in zip(offsets, buffers):
+        parts.append(b"\0" * (offset - position))
+        parts.append(memoryview(buffer).cast("B"))
+        position = offset + buffer.nbytes
+    return b"".join(parts)
+
+
+def decode_binary(frame: bytes) -> Any:
+    """Decodes a binary frame, mostly useful for tests and python clients"""
+    (length,) = _HEADER_LENGTH.unpack_from(frame)
+    start = _HEADER_LENGTH.size
+    header = json.loads(frame[start : start + length])
+    offsets = header.pop(BUFFERS_KEY, []) if isinstance(header, dict) else []
+    data_start = _align(start + length)
+    return _revive_arrays(header, frame, [data_start + o for o in offsets])
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def _to_wire_array(array: np.ndarray) -> np.ndarray | None:
+    code = array.dtype.str[1:] if array.dtype.kind != "b" else "b"
+    code = _CAST_DTYPES.get(code, code)
+    if code not in _WIRE_DTYPES:
+        return None
+    wire_dtype = np.dtype(bool) if code == "b" else np.dtype("<" + code)
+    return np.ascontiguousarray(array, dtype=wire_dtype)
+
+
+def _extract_arrays(obj: Any, buffers: list[np.ndarray]) -> Any:
+    if isinstance(obj, np.ndarray):
+        wire_array = _to_wire_array(obj)
+        if wire_array is None or obj.ndim == 0:
+            return obj
+        buffers.append(wire_array)
+        code = "b" if wire_array.dtype.kind == "b" else wire_array.dtype.str[1:]
+        return {
+            NDARRAY_KEY: len(buffers) - 1,
+            "dtype": _WIRE_DTYPES[code],
+            "shape": list(wire_array.shape),
+        }
+    if isinstance(obj, dict):
+        return {key: _extract_arrays(value, buffers) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_extract_arrays(value, buffers) for value in obj]
+    return obj
+
+
+def _revive_arrays(obj: Any, frame: bytes, offsets: list[int]) -> Any:
+    if isinstance(obj, dict):
+        if NDARRAY_KEY in obj:
+            dtype = np.dtype(obj["dtype"]).newbyteorder("<")
+            shape = tuple(obj["shape"])
+            count = int(np.prod(shape))
+            return np.frombuffer(
+                frame, dtype=dtype, count=count, offset=offsets[obj[NDARRAY_KEY]]
+            ).reshape(shape)
+        return {
+            key: _revive_arrays(value, frame, offsets) for key, value in obj.items()
+        }
+    if isinstance(obj, list):
+        return [_revive_arrays(value, frame, offsets) for value in obj]
+    return obj
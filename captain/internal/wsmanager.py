@@ -1,10 +1,15 @@
+import asyncio
 from captain.types.test_sequence import TestSequenceMessage
 from fastapi import WebSocket
 from fastapi.websockets import WebSocketState
-from flojoy.utils import PlotlyJSONEncoder
 from queue import Queue
 from typing import Any, Union
-import json
+from captain.internal.broadcast_queue import (
+    DEFAULT_MAX_FRAME_RATE,
+    OutboundMessage,
+    OutboundQueue,
+)
+from captain.internal.ws_protocol import BINARY_PROTOCOL, TEXT_PROTOCOL
 from captain.types.worker import WorkerJobResponse
 import threading
 import traceback
@@ -22,15 +27,28 @@ class ConnectionManager:
             return cls._instance
         return cls._instance
 
-    def __init__(self):
+    def __init__(self, max_frame_rate: float = DEFAULT_MAX_FRAME_RATE):
         self.active_connections_map: dict[str, WebSocket] = {}
+        self.connection_protocols: dict[str, str] = {}
+        self.outbound_queues: dict[str, OutboundQueue] = {}
+        self.max_frame_rate = max_frame_rate
         self.log_queue: Queue[WebSocket] = Queue()
 
-    async def connect(self, websocket: WebSocket, socket_id: str):
+    async def connect(
+        self, websocket: WebSocket, socket_id: str, protocol: str = TEXT_PROTOCOL
+    ):
         await websocket.accept()
 
+        async def send(message: OutboundMessage):
+            await self._send(socket_id, websocket, protocol, message)
+
+        queue = OutboundQueue(send, max_frame_rate=self.max_frame_rate)
+        queue.start()
+
         with socket_connection_lock:
             self.active_connections_map[socket_id] = websocket
+            self.connection_protocols[socket_id] = protocol
+            self.outbound_queues[socket_id] = queue
 
         # logger.debug(
         #     f"Connected! Amt of active connections: {len(self.active_connections_map.keys())}"
@@ -43,34 +61,58 @@ class ConnectionManager:
                 return
 
             del self.active_connections_map[socket_id]
+            self.connection_protocols.pop(socket_id, None)
+            queue = self.outbound_queues.pop(socket_id, None)
+        if queue is not None:
+            queue.stop()
 
-    # this method sends a message to all connected websockets
+    # this method queues a message for all connected websockets, it does
+    # not wait for the message to be sent
     async def broadcast(
         self, message: Union[dict[str, Any], WorkerJobResponse, TestSequenceMessage]
     ):
-        dead_connections: set[str] = set()
+        # callers reuse and modify their message objects after broadcasting
+        outbound = OutboundMessage(dict(message))
+        with socket_connection_lock:
+            queues = list(self.outbound_queues.values())
+        for queue in queues:
+            queue.put(outbound)
 
+    async def flush(self):
+        """Waits until the queued messages have been sent to every connection"""
         with socket_connection_lock:
-            for id, connection in self.active_connections_map.items():
-                if id in dead_connections:
-                    continue
-
-                try:
-                    await connection.send_text(
-                        json.dumps(message, cls=PlotlyJSONEncoder)
-                    )
-                except Exception as e:
-                    print(
-                        f"Error in broadcast to {id}",
-                        e,
-                        traceback.format_exc(),
-                        flush=True,
-                    )
-                    if connection.client_state == WebSocketState.DISCONNECTED:
-                        print(
-                            f"Connection state for {id} is Disconnected, adding to dead_connection..."
-                        )
-                        dead_connections.add(id)
-
-        for connection in dead_connections:
-            await self.disconnect(socket_id=connection)
+            queues = list(self.outbound_queues.values())
+        for queue in queues:
+            await queue.flush()
+
+    def get_stats(self) -> dict[str, dict[str, int]]:
+        with socket_connection_lock:
+            queues = dict(self.outbound_queues)
+        return {socket_id: queue.stats() for socket_id, queue in queues.items()}
+
+    async def _send(
+        self,
+        socket_id: str,
+        connection: WebSocket,
+        protocol: str,
+        message: OutboundMessage,
+    ):
+        try:
+            # large messages take a while to encode, keep the event loop free
+            data = await asyncio.to_thread(message.encode, protocol)
+            if protocol == BINARY_PROTOCOL:
+                await connection.send_bytes(data)  # type: ignore
+            else:
+                await connection.send_text(data)  # type: ignore
+        except Exception as e:
+            print(
+                f"Error in broadcast to {socket_id}",
+                e,
+                traceback.format_exc(),
+                flush=True,
+            )
+            if connection.client_state == WebSocketState.DISCONNECTED:
+                print(
+                    f"Connection state for {socket_id} is Disconnected, removing connection..."
+                )
+                asyncio.create_task(self.disconnect(socket_id=socket_id))
@@ -1,6 +1,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 from captain.routes import (
     blocks,
     devices,
@@ -16,6 +17,8 @@ from captain.routes import (
 from captain.utils.config import origins
 from captain.utils.logger import logger
 from captain.internal.manager import WatchManager
+from captain.services.cloud_uploader import run_cloud_uploader
+from captain.utils.test_sequencer.interpreter_pool import shutdown_interpreter_pool
 
 
 @asynccontextmanager
@@ -23,7 +26,12 @@ async def startup_event(app: FastAPI):
     logger.info("Running startup event")
     watch_manager = WatchManager.get_instance()
     watch_manager.start_thread()
+    # uploads the sessions and measurements queued for Flojoy Cloud
+    uploader = asyncio.create_task(run_cloud_uploader())
     yield
+    uploader.cancel()
+    await cloud.close_cloud_client()
+    shutdown_interpreter_pool()
 
 
 app = FastAPI(lifespan=startup_event)
@@ -0,0 +1,298 @@
+from typing import Any, cast
+
+import networkx as nx
+
+"""
+Compiled, integer-indexed representation of a flowchart used by the Topology.
+
+The flowchart graph is compiled once per run. Scheduling afterwards only
+touches flat python lists/bytearrays: finishing a job decrements the
+remaining-dependency counter of its successors (O(out-degree)) and restarting
+a LOOP body re-arms a precomputed list of dependencies.
+
+A "dependency" is a (source, target) pair of nodes, no matter how many
+parallel edges connect them. This mirrors how the scheduler always treated
+edges: following any labeled edge from source to target releases them all.
+
+The body of a LOOP whose blocks are all pure (no hardware, no flow control)
+is also compiled into an execution order, so it can be run by a single
+worker in a tight loop instead of going through the task queue.
+"""
+
+# blocks that choose the direction of the flow, a loop body containing one
+# is not compiled
+FLOW_CONTROL_BLOCKS = frozenset(["LOOP", "CONDITIONAL", "BREAK"])
+# blocks with side effects that must not run in a compiled loop body
+IMPURE_BLOCK_PATHS = ("HARDWARE/",)
+# blocks that only display their input, they can be skipped between updates
+# of the UI when nothing reads their result
+DISPLAY_BLOCK_PATHS = ("DATA/VISUALIZATION/",)
+
+
+class CompiledFlowchart:
+    """
+    Read-only view of a flowchart graph, built once from the networkx graph.
+    """
+
+    def __init__(self, graph: nx.MultiDiGraph):
+        self.ids: list[str] = list(cast(list[str], graph.nodes))
+        self.index: dict[str, int] = {job_id: i for i, job_id in enumerate(self.ids)}
+        n = len(self.ids)
+
+        self.cmds: list[str] = []
+        self.labels: list[str] = []
+        self.ctrls: list[dict[str, Any]] = []
+        self.paths: list[str] = []
+        for job_id in self.ids:
+            node = cast(dict[str, Any], graph.nodes[job_id])
+            self.cmds.append(node.get("cmd", job_id))
+            self.labels.append(node.get("label", job_id))
+            self.ctrls.append(node.get("ctrls", {}))
+            self.paths.append(node.get("node_path", ""))
+
+        # dependency (pair) tables
+        self.dep_src: list[int] = []
+        self.dep_dst: list[int] = []
+        self.in_deps: list[list[int]] = [[] for _ in range(n)]
+        self.out_deps: list[list[int]] = [[] for _ in range(n)]
+        # source node -> edge label -> dependencies following that label
+        self.out_deps_by_label: list[dict[str, list[int]]] = [{} for _ in range(n)]
+        # inputs of a node in the format expected by `fetch_inputs`
+        self.dependencies_with_label: list[list[dict[str, Any]]] = [
+            [] for _ in range(n)
+        ]
+
+        dep_index: dict[tuple[int, int], int] = {}
+        for u, v, data in graph.edges(data=True):
+            src, dst = self.index[u], self.index[v]
+            dep = dep_index.get((src, dst))
+            if dep is None:
+                dep = len(self.dep_src)
+                dep_index[(src, dst)] = dep
+                self.dep_src.append(src)
+                self.dep_dst.append(dst)
+                self.in_deps[dst].append(dep)
+                self.out_deps[src].append(dep)
+
+            label = data.get("label", "")
+            by_label = self.out_deps_by_label[src].setdefault(label, [])
+            if dep not in by_label:
+                by_label.append(dep)
+
+        # keep the same ordering as `graph.in_edges(job_id)`
+        for job_id in self.ids:
+            deps = self.dependencies_with_label[self.index[job_id]]
+            for prev_job_id, _, data in graph.in_edges(job_id, data=True):
+                deps.append(
+                    {
+                        "job_id": prev_job_id,
+                        "input_name": data.get("target_label", ""),
+                        "multiple": data.get("multiple", False),
+                        "edge": data.get("label", ""),
+                    }
+                )
+
+        self.in_degree: list[int] = [len(deps) for deps in self.in_deps]
+        self.outputs: list[list[str]] = [list(d.keys()) for d in self.out_deps_by_label]
+
+        # precomputed loop bodies: descendants of each LOOP node and
+        # the dependencies that have to be re-armed when the loop restarts
+        self.loop_descendants: dict[int, frozenset[str]] = {}
+        self.loop_deps: dict[int, list[int]] = {}
+        # LOOP node -> its body in execution order, for the bodies that can
+        # run in a tight loop
+        self.loop_bodies: dict[int, list[int]] = {}
+        for i, cmd in enumerate(self.cmds):
+            if cmd == "LOOP":
+                self._compile_loop(i)
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.ids)
+
+    @property
+    def num_deps(self) -> int:
+        return len(self.dep_src)
+
+    def is_loop(self, node: int) -> bool:
+        return node in self.loop_deps
+
+    def descendants(self, node: int) -> set[int]:
+        seen: set[int] = set()
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            for dep in self.out_deps[current]:
+                dst = self.dep_dst[dep]
+                if dst not in seen:
+                    seen.add(dst)
+                    stack.append(dst)
+        seen.discard(node)
+        return seen
+
+    def ancestors(self, node: int) -> set[int]:
+        seen: set[int] = set()
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            for dep in self.in_deps[current]:
+                src = self.dep_src[dep]
+                if src not in seen:
+                    seen.add(src)
+                    stack.append(src)
+        seen.discard(node)
+        return seen
+
+    def is_display(self, node: int) -> bool:
+        """Whether the node only displays its inputs: a visualization nobody reads"""
+        return not self.out_deps[node] and self.paths[node].startswith(
+            DISPLAY_BLOCK_PATHS
+        )
+
+    def result_consumers(self, keep: set[str]) -> dict[str, int]:
+        """
+        Returns, for every job whose result can be dropped once read, how
+        many jobs read it each time it is produced.
+
+        Results are kept for the whole run when they are in `keep`, have no
+        consumer, or are read inside a loop body that does not produce them
+        again (the consumer runs once per iteration).
+        """
+        read_every_iteration: set[int] = set()
+        for loop, descendants in self.loop_descendants.items():
+            members = {self.index[job_id] for job_id in descendants}
+            members.add(loop)
+            for dep in range(self.num_deps):
+                src = self.dep_src[dep]
+                if self.dep_dst[dep] in members and src not in members:
+                    read_every_iteration.add(src)
+
+        consumers: dict[str, int] = {}
+        for node, deps in enumerate(self.out_deps):
+            job_id = self.ids[node]
+            if not deps or job_id in keep or node in read_every_iteration:
+                continue
+            consumers[job_id] = len(deps)
+        return consumers
+
+    def referenced_nodes(self) -> set[str]:
+        """Nodes referred to by a `NodeReference` parameter of another node"""
+        return {
+            str(ctrl.get("value"))
+            for ctrls in self.ctrls
+            for ctrl in ctrls.values()
+            if ctrl.get("type") == "NodeReference" and ctrl.get("value")
+        }
+
+    def _compile_loop(self, node: int):
+        descendants = self.descendants(node)
+        members = descendants | {node}
+        self.loop_descendants[node] = frozenset(self.ids[d] for d in descendants)
+        self.loop_deps[node] = [
+            dep
+            for dep in range(self.num_deps)
+            if self.dep_src[dep] in members and self.dep_dst[dep] in members
+        ]
+        body = self._compile_loop_body(node, descendants)
+        if body:
+            self.loop_bodies[node] = body
+
+    def _compile_loop_body(self, node: int, descendants: set[int]) -> list[int]:
+        """
+        Returns the blocks run at every iteration of the LOOP node in
+        execution order, or an empty list when the body cannot run in a
+        tight loop: it contains flow control or impure blocks, or reads a
+        block that is not done before the LOOP starts.
+        """
+        by_label = self.out_deps_by_label[node]
+        after_loop: set[int] = set()
+        for dep in by_label.get("end", []):
+            after_loop.add(self.dep_dst[dep])
+            after_loop |= self.descendants(self.dep_dst[dep])
+        body: set[int] = set()
+        for dep in by_label.get("body", []):
+            body.add(self.dep_dst[dep])
+            body |= self.descendants(self.dep_dst[dep])
+        body -= after_loop
+
+        before_loop = self.ancestors(node)
+        for member in body:
+            if (
+                self.cmds[member] in FLOW_CONTROL_BLOCKS
+                or self.paths[member].startswith(IMPURE_BLOCK_PATHS)
+                or len(self.outputs[member]) > 1
+            ):
+                return []
+            for dep in self.in_deps[member]:
+                src = self.dep_src[dep]
+                if src != node and src not in body and src not in before_loop:
+                    return []
+
+        # topological order, ties broken by node index like the task queue
+        remaining = {
+            member: sum(self.dep_src[dep] in body for dep in self.in_deps[member])
+            for member in body
+        }
+        ready = sorted(member for member, count in remaining.items() if count == 0)
+        order: list[int] = []
+        while ready:
+            member = ready.pop(0)
+            order.append(member)
+            for dep in self.out_deps[member]:
+                dst = self.dep_dst[dep]
+                if dst in remaining:
+                    remaining[dst] -= 1
+                    if remaining[dst] == 0:
+                        ready.append(dst)
+            ready.sort()
+        return order if len(order) == len(body) else []
+
+
+class DependencyCounter:
+    """
+    Mutable scheduling state on top of a CompiledFlowchart: which dependencies
+    are still pending and how many pending dependencies each node has left.
+    """
+
+    def __init__(self, compiled: CompiledFlowchart):
+        self.compiled = compiled
+        self.pending = bytearray(b"\x01") * compiled.num_deps
+        self.remaining: list[int] = list(compiled.in_degree)
+
+    def release(self, node: int, label: str) -> list[int]:
+        """
+        Releases the dependencies leaving `node` through edges labeled `label`.
+        Returns the targets that were released and have no dependencies left.
+        """
+        deps = self.compiled.out_deps_by_label[node].get(label)
+        if not deps:
+            return []
+        pending = self.pending
+        remaining = self.remaining
+        dep_dst = self.compiled.dep_dst
+        ready: list[int] = []
+        for dep in deps:
+            if pending[dep]:
+                pending[dep] = 0
+                dst = dep_dst[dep]
+                remaining[dst] -= 1
+                if remaining[dst] == 0:
+                    ready.append(dst)
+        return ready
+
+    def reset_loop(self, node: int):
+        """Re-arms every dependency inside the body of the given LOOP node."""
+        pending = self.pending
+        remaining = self.remaining
+        dep_dst = self.compiled.dep_dst
+        for dep in self.compiled.loop_deps[node]:
+            if not pending[dep]:
+                pending[dep] = 1
+                remaining[dep_dst[dep]] += 1
+
+    def pending_sources(self, node: int) -> list[int]:
+        return [
+            self.compiled.dep_src[dep]
+            for dep in self.compiled.in_deps[node]
+            if self.pending[dep]
+        ]
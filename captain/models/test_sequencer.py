@@ -119,6 +119,14 @@ class TestRootNode(BaseModel):
     type: str = Field("root", alias="type")
     children: List[TestSequenceElementNode] = Field(..., alias="children")
     identifiers: List[str]
+    # cap on the tests flagged `run_in_parallel` running at the same time
+    max_parallel: Optional[int] = Field(None, alias="maxParallel", gt=0)
+    # run the python and pytest tests in warm interpreters, spawned from the
+    # python of captain, instead of the python on the PATH, with these
+    # modules imported beforehand
+    use_interpreter_pool: bool = Field(False, alias="useInterpreterPool")
+    preload_modules: Optional[List[str]] = Field(None, alias="preloadModules")
+    test_timeout: Optional[float] = Field(None, alias="testTimeout", gt=0)
 
 
 class TestDiscoveryResponse(BaseModel):
@@ -2,41 +2,57 @@ import logging
 import os
 import time
 from collections import deque
-from copy import deepcopy
 from queue import Queue
-from typing import Any, cast
+from typing import Any
 
 import networkx as nx
-from flojoy import JobFailure, JobSuccess, get_next_directions
+from flojoy import JobFailure, JobService, JobSuccess, get_next_directions
 from flojoy.utils import clear_flojoy_memory  # for some reason, can't import from
 
-from captain.types.worker import JobInfo
+from captain.models.scheduler import CompiledFlowchart, DependencyCounter
+from captain.types.worker import FastLoop, JobInfo
 from captain.utils.logger import logger
+from captain.utils.run_trace import save_run_trace
 
 
 class Topology:
     """
     Holds information of the flowchart and the state of the topology.
     Used for running the flowchart and handles the logic.
+
+    The graph is compiled once into a `CompiledFlowchart` and the progress of
+    the run is tracked by a `DependencyCounter`, so the graph itself is never
+    mutated while running.
+
+    With `fast_loops`, the LOOP nodes whose body could be compiled are sent
+    to the workers along with their body (see `FastLoop`), and the body is
+    marked as done when the LOOP ends.
     """
 
-    # TODO: Properly type all the variables and maybe get rid of deepcopy?
-    # TODO: Remove unnecessary logger.debug statements
     def __init__(
         self,
         graph: nx.MultiDiGraph,
         jobset_id: str,
         node_delay: float = 0,
+        observe_blocks: list[str] | None = None,
+        fast_loops: bool = False,
     ):
-        self.working_graph: nx.MultiDiGraph = deepcopy(graph)
-        self.original_graph: nx.MultiDiGraph = deepcopy(graph)
+        self.original_graph: nx.MultiDiGraph = graph
+        self.compiled = CompiledFlowchart(graph)
+        self.counter = DependencyCounter(self.compiled)
         self.jobset_id = jobset_id
         self.node_delay = node_delay
+        self.observe_blocks = observe_blocks or []
+        # a block delay is meant to slow the run down, it disables fast loops
+        self.use_fast_loops = fast_loops and not node_delay
+        self.fast_loops: dict[str, FastLoop] = {}
         self.finished_jobs: set[str] = set()
         self.queued_jobs: set[str] = set()
         self.is_ci = os.getenv(key="CI", default=False)
         self.cancelled = False
         self.time_start = 0.0
+        # seconds spent in each phase of the pre job operation
+        self.pre_job_timings: dict[str, float] = {}
         self.finished = False
         self.loop_nodes = (
             list()
@@ -71,16 +87,26 @@ class Topology:
         Topology entry point function for producer
         """
         self.time_start = time.perf_counter()
+        self.set_result_consumers()
         next_jobs: list[str] = self.collect_ready_jobs()  # get nodes with in-degree 0
         self.run_jobs(next_jobs, task_queue)
 
+    def set_result_consumers(self):
+        """
+        Tells the job service how many jobs read each result, so workers can
+        drop a result as soon as its last consumer is done with it.
+        Results read through a NodeReference (e.g. FEEDBACK) and results of
+        observed blocks are kept until the end of the run.
+        """
+        keep = self.compiled.referenced_nodes().union(self.observe_blocks)
+        job_service = JobService()
+        for job_id, consumers in self.compiled.result_consumers(keep).items():
+            job_service.set_job_consumers(job_id, consumers)
+
     def collect_ready_jobs(self):
         next_jobs: list[str] = []
-        for job_id in cast(list[str], self.working_graph.nodes):
-            if (
-                job_id not in self.finished_jobs
-                and self.original_graph.in_degree(job_id) == 0
-            ):
+        for i, job_id in enumerate(self.compiled.ids):
+            if job_id not in self.finished_jobs and self.compiled.in_degree[i] == 0:
                 next_jobs.append(job_id)
         return next_jobs
 
@@ -89,15 +115,18 @@ class Topology:
             self.run_job(job_id, task_queue)
 
     def run_job(self, job_id: str, task_queue: Queue[Any]):
-        node = cast(dict[str, Any], self.working_graph.nodes[job_id])
+        i = self.compiled.index[job_id]
+        previous_jobs = self.compiled.dependencies_with_label[i]
 
-        previous_jobs = self.get_job_dependencies_with_label(job_id, original=True)
-
-        logger.debug(
-            f" enqueue job: {self.get_label(job_id)}, dependencies: {[self.get_label(dep_id.get('job_id', ''), original=True) for dep_id in previous_jobs]}"
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f" enqueue job: {self.get_label(job_id)}, dependencies: {[self.get_label(dep_id.get('job_id', '')) for dep_id in previous_jobs]}"
+            )
+            logger.debug(f"{job_id} queued at {time.time()}")
 
-        logger.debug(f"{job_id} queued at {time.time()}")
+        fast_loop = None
+        if self.use_fast_loops and i in self.compiled.loop_bodies:
+            fast_loop = self.get_fast_loop(job_id)
 
         # -- queue the job --
         task_queue.put(
@@ -105,16 +134,56 @@ class Topology:
                 job_id=job_id,
                 jobset_id=self.jobset_id,
                 iteration_id=job_id,
-                ctrls=node["ctrls"],
+                ctrls=self.compiled.ctrls[i],
                 previous_jobs=previous_jobs,
+                fast_loop=fast_loop,
             )
         )
         self.queued_jobs.add(job_id)
         # -------------------
 
-        if self.is_loop_node(job_id):
+        if self.compiled.is_loop(i):
             self.loop_nodes.append(job_id)
 
+    def get_fast_loop(self, job_id: str) -> FastLoop:
+        fast_loop = self.fast_loops.get(job_id)
+        if fast_loop is None:
+            compiled = self.compiled
+            body = compiled.loop_bodies[compiled.index[job_id]]
+            fast_loop = FastLoop(
+                body=[
+                    JobInfo(
+                        job_id=compiled.ids[node],
+                        jobset_id=self.jobset_id,
+                        iteration_id=compiled.ids[node],
+                        ctrls=compiled.ctrls[node],
+                        previous_jobs=compiled.dependencies_with_label[node],
+                    )
+                    for node in body
+                ],
+                display={
+                    compiled.ids[node] for node in body if compiled.is_display(node)
+                },
+                is_cancelled=self.is_cancelled,
+            )
+            self.fast_loops[job_id] = fast_loop
+        return fast_loop
+
+    def release_fast_loop_body(self, fast_loop: FastLoop) -> set[str]:
+        """
+        Marks the body of a fast loop as done, as after its last iteration,
+        and returns the nodes outside of the body that are ready to run
+        """
+        body = [job.job_id for job in fast_loop.body]
+        self.finished_jobs.update(body)
+        next_nodes: set[str] = set()
+        for job_id in body:
+            for direction in self.get_outputs(job_id):
+                next_nodes.update(
+                    self.release_dependencies_and_get_next(job_id, direction)
+                )
+        return next_nodes
+
     # also used for when the topology finishes
     def cancel(self):
         logger.debug("Topology cancelled")
@@ -138,14 +207,14 @@ class Topology:
             logger.debug("Received job, but skipping since topology is cancelled")
             return
 
-        time.sleep(self.node_delay)
+        if self.node_delay:
+            time.sleep(self.node_delay)
 
         job_id: str = job.node_id
         job_result = job.result
 
-        logger.debug(f"job {self.get_label(job_id)} is done and has been received.")
-        if job_id in self.queued_jobs:
-            self.queued_jobs.remove(job_id)
+        logger.debug(f"job {job_id} is done and has been received.")
+        self.queued_jobs.discard(job_id)
         if job_id in self.finished_jobs:
             logging.warning(
                 f"{job_id} HAS ALREADY BEEN PROCESSED, NOT SUPPOSED TO HAPPEN"
@@ -168,7 +237,7 @@ class Topology:
         process special instructions to scheduler
         """
 
-        logger.debug(f"processing job result for: {self.get_label(job_id)}")
+        logger.debug(f"processing job result for: {job_id}")
 
         if not success:
             logger.debug(f"{job_id} job failed")
@@ -179,6 +248,11 @@ class Topology:
         # process instruction to flow through specified directions
         next_nodes_from_dependencies: set[str] = set()
 
+        # the body of a fast loop was run by the worker along with the LOOP
+        fast_loop = self.fast_loops.get(job_id)
+        if fast_loop is not None and fast_loop.iterations:
+            next_nodes_from_dependencies.update(self.release_fast_loop_body(fast_loop))
+
         next_directions: list[str] | None = get_next_directions(job_result)
         # In this case, the node did not explicitly supply what
         # its output directions should be
@@ -192,28 +266,25 @@ class Topology:
         for direction in next_directions:
             if direction == "end" and self.loop_nodes:
                 self.loop_nodes.pop()
-            next_nodes = self.remove_edges_and_get_next(job_id, direction)
-            next_nodes_from_dependencies = next_nodes_from_dependencies.union(
-                next_nodes
+            next_nodes_from_dependencies.update(
+                self.release_dependencies_and_get_next(job_id, direction)
             )
 
         logger.debug(
-            "After removing edges of node, next nodes are: "
+            "After releasing dependencies of node, next nodes are: "
             + str(next_nodes_from_dependencies)
         )
 
         nodes_to_add: list[str] = []
 
         # -- verify if the flowchart is done running --
-        if (
-            self.queued_jobs.__len__() == 0
-            and next_nodes_from_dependencies.__len__() == 0
-        ):
+        if not self.queued_jobs and not next_nodes_from_dependencies:
             if not self.loop_nodes:
                 self.finished = True
                 logger.info(
                     f"FLOWCHART TOOK {time.perf_counter() - self.time_start} SECONDS TO COMPLETE"
                 )
+                save_run_trace(self.jobset_id)
                 self.cancel()
                 return
             else:
@@ -221,52 +292,43 @@ class Topology:
         # ---------------------------------------------
 
         if nodes_to_add:
-            logger.debug(
-                f"Restarting the following nodes: {[self.get_label(n_id, original=True) for n_id in nodes_to_add]}",
-            )
+            logger.debug(f"Restarting the following nodes: {nodes_to_add}")
         for node_id in nodes_to_add:
             self.restart(node_id)
 
         for node_id in nodes_to_add:
-            if (
-                self.working_graph.in_degree(node_id) == 0
-            ):  # check if no dependencies left for node
+            # check if no dependencies left for node
+            if self.counter.remaining[self.compiled.index[node_id]] == 0:
                 next_nodes_from_dependencies.add(node_id)
 
         return list(next_nodes_from_dependencies)
 
-    def remove_edges_and_get_next(self, job_id: str, label_direction: str = "default"):
+    def release_dependencies_and_get_next(
+        self, job_id: str, label_direction: str = "default"
+    ):
         """
-        this function removes the node edges and checks its successors
-        for new jobs. A new job is ready when a successor has no dependencies.
+        this function releases the dependencies that the node fulfills through
+        the given direction and checks its successors for new jobs.
+        A new job is ready when a successor has no dependencies left.
         """
         self.finished_jobs.add(job_id)
-        successors: list[str] = list(self.working_graph.successors(job_id))
-        self.remove_dependencies(job_id, label_direction)
+        ids = self.compiled.ids
         next_nodes = set()
-        for d_id in successors:
-            if d_id in self.finished_jobs:
-                continue
-            if self.working_graph.in_degree(d_id) == 0:
+        for d in self.counter.release(self.compiled.index[job_id], label_direction):
+            d_id = ids[d]
+            if d_id not in self.finished_jobs:
                 next_nodes.add(d_id)
         logger.debug("next nodes: " + str(next_nodes))
         return next_nodes
 
     def restart(self, job_id: str):
-        logger.debug(f" *** restarting job: {self.get_label(job_id, original=True)}")
+        logger.debug(f" *** restarting job: {job_id}")
         if self.loop_nodes:
             self.loop_nodes.pop()
-        graph = self.original_graph
-        sub_graph: nx.MultiDiGraph = graph.subgraph(
-            [job_id] + list(nx.descendants(graph, job_id))
-        )
-        original_edges = sub_graph.edges(data=True)
-        self.working_graph.add_edges_from(original_edges)
-        self.finished_jobs.remove(job_id)
-
-        for d_id in nx.descendants(self.working_graph, job_id):
-            if d_id in self.finished_jobs:
-                self.finished_jobs.remove(d_id)
+        i = self.compiled.index[job_id]
+        self.counter.reset_loop(i)
+        self.finished_jobs.discard(job_id)
+        self.finished_jobs.difference_update(self.compiled.loop_descendants[i])
 
     def finalizer(self):
         if self.finished:
@@ -274,58 +336,25 @@ class Topology:
 
     def mark_job_failure(self, job_id: str):
         self.finished_jobs.add(job_id)
-        logger.debug(f"job {self.get_label(job_id)} failed")
-
-    def get_cmd(self, job_id: str, original: bool = False) -> str:
-        graph = self.get_graph(original)
-        if graph.has_node(job_id):
-            return graph.nodes[job_id].get("cmd", job_id)
-        else:
-            logger.debug(
-                f"get_label: job_id {job_id} not found in original: {original}"
-            )
-        return job_id
-
-    def remove_dependencies(self, job_id: str, label: str = "default"):
-        edges = self.get_edges_by_label(job_id, label)
-        for edge in edges:
-            self.remove_dependency(edge[0], edge[1])
-
-    def get_edges_by_label(self, job_id: str, label: str) -> list[tuple[str, Any, Any]]:
-        edges = self.working_graph.edges(job_id, data=True)
-        edges = [
-            (s, t, data) for (s, t, data) in edges if data.get("label", "") == label
-        ]
-        return edges
-
-    def get_job_dependencies_with_label(
-        self, job_id: str, original: bool = True
-    ) -> list[dict[str, str]]:
-        graph = self.get_graph(original)
-        try:
-            deps = []
-            for prev_job_id, _, data in list(graph.in_edges(job_id, data=True)):
-                input_name = data.get("target_label", "")
-                multiple = data.get("multiple", False)
-                edge_label = data.get("label", "")
-                deps.append(
-                    {
-                        "job_id": prev_job_id,
-                        "input_name": input_name,
-                        "multiple": multiple,
-                        "edge": edge_label,
-                    }
-                )
-            logger.debug(f"deps: {deps}")
-            return deps
-        except Exception:
+        logger.debug(f"job {job_id} failed")
+
+    def get_cmd(self, job_id: str) -> str:
+        i = self.compiled.index.get(job_id)
+        if i is None:
+            logger.debug(f"get_cmd: job_id {job_id} not found")
+            return job_id
+        return self.compiled.cmds[i]
+
+    def get_job_dependencies_with_label(self, job_id: str) -> list[dict[str, Any]]:
+        i = self.compiled.index.get(job_id)
+        if i is None:
             return []
+        return list(self.compiled.dependencies_with_label[i])
 
     def get_input_info(
-        self, source_job_id: str, target_job_id: str, original: bool = False
+        self, source_job_id: str, target_job_id: str
     ) -> list[tuple[str, bool]]:
-        graph = self.get_graph(original)
-        edge_data = graph.get_edge_data(source_job_id, target_job_id)
+        edge_data = self.original_graph.get_edge_data(source_job_id, target_job_id)
         target_label = ""
         multiple = False
         dependencies = []
@@ -336,52 +365,40 @@ class Topology:
                 dependencies.append((target_label, multiple))
         return dependencies
 
-    def remove_dependency(self, job_id: str, succ_id: str):
-        if self.working_graph.has_edge(job_id, succ_id):
-            logger.debug(
-                f"  - remove dependency: {self.get_edge_label_string(job_id, succ_id)}"
-            )
-            while self.working_graph.has_edge(job_id, succ_id):
-                self.working_graph.remove_edge(job_id, succ_id)
-
     def get_edge_label_string(
         self,
         source_job_id: str,
         target_job_id: str,
         label: str | None = None,
-        original: bool = False,
     ):
-        graph = self.get_graph(original)
         if label is None:
-            edge_data = graph.get_edge_data(source_job_id, target_job_id)
-
-            label = "" if edge_data is None else edge_data.get("label", "")
-        s = self.get_label(source_job_id, original=original)
-        t = self.get_label(target_job_id, original=original)
+            edge_data = self.original_graph.get_edge_data(source_job_id, target_job_id)
+            label = (
+                ""
+                if not edge_data
+                else ",".join(e.get("label", "") for e in edge_data.values())
+            )
+        s = self.get_label(source_job_id)
+        t = self.get_label(target_job_id)
         return f"{s} -- {label} --> {t}"
 
     def get_job_dependencies(self, job_id: str) -> list[str]:
-        try:
-            return list(self.working_graph.predecessors(job_id))
-        except Exception:
+        """returns the jobs that `job_id` is still waiting on"""
+        i = self.compiled.index.get(job_id)
+        if i is None:
             return []
+        return [self.compiled.ids[d] for d in self.counter.pending_sources(i)]
 
-    def get_label(self, job_id: str, original: bool = False) -> str:
-        graph = self.get_graph(original)
-        if graph.has_node(job_id):
-            return graph.nodes[job_id].get("label", job_id)
-        else:
-            logger.debug(
-                f"get_label: job_id {job_id} not found in original: {original}"
-            )
-        return job_id
-
-    def get_graph(self, original: bool):
-        return self.original_graph if original else self.working_graph
+    def get_label(self, job_id: str) -> str:
+        i = self.compiled.index.get(job_id)
+        if i is None:
+            logger.debug(f"get_label: job_id {job_id} not found")
+            return job_id
+        return self.compiled.labels[i]
 
     # this function will get the maximum amount of independent nodes during the topological sort of the graph.
     # Will be used to determine how many workers to spawn
-    # TODO (priority very low): delete edges based on their label: currently, we are deleting all edges regardless of their labels.
+    # TODO (priority very low): release dependencies based on their label: currently, we are releasing all dependencies regardless of their labels.
     # So for example :
     # Suppose we have a graph with 3 nodes: LOOP, node1, node2 and end,
     # assuming LOOP is the only dependency of all the nodes,
@@ -389,10 +406,9 @@ class Topology:
     # we will spawn 3 workers instead of the logical amount which is 2.
     def get_maximum_workers(self, maximum_capacity: int = 1):
         max_independant = 0
-        temp_graph = deepcopy(self.original_graph)
-        queue = deque()
-        for job_id in self.collect_ready_jobs():
-            queue.append(job_id)
+        compiled = self.compiled
+        remaining = list(compiled.in_degree)
+        queue = deque(compiled.index[job_id] for job_id in self.collect_ready_jobs())
 
         while len(queue) > 0:
             n = len(queue)
@@ -400,30 +416,21 @@ class Topology:
             if max_independant >= maximum_capacity:
                 return maximum_capacity
             for _ in range(n):
-                job_id = queue.popleft()
-                successors = temp_graph.successors(job_id)
-                temp_graph.remove_node(job_id)
-                for neighbour in successors:
-                    if temp_graph.in_degree(neighbour) == 0:
+                node = queue.popleft()
+                for dep in compiled.out_deps[node]:
+                    neighbour = compiled.dep_dst[dep]
+                    remaining[neighbour] -= 1
+                    if remaining[neighbour] == 0:
                         queue.append(neighbour)
 
         return max_independant
 
     def get_outputs(self, job_id: str):
-        out = self.working_graph.out_edges(job_id)
-        return list(
-            set(
-                edge["label"]
-                for (u, v) in out
-                for edge in self.working_graph.get_edge_data(u, v).values()
-            )
-        )
+        return self.compiled.outputs[self.compiled.index[job_id]]
 
     def is_loop_node(self, job_id: str):
-        node = cast(
-            dict[str, Any], self.original_graph.nodes[job_id]
-        )  # working graph is modified after each node run so it's safe to use original graph to retrieve the node
-        return bool(node and node["cmd"] == "LOOP")
+        i = self.compiled.index.get(job_id)
+        return i is not None and self.compiled.is_loop(i)
 
     def cleanup(self):
         clear_flojoy_memory()
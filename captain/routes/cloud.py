@@ -1,16 +1,20 @@
+import asyncio
 import json
 import logging
-import requests
+import time
+import httpx
 from fastapi import APIRouter, Header, Response
+from flojoy import CloudOutbox, make_measurement_payload
 from flojoy.env_var import get_env_var, get_flojoy_cloud_url
 from flojoy_cloud import test_sequencer
 from pydantic import BaseModel, Field
-from typing import Annotated, Optional
+from typing import Annotated, Any, Awaitable, Callable, Hashable, Optional, TypeVar
 import datetime
-from typing import Literal
 import pandas as pd
 from functools import wraps
 
+T = TypeVar("T")
+
 
 # Utils ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
@@ -19,40 +23,96 @@ def utcnow_str() -> str:
     return datetime.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%fZ")
 
 
-def temporary_cache(*args, ttl=20):
-    """A decorator that ensures that the result of the function call
-    is cached for `ttl` seconds (default: 20).
+def ttl_cache(ttl: float = 20):
+    """A decorator that caches the result of an async function for each
+    arguments for `ttl` seconds (default: 20). Concurrent calls with the same
+    arguments share a single call, failed calls are not cached.
 
     Warning: The returned object is stored directly, mutating it also mutates the
     cached object. Make a copy if you want to avoid that.
     """
 
-    def decorator(func):
-        func.cache = None
-        func.cache_time = datetime.datetime.fromordinal(1)
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        cache: dict[Hashable, tuple[float, T]] = {}
+        pending: dict[Hashable, asyncio.Task[T]] = {}
 
         @wraps(func)
-        def inner(*args, **kwargs):
-            if (
-                (now := datetime.datetime.now()) - func.cache_time
-            ).total_seconds() > ttl:
-                func.cache = func(*args, **kwargs)
-                func.cache_time = now
-            return func.cache
-
+        async def inner(*args, **kwargs) -> T:
+            key = (args, tuple(sorted(kwargs.items())))
+            cached = cache.get(key)
+            if cached is not None and time.monotonic() - cached[0] <= ttl:
+                return cached[1]
+            task = pending.get(key)
+            if task is None or task.get_loop() is not asyncio.get_running_loop():
+                task = asyncio.ensure_future(func(*args, **kwargs))
+                pending[key] = task
+                task.add_done_callback(lambda task: store(key, task))
+            # a cancelled caller does not cancel the call of the others
+            return await asyncio.shield(task)
+
+        def store(key: Hashable, task: asyncio.Task[T]):
+            if pending.get(key) is task:
+                del pending[key]
+            if not task.cancelled() and task.exception() is None:
+                cache[key] = (time.monotonic(), task.result())
+
+        def cache_clear():
+            cache.clear()
+            pending.clear()
+
+        inner.cache_clear = cache_clear  # type: ignore
         return inner
 
-    if len(args) == 1 and callable(args[0]):
-        return decorator(args[0])
-    elif args:
-        raise ValueError("Must supply the decorator arguments as keywords.")
     return decorator
 
 
+CLOUD_TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+CLOUD_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_cloud_client() -> httpx.AsyncClient:
+    """
+    Returns the HTTP client shared by the cloud routes, its connections are
+    kept alive between requests. A client is bound to the event loop it was
+    first used on, a new one is made for another loop.
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(timeout=CLOUD_TIMEOUT, limits=CLOUD_LIMITS)
+        _client_loop = loop
+    return _client
+
+
+async def close_cloud_client():
+    global _client, _client_loop
+    if _client is not None and _client_loop is asyncio.get_running_loop():
+        await _client.aclose()
+    _client = _client_loop = None
+
+
+_outbox: CloudOutbox | None = None
+
+
+def get_cloud_outbox() -> CloudOutbox:
+    """The outbox of the uploads to Flojoy Cloud, see `captain.services.cloud_uploader`"""
+    global _outbox
+    if _outbox is None:
+        _outbox = CloudOutbox()
+    return _outbox
+
+
+PART_CACHE_TTL = 300
+
+
+@ttl_cache(ttl=PART_CACHE_TTL)
 async def get_cloud_part_variation(part_variation_id: str):
     logging.info("Querying part variation")
     url = get_flojoy_cloud_url() + "partVariation/" + part_variation_id
-    response = requests.get(url, headers=headers_builder())
+    response = await get_cloud_client().get(url, headers=await headers_builder())
     res = response.json()
     res["partVariationId"] = part_variation_id
     logging.info("Part variation retrieved: %s", res)
@@ -71,8 +131,8 @@ def error_response_builder(e: Exception) -> Response:
         return Response(status_code=500, content=json.dumps([]))
 
 
-@temporary_cache
-def headers_builder(with_workspace_id=True) -> dict:
+@ttl_cache()
+async def headers_builder(with_workspace_id=True) -> dict:
     workspace_secret = get_env_var("FLOJOY_CLOUD_WORKSPACE_SECRET")
     logging.info("Querying workspace current")
     if workspace_secret is None:
@@ -83,7 +143,7 @@ def headers_builder(with_workspace_id=True) -> dict:
     }
     if with_workspace_id:
         url = get_flojoy_cloud_url() + "workspace/"
-        response = requests.get(url, headers=headers)
+        response = await get_cloud_client().get(url, headers=headers)
         if response.status_code != 200:
             logging.error(f"Failed to get workspace id {url}: {response.text}")
             raise Exception("Failed to get workspace id")
@@ -159,24 +219,6 @@ class Session(BaseModel):
 
 
 MeasurementData = bool | pd.DataFrame | int | float
-MeasurementType = Literal["boolean", "dataframe", "scalar"]
-
-
-def make_payload(data: MeasurementData, unit: str):
-    match data:
-        case bool():
-            return {"type": "boolean", "value": data}
-        case pd.DataFrame():
-            value = {}
-            # Have to do this weird hack because df.todict('list') behaves strangely
-            for col_name, series in data.items():
-                value[col_name] = series.tolist()
-
-            return {"type": "dataframe", "value": value}
-        case int() | float():
-            return {"type": "scalar", "value": data, "unit": unit}
-        case _:
-            raise TypeError(f"Unsupported data type: {type(data)}")
 
 
 def get_measurement(m: Measurement) -> MeasurementData:
@@ -187,13 +229,27 @@ def get_measurement(m: Measurement) -> MeasurementData:
     return data
 
 
+@ttl_cache(ttl=PART_CACHE_TTL)
 async def get_part(part_id: str) -> Part:
     logging.info("Querying part")
     url = get_flojoy_cloud_url() + "part/" + part_id
-    response = requests.get(url, headers=headers_builder())
+    response = await get_cloud_client().get(url, headers=await headers_builder())
     return Part(**response.json())
 
 
+async def get_project_info(project: Project) -> dict[str, Any]:
+    part_var = await get_cloud_part_variation(project.part_variation_id)
+    part = await get_part(part_var.part_id)
+    return {
+        "label": project.name,
+        "value": project.id,
+        "part": part_var.model_dump(by_alias=True),
+        "repoUrl": project.repo_url,
+        "numCycles": project.num_cycles,
+        "productName": part.product_name,
+    }
+
+
 # Routes ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
 
@@ -208,24 +264,12 @@ async def get_cloud_projects():
     try:
         logging.info("Querying projects")
         url = get_flojoy_cloud_url() + "project/"
-        response = requests.get(url, headers=headers_builder())
+        response = await get_cloud_client().get(url, headers=await headers_builder())
         if response.status_code != 200:
             return Response(status_code=response.status_code, content=json.dumps([]))
         projects = [Project(**project_data) for project_data in response.json()]
-        projects_res = []
-        for p in projects:
-            part_var = await get_cloud_part_variation(p.part_variation_id)
-            part = await get_part(part_var.part_id)
-            projects_res.append(
-                {
-                    "label": p.name,
-                    "value": p.id,
-                    "part": part_var.model_dump(by_alias=True),
-                    "repoUrl": p.repo_url,
-                    "numCycles": p.num_cycles,
-                    "productName": part.product_name,
-                }
-            )
+        # the lookups of the projects run concurrently
+        projects_res = await asyncio.gather(*(get_project_info(p) for p in projects))
         return Response(
             status_code=200,
             content=json.dumps(projects_res),
@@ -243,7 +287,9 @@ async def get_cloud_stations(project_id: str):
         logging.info("Querying stations")
         url = get_flojoy_cloud_url() + "station/"
         querystring = {"projectId": project_id}
-        response = requests.get(url, headers=headers_builder(), params=querystring)
+        response = await get_cloud_client().get(
+            url, headers=await headers_builder(), params=querystring
+        )
         if response.status_code != 200:
             logging.error(f"Error getting stations from Flojoy Cloud: {response.text}")
             return Response(status_code=response.status_code, content=json.dumps([]))
@@ -261,7 +307,7 @@ async def get_cloud_variant_unit(part_var_id: str):
     try:
         logging.info(f"Querying unit for part {part_var_id}")
         url = f"{get_flojoy_cloud_url()}partVariation/{part_var_id}/unit"
-        response = requests.get(url, headers=headers_builder())
+        response = await get_cloud_client().get(url, headers=await headers_builder())
         if response.status_code != 200:
             logging.error(f"Error getting stations from Flojoy Cloud: {response.text}")
             return Response(status_code=response.status_code, content=json.dumps([]))
@@ -274,24 +320,24 @@ async def get_cloud_variant_unit(part_var_id: str):
 
 @router.post("/cloud/session/")
 async def post_cloud_session(_: Response, body: Session):
+    """
+    Queues the session for upload, it is posted in the background by
+    `captain.services.cloud_uploader` so the station does not wait for the cloud.
+    """
     try:
-        logging.info("Posting session")
-        url = get_flojoy_cloud_url() + "session/"
+        logging.info("Queuing session")
         payload = body.model_dump(by_alias=True)
         payload["createdAt"] = utcnow_str()
         for i, m in enumerate(payload["measurements"]):
-            m["data"] = make_payload(get_measurement(body.measurements[i]), m["unit"])
+            data = get_measurement(body.measurements[i])
+            m["data"] = make_measurement_payload(data, m["unit"])
             m["pass"] = m.pop("pass_")
             m["durationMs"] = int(m.pop("completionTime") * 1000)
             del m["unit"]
-        response = requests.post(url, json=payload, headers=headers_builder())
-        if response.status_code == 200:
-            return Response(status_code=200, content=json.dumps(response.json()))
-        else:
-            logging.error(
-                f"Failed to post session. Status code: {response.status_code}, Response: {response.text}"
-            )
-            return Response(status_code=response.status_code, content=json.dumps([]))
+        entry_id = await asyncio.to_thread(
+            get_cloud_outbox().enqueue, "session/", payload
+        )
+        return Response(status_code=202, content=json.dumps({"queued": entry_id}))
     except Exception as e:
         return error_response_builder(e)
 
@@ -304,9 +350,9 @@ async def get_user_info(secret: Annotated[str | None, Header()]):
         headers = (
             {"flojoy-workspace-personal-secret": secret}
             if secret
-            else headers_builder(with_workspace_id=False)
+            else await headers_builder(with_workspace_id=False)
         )
-        response = requests.get(url, headers=headers)
+        response = await get_cloud_client().get(url, headers=headers)
         if response.status_code == 200:
             return Response(status_code=200, content=json.dumps(response.json()))
         else:
@@ -325,7 +371,7 @@ async def get_cloud_health(url: Annotated[str | None, Header()]):
         if url is None:
             url = get_flojoy_cloud_url()
         url = url + "health/"
-        response = requests.get(url)
+        response = await get_cloud_client().get(url)
         if response.status_code == 200:
             return Response(status_code=200)
         else:
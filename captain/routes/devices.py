@@ -1,6 +1,11 @@
-from fastapi import APIRouter
-from captain.services.hardware import get_device_finder
+import asyncio
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from pydantic import BaseModel
+
+from captain.services.hardware import discover_devices
 from captain.types.devices import DeviceInfo
+from captain.utils.logger import logger
 
 router = APIRouter(tags=["devices"])
 
@@ -10,13 +15,60 @@ async def get_devices(
     include_nidaqmx_drivers: bool = False,
     include_nidmm_drivers: bool = False,
 ) -> dict[str, str] | DeviceInfo:
-    device_finder = get_device_finder()
-    return DeviceInfo(
-        cameras=device_finder.get_cameras(),
-        serialDevices=device_finder.get_serial_devices(),
-        visaDevices=device_finder.get_visa_devices(),
-        nidaqmxDevices=device_finder.get_nidaqmx_devices()
-        if include_nidaqmx_drivers
-        else [],
-        nidmmDevices=device_finder.get_nidmm_devices() if include_nidmm_drivers else [],
+    return await discover_devices(include_nidaqmx_drivers, include_nidmm_drivers)
+
+
+@router.websocket("/devices/ws")
+async def stream_devices(
+    websocket: WebSocket,
+    include_nidaqmx_drivers: bool = False,
+    include_nidmm_drivers: bool = False,
+):
+    """
+    Same discovery as `/devices`, but each device is sent as soon as it is
+    found: `{"type": "device", "kind": <DeviceInfo field>, "device": ...}`,
+    then `{"type": "done", "devices": <DeviceInfo>}` (or `{"type": "error"}`)
+    before closing.
+    """
+    await websocket.accept()
+    loop = asyncio.get_running_loop()
+    found: asyncio.Queue[tuple[str, BaseModel] | DeviceInfo | Exception] = (
+        asyncio.Queue()
     )
+
+    def on_found(kind: str, device: BaseModel):
+        loop.call_soon_threadsafe(found.put_nowait, (kind, device))
+
+    async def discover():
+        # the devices found are queued before the discovery returns
+        try:
+            found.put_nowait(
+                await discover_devices(
+                    include_nidaqmx_drivers, include_nidmm_drivers, on_found
+                )
+            )
+        except Exception as e:
+            found.put_nowait(e)
+
+    discovery = asyncio.create_task(discover())
+    try:
+        while True:
+            item = await found.get()
+            if isinstance(item, DeviceInfo):
+                await websocket.send_json(
+                    {"type": "done", "devices": item.model_dump()}
+                )
+                break
+            if isinstance(item, Exception):
+                logger.error(f"Device discovery failed: {item}")
+                await websocket.send_json({"type": "error", "error": str(item)})
+                break
+            kind, device = item
+            await websocket.send_json(
+                {"type": "device", "kind": kind, "device": device.model_dump()}
+            )
+        await websocket.close()
+    except WebSocketDisconnect:
+        logger.info("Device discovery client disconnected")
+    finally:
+        discovery.cancel()
@@ -1,12 +1,16 @@
 import asyncio
 
-from fastapi import APIRouter
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException
+from flojoy.dao import Dao
 
 from captain.types.flowchart import PostCancelFC, PostWFC
 from captain.utils.broadcast import Signaler
 from captain.utils.config import manager
 from captain.utils.flowchart_utils import prepare_jobs_and_run_fc
 from captain.utils.logger import logger
+from captain.utils.run_trace import get_run_trace
 
 router = APIRouter(tags=["flowchart"])
 
@@ -28,3 +32,20 @@ async def cancel_fc(req: PostCancelFC):
 def write_and_run_flowchart(request: PostWFC):
     # create message for front-end to indicate we are running pre-job operations
     asyncio.run(prepare_jobs_and_run_fc(request=request, manager=manager))
+
+
+@router.get("/memory", summary="memory usage of the job results")
+async def get_memory_stats():
+    return Dao.get_instance().get_memory_stats()
+
+
+@router.get("/runs/{jobset_id}/profile", summary="timings of a flowchart run")
+async def get_run_profile(
+    jobset_id: str, format: Literal["chrome", "summary"] = "chrome"
+):
+    trace = get_run_trace(jobset_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail=f"No trace for run {jobset_id}")
+    if format == "summary":
+        return trace.summary()
+    return trace.to_chrome_trace()
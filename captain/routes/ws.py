@@ -2,6 +2,7 @@ import json
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
+from captain.internal.ws_protocol import BINARY_PROTOCOL, TEXT_PROTOCOL
 from captain.utils.config import manager
 from captain.utils.logger import logger
 from captain.utils.status_codes import STATUS_CODES
@@ -15,7 +16,13 @@ async def websocket_endpoint(websocket: WebSocket, socket_id: str):
         logger.info("client {socket_id} is already connected!")
         return
 
-    await manager.ws.connect(websocket, socket_id=socket_id)
+    # clients opt in to binary frames with `?protocol=binary`
+    protocol = (
+        BINARY_PROTOCOL
+        if websocket.query_params.get("protocol") == BINARY_PROTOCOL
+        else TEXT_PROTOCOL
+    )
+    await manager.ws.connect(websocket, socket_id=socket_id, protocol=protocol)
     try:
         # send "Connection established" message to client
         await websocket.send_text(
@@ -40,3 +47,8 @@ async def websocket_endpoint(websocket: WebSocket, socket_id: str):
     except WebSocketDisconnect:
         await manager.ws.disconnect(socket_id=socket_id)
         logger.info(f"Client {socket_id} is disconnected")
+
+
+@router.get("/ws/stats", summary="counters of the websocket broadcast queues")
+async def websocket_stats():
+    return manager.ws.get_stats()
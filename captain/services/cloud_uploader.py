@@ -0,0 +1,89 @@
+import asyncio
+
+import httpx
+from flojoy import CloudOutbox, OutboxEntry
+from flojoy.cloud_outbox import retry_delay
+from flojoy.env_var import get_flojoy_cloud_url
+
+from captain.routes.cloud import (
+    SecretNotFound,
+    get_cloud_client,
+    get_cloud_outbox,
+    headers_builder,
+)
+from captain.utils.logger import logger
+
+"""
+Background upload of the Flojoy Cloud outbox.
+
+The entries are taken in batches of `BATCH_SIZE`, posted concurrently over
+the connections of the shared cloud client, and their state is updated in
+one transaction per batch. Rejected entries (4xx other than timeouts and
+rate limits) are kept as failed, the others are retried with a backoff.
+"""
+
+BATCH_SIZE = 16
+POLL_INTERVAL = 1.0
+# cloud status codes worth retrying, the other 4xx will fail again
+RETRY_STATUS = {408, 425, 429}
+
+
+async def _post(entry: OutboxEntry, headers: dict) -> httpx.Response | Exception:
+    url = get_flojoy_cloud_url() + entry.endpoint
+    try:
+        return await get_cloud_client().post(url, content=entry.body, headers=headers)
+    except httpx.HTTPError as e:
+        return e
+
+
+async def upload_batch(outbox: CloudOutbox) -> int:
+    """Uploads the entries due, returns how many were uploaded"""
+    entries = await asyncio.to_thread(outbox.due, BATCH_SIZE)
+    if not entries:
+        return 0
+    headers = await headers_builder()
+    responses = await asyncio.gather(*(_post(entry, headers) for entry in entries))
+
+    uploaded: list[int] = []
+    retry: dict[int, str] = {}
+    failed: dict[int, str] = {}
+    for entry, response in zip(entries, responses):
+        if isinstance(response, Exception):
+            retry[entry.id] = f"{type(response).__name__}: {response}"
+        elif response.is_success:
+            uploaded.append(entry.id)
+        elif response.is_client_error and response.status_code not in RETRY_STATUS:
+            failed[entry.id] = f"{response.status_code}: {response.text}"
+        else:
+            retry[entry.id] = f"{response.status_code}: {response.text}"
+
+    if uploaded:
+        await asyncio.to_thread(outbox.uploaded, uploaded)
+    if retry:
+        logger.warning(f"Retrying {len(retry)} cloud uploads: {retry}")
+        await asyncio.to_thread(outbox.retry, retry)
+    if failed:
+        logger.error(f"Flojoy Cloud rejected {len(failed)} uploads: {failed}")
+        await asyncio.to_thread(outbox.fail, failed)
+    return len(uploaded)
+
+
+async def run_cloud_uploader(outbox: CloudOutbox | None = None):
+    """Uploads the outbox until cancelled"""
+    outbox = outbox or get_cloud_outbox()
+    errors = 0
+    while True:
+        try:
+            uploaded = await upload_batch(outbox)
+            errors = 0
+        except SecretNotFound:
+            # nothing can be uploaded until the workspace secret is set
+            uploaded = 0
+        except Exception as e:
+            # e.g. the cloud is not reachable to get the workspace
+            errors += 1
+            logger.error(f"Error while uploading to Flojoy Cloud: {e}")
+            await asyncio.sleep(retry_delay(errors))
+            continue
+        if uploaded < BATCH_SIZE:
+            await asyncio.sleep(POLL_INTERVAL)
@@ -1,5 +1,7 @@
 from captain.internal.wsmanager import ConnectionManager
 from captain.utils.blocks_path import get_blocks_path
+from captain.utils.import_blocks import block_modules
+from captain.utils.manifest.manifest_cache import manifest_cache
 from captain.utils.logger import logger
 from watchfiles import awatch
 from pathlib import Path
@@ -22,6 +24,9 @@ class BlocksWatcher:
 
         async for change in awatch(*paths_to_watch, stop_event=stop_flag):
             logger.info(f"Detected {len(change)} file changes in {paths_to_watch}..")
+            changed_paths = [path for _, path in change]
+            block_modules.invalidate(changed_paths)
+            manifest_cache.invalidate(changed_paths)
 
             if self.ws.active_connections_map:
                 await self.ws.broadcast({"type": "manifest_update"})
@@ -0,0 +1,117 @@
+import importlib
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Callable
+
+from flojoy.shared_memory import dumps, loads
+
+from captain.utils.logger import logger
+
+"""
+Process pool backend for CPU-bound blocks.
+
+Worker threads keep fetching inputs, validating and posting results in the
+main process, only the body of blocks decorated with `@flojoy(cpu_bound=True)`
+is shipped to a pool of spawned python processes, so numpy/scipy heavy
+branches of a flowchart can run in parallel instead of fighting for the GIL.
+
+Large numpy arrays never go through the pipe: they are passed as handles to
+shared memory segments (see `flojoy.shared_memory`).
+"""
+
+
+# -- child process side --
+
+_module_mtimes: dict[str, float] = {}
+
+
+def _import_block_module(module_name: str):
+    module = importlib.import_module(module_name)
+    module_file = getattr(module, "__file__", None)
+    if module_file is None:
+        return module
+    mtime = os.path.getmtime(module_file)
+    previous = _module_mtimes.get(module_name)
+    if previous is not None and previous != mtime:
+        module = importlib.reload(module)
+    _module_mtimes[module_name] = mtime
+    return module
+
+
+def run_block_in_child(
+    module_name: str, func_name: str, sys_path: list[str], payload: bytes
+) -> bytes:
+    """Entry point executed inside the pool processes."""
+    if sys.path != sys_path:
+        sys.path[:] = sys_path
+    try:
+        args = loads(payload)
+        module = _import_block_module(module_name)
+        # the module attribute is the @flojoy wrapper, call the block itself
+        func = getattr(module, func_name).__wrapped__
+        result = func(**args)
+    except Exception as e:
+        # exceptions are not guaranteed to be picklable
+        raise ChildProcessError(f"{type(e).__name__}: {e}") from None
+    return dumps(result)
+
+
+# -- main process side --
+
+
+class BlockProcessPool:
+    """
+    Executes the body of CPU-bound blocks in a pool of processes.
+    An instance is passed as `executor` to the @flojoy wrappers by the Worker.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self.executor = ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=get_context("spawn")
+        )
+
+    def __call__(self, block: Callable[..., Any], args: dict[str, Any]) -> Any:
+        future = self.executor.submit(
+            run_block_in_child,
+            block.__module__,
+            block.__name__,
+            list(sys.path),
+            dumps(args),
+        )
+        return loads(future.result())
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool: BlockProcessPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_block_process_pool(max_workers: int) -> BlockProcessPool:
+    """
+    Returns the process pool shared by all runs, the processes are kept
+    alive between runs so the heavy imports of the blocks are paid once.
+    """
+    global _pool
+    max_workers = max(1, min(max_workers, os.cpu_count() or 1))
+    with _pool_lock:
+        if _pool is not None and _pool.max_workers != max_workers:
+            _pool.shutdown()
+            _pool = None
+        if _pool is None:
+            logger.info(f"Starting block process pool with {max_workers} processes")
+            _pool = BlockProcessPool(max_workers)
+        return _pool
+
+
+def shutdown_block_process_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
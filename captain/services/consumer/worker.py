@@ -1,18 +1,26 @@
+import time
 import uuid
 from queue import Queue
-from typing import Any, cast
+from typing import Any, Callable, cast
 
-from flojoy import JobFailure, JobService, JobSuccess
+from flojoy import JobFailure, JobService, JobSuccess, get_next_directions
+from flojoy.decimation import DecimationMethod, decimate_result
 from flojoy.flojoy_node_venv import PipInstallThread
+from flojoy.profiling import ProfilerMode
+from flojoy.tracing import Phase, record_phases
 
-from captain.types.worker import JobInfo, PoisonPill
+from captain.types.worker import FastLoop, JobInfo, PoisonPill
 from captain.utils.broadcast import Signaler
 from captain.utils.logger import logger
+from captain.utils.run_trace import get_run_trace
 
 """
 IMPORTANT NOTE: This class mimics the RQ Worker package. 
 """
 
+# seconds between two updates of the front-end during a fast loop
+FAST_LOOP_UPDATE_INTERVAL = 0.5
+
 
 class Worker:
     def __init__(
@@ -23,6 +31,12 @@ class Worker:
         observe_blocks: list[str],
         signaler: Signaler | None = None,  # signaler object to signal to the front-end
         node_delay: float = 0,
+        executor: Callable[[Callable[..., Any], dict[str, Any]], Any]
+        | None = None,  # runs the body of cpu_bound blocks (process pool)
+        max_plot_points: int = 0,  # points per plot trace sent to the front-end
+        plot_decimation: DecimationMethod = "lttb",
+        profile_blocks: list[str] | None = None,  # blocks run under the profiler
+        profiler: ProfilerMode = "sampling",
     ):
         self.task_queue = task_queue
         self.finish_queue = finish_queue
@@ -32,6 +46,11 @@ class Worker:
         self.job_service = JobService()
         self.uuid = uuid.uuid4()
         self.node_delay = node_delay
+        self.executor = executor
+        self.max_plot_points = max_plot_points
+        self.plot_decimation = plot_decimation
+        self.profile_blocks = profile_blocks or []
+        self.profiler = profiler
 
     async def run(self):
         logger.info(f"Worker {self.uuid} has started")
@@ -49,6 +68,7 @@ class Worker:
                 logger.error("Error in job: wrong arguments passed. Ignoring...")
                 continue
 
+            started_at = time.perf_counter()
             func = self.imported_functions.get(job.job_id, None)
             if func is None:
                 raise ValueError(
@@ -60,46 +80,179 @@ class Worker:
                     job.jobset_id, job.job_id, func.__name__
                 )
 
-            kwargs: dict[str, Any] = {
-                "ctrls": job.ctrls,
-                "previous_jobs": job.previous_jobs,
-                "observe_blocks": self.observe_blocks,
-                "jobset_id": job.jobset_id,
-                "node_id": job.job_id,
-                "job_id": job.iteration_id,
-            }
+            kwargs = self.get_kwargs(job)
 
             logger.debug("=" * 100)
             logger.debug(f"Executing job {job.job_id}, kwargs = {kwargs}")
 
-            response = func(**kwargs)
+            phases: list[Phase] = []
+            if job.fast_loop is not None:
+                loop_start = time.perf_counter()
+                response = await self.run_fast_loop(job, func, kwargs, job.fast_loop)
+                if response is None:
+                    # cancelled, nothing to report
+                    self.task_queue.task_done()
+                    continue
+                phases.append(("fast_loop", loop_start, time.perf_counter()))
+            else:
+                with record_phases(phases):
+                    response = func(**kwargs)
 
             match response:
                 case JobSuccess():
                     logger.debug(f"Job finished: {job.job_id}, status: ok")
-                    if self.signaler:
-                        # send results to frontend
-                        await self.signaler.signal_node_results(
-                            job.jobset_id, job.job_id, func.__name__, response.result
-                        )
+                    await self.signal_results(job, func.__name__, response, phases)
 
                 case JobFailure():
-                    logger.debug(f"Job finished: {job.job_id}, status: failed")
-                    logger.error(
-                        f"Node {func.__name__} failed! reason: {response.error}"
-                    )
+                    await self.fail(job, func.__name__, response)
 
-                    if self.signaler:
-                        # signal to frontend that the node has failed
-                        await self.signaler.signal_failed_nodes(
-                            job.jobset_id, job.job_id, func.__name__, response.error
-                        )
+            self.release_inputs(job)
 
-                    PipInstallThread.terminate_all()
-                    raise Exception(response.error)
+            trace = get_run_trace(job.jobset_id)
+            if trace is not None:
+                trace.add_job(
+                    job.job_id,
+                    func.__name__,
+                    job.queued_at,
+                    started_at,
+                    time.perf_counter(),
+                    phases,
+                )
 
             # put the job result in the queue for producer to process
             self.finish_queue.put(response)
             self.task_queue.task_done()
 
         logger.info(f"Worker {self.uuid} has finished")
+
+    def get_kwargs(self, job: JobInfo) -> dict[str, Any]:
+        kwargs: dict[str, Any] = {
+            "ctrls": job.ctrls,
+            "previous_jobs": job.previous_jobs,
+            "observe_blocks": self.observe_blocks,
+            "jobset_id": job.jobset_id,
+            "node_id": job.job_id,
+            "job_id": job.iteration_id,
+        }
+        if self.executor is not None:
+            kwargs["executor"] = self.executor
+        if job.job_id in self.profile_blocks:
+            kwargs["profile_blocks"] = self.profile_blocks
+            kwargs["profiler"] = self.profiler
+        return kwargs
+
+    async def signal_results(
+        self,
+        job: JobInfo,
+        name: str,
+        response: JobSuccess,
+        phases: list[Phase] | None = None,
+    ):
+        if not self.signaler:
+            return
+        # send results to frontend, the full resolution
+        # result stays in the job service
+        decimate_start = time.perf_counter()
+        result = decimate_result(
+            response.result, self.max_plot_points, self.plot_decimation
+        )
+        broadcast_start = time.perf_counter()
+        await self.signaler.signal_node_results(job.jobset_id, job.job_id, name, result)
+        if phases is not None:
+            phases.append(("decimate", decimate_start, broadcast_start))
+            phases.append(("broadcast", broadcast_start, time.perf_counter()))
+
+    async def fail(self, job: JobInfo, name: str, response: JobFailure):
+        logger.debug(f"Job finished: {job.job_id}, status: failed")
+        logger.error(f"Node {name} failed! reason: {response.error}")
+
+        if self.signaler:
+            # signal to frontend that the node has failed
+            await self.signaler.signal_failed_nodes(
+                job.jobset_id, job.job_id, name, response.error
+            )
+
+        PipInstallThread.terminate_all()
+        raise Exception(response.error)
+
+    def release_inputs(self, job: JobInfo):
+        # the inputs have been read, results without other
+        # consumers left can be dropped from memory
+        for prev_job_id in {prev["job_id"] for prev in job.previous_jobs}:
+            if self.job_service.release_job_result(prev_job_id):
+                logger.debug(f"Released result of {prev_job_id}")
+
+    async def run_fast_loop(
+        self,
+        job: JobInfo,
+        func: Callable[..., Any],
+        kwargs: dict[str, Any],
+        fast_loop: FastLoop,
+    ) -> JobSuccess | JobFailure | None:
+        """
+        Runs the LOOP job and its compiled body until the LOOP ends, returns
+        the last response of the LOOP, or None if the run was cancelled.
+        The results of the body are sent to the front-end at most every
+        FAST_LOOP_UPDATE_INTERVAL seconds and after the last iteration.
+        """
+        body: list[tuple[JobInfo, Callable[..., Any], dict[str, Any]]] = []
+        for body_job in fast_loop.body:
+            body_func = self.imported_functions.get(body_job.job_id, None)
+            if body_func is None:
+                raise ValueError(
+                    f"Function {body_job.job_id} not found in imported functions"
+                )
+            body.append((body_job, body_func, self.get_kwargs(body_job)))
+
+        fast_loop.iterations = 0
+        last_responses: dict[str, JobSuccess] = {}
+        # display blocks skipped since the last update
+        stale: set[str] = set()
+        next_update = time.perf_counter() + FAST_LOOP_UPDATE_INTERVAL
+        while True:
+            if fast_loop.is_cancelled():
+                return None
+            response = func(**kwargs)
+            if not isinstance(response, JobSuccess):
+                return response
+            if "body" not in (get_next_directions(response.result) or []):
+                break
+            self.release_inputs(job)
+
+            update = time.perf_counter() >= next_update
+            for body_job, body_func, body_kwargs in body:
+                if body_job.job_id in fast_loop.display and not update:
+                    stale.add(body_job.job_id)
+                    continue
+                body_response = body_func(**body_kwargs)
+                if not isinstance(body_response, JobSuccess):
+                    await self.fail(body_job, body_func.__name__, body_response)
+                self.release_inputs(body_job)
+                last_responses[body_job.job_id] = body_response
+            fast_loop.iterations += 1
+
+            if update:
+                stale.clear()
+                await self.signal_body_results(body, last_responses)
+                next_update = time.perf_counter() + FAST_LOOP_UPDATE_INTERVAL
+
+        if fast_loop.iterations:
+            # display the results of the last iteration
+            for body_job, body_func, body_kwargs in body:
+                if body_job.job_id in stale:
+                    body_response = body_func(**body_kwargs)
+                    if not isinstance(body_response, JobSuccess):
+                        await self.fail(body_job, body_func.__name__, body_response)
+                    last_responses[body_job.job_id] = body_response
+            await self.signal_body_results(body, last_responses)
+        return response
+
+    async def signal_body_results(
+        self,
+        body: list[tuple[JobInfo, Callable[..., Any], dict[str, Any]]],
+        responses: dict[str, JobSuccess],
+    ):
+        for body_job, body_func, _ in body:
+            response = responses.get(body_job.job_id)
+            if response is not None:
+                await self.signal_results(body_job, body_func.__name__, response)
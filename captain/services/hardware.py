@@ -1,50 +1,83 @@
+import asyncio
 import subprocess
 from sys import platform
 import os
+from typing import Callable, Optional
 import nidaqmx
 import nimodinst
 import cv2
 import pyvisa
 import serial.tools.list_ports
 import logging
+from pydantic import BaseModel
 from captain.types.devices import (
     CameraDevice,
+    DeviceInfo,
     SerialDevice,
     VISADevice,
     NIDAQmxDevice,
     NIDMMDevice,
 )
+from captain.utils.device_probe import PROBE_TIMEOUT, ProbeCache, probe_concurrently
 
-__all__ = ["get_device_finder"]
+__all__ = ["get_device_finder", "discover_devices"]
+
+# the answers of the VISA resources, by address
+visa_cache = ProbeCache()
+
+OnFound = Optional[Callable[[BaseModel], None]]
+
+
+def query_visa_device(rm: pyvisa.ResourceManager, addr: str) -> VISADevice | None:
+    # opening and querying share the timeout of the probe
+    timeout_ms = int(PROBE_TIMEOUT * 1000 / 2)
+    try:
+        device = rm.open_resource(addr, open_timeout=timeout_ms)
+        try:
+            device.timeout = timeout_ms
+            return VISADevice(
+                name=addr.split("::")[0],
+                address=addr,
+                description=device.query("*IDN?"),
+            )
+        finally:
+            device.close()
+    except (pyvisa.VisaIOError, serial.serialutil.SerialException):
+        return None
 
 
 class DefaultDeviceFinder:
-    def get_cameras(self) -> list[CameraDevice]:
+    def get_cameras(self, on_found: OnFound = None) -> list[CameraDevice]:
         """Returns a list of camera indices connected to the system."""
         env = os.getenv("ELECTRON_MODE", "dev")
 
         if env == "packaged" and "darwin" in platform:
             # TODO: Fix openCV permission issue on MacOS
             return []
-        i = 0
-        cameras = []
 
+        # one after the other and without timeout: opening a camera can take
+        # seconds (e.g. MSMF or DirectShow on Windows) and the indices are
+        # contiguous, the first one that does not open is the last
+        cameras = []
         while True:
+            i = len(cameras)
             camera = cv2.VideoCapture(i)
-            if not camera.read()[0]:
-                break
-            else:
-                cameras.append(i)
-            camera.release()
-            i += 1
+            try:
+                if not camera.read()[0]:
+                    break
+            finally:
+                camera.release()
+            cameras.append(CameraDevice(name=f"Camera {i}", id=i))
+            if on_found:
+                on_found(cameras[-1])
 
-        return [CameraDevice(name=f"Camera {i}", id=i) for i in cameras]
+        return cameras
 
-    def get_serial_devices(self) -> list[SerialDevice]:
+    def get_serial_devices(self, on_found: OnFound = None) -> list[SerialDevice]:
         """Returns a list of serial devices connected to the system."""
         ports = serial.tools.list_ports.comports()
 
-        return [
+        devices = [
             SerialDevice(
                 port=p.device,
                 description=p.description,
@@ -53,33 +86,21 @@ class DefaultDeviceFinder:
             )
             for p in ports
         ]
+        for device in devices if on_found else []:
+            on_found(device)
+        return devices
 
-    def get_visa_devices(self) -> list[VISADevice]:
+    def get_visa_devices(self, on_found: OnFound = None) -> list[VISADevice]:
         """Returns a list of VISA devices connected to the system."""
         rm = pyvisa.ResourceManager("@py")
-        devices = []
-        used_addrs = set()
-
-        for addr in rm.list_resources():
-            if addr in used_addrs:
-                continue
-            try:
-                device = rm.open_resource(addr)
-                devices.append(
-                    VISADevice(
-                        name=addr.split("::")[0],
-                        address=addr,
-                        description=device.query("*IDN?"),
-                    )
-                )
-                device.close()
-                used_addrs.add(addr)
-            except (pyvisa.VisaIOError, serial.serialutil.SerialException):
-                pass
-
-        return devices
-
-    def get_nidaqmx_devices(self) -> list[NIDAQmxDevice]:
+        return probe_concurrently(
+            rm.list_resources(),
+            lambda addr: query_visa_device(rm, addr),
+            cache=visa_cache,
+            on_found=on_found,
+        )
+
+    def get_nidaqmx_devices(self, on_found: OnFound = None) -> list[NIDAQmxDevice]:
         """Returns a list of NI-DAQmx devices connected to the system."""
         try:
             system = nidaqmx.system.System.local()
@@ -115,6 +136,8 @@ class DefaultDeviceFinder:
                 devices += [extract_device(line, device) for line in device.di_ports]
                 devices += [extract_device(line, device) for line in device.do_ports]
             logging.info(f"Devices found are: {devices}")
+            for device in devices if on_found else []:
+                on_found(device)
             return devices
         except nidaqmx.errors.DaqNotFoundError as e:
             logging.warn(f"NI-DAQmx driver not installed - {e}")
@@ -122,7 +145,7 @@ class DefaultDeviceFinder:
             logging.error(f"Error in get_nidaqmx_devices: {e}")
         return []
 
-    def get_nidmm_devices(self) -> list[NIDMMDevice]:
+    def get_nidmm_devices(self, on_found: OnFound = None) -> list[NIDMMDevice]:
         """Returns a list of NI-DAQmx devices connected to the system."""
 
         def extract_device(device) -> NIDMMDevice:
@@ -139,7 +162,8 @@ class DefaultDeviceFinder:
                     devices += [extract_device(device)]
 
             logging.info(f"Devices found are: {devices}")
-
+            for device in devices if on_found else []:
+                on_found(device)
             return devices
         except Exception as e:
             logging.error(f"Error in get_nidmm_devices: {e}")
@@ -147,9 +171,9 @@ class DefaultDeviceFinder:
 
 
 class MacDeviceFinder(DefaultDeviceFinder):
-    def get_visa_devices(self) -> list[VISADevice]:
+    def get_visa_devices(self, on_found: OnFound = None) -> list[VISADevice]:
         rm = pyvisa.ResourceManager("@py")
-        devices = []
+        addrs = []
 
         for device in os.popen("arp -a"):
             ip = device.split(maxsplit=4)[1].strip("()").split(".")
@@ -158,33 +182,24 @@ class MacDeviceFinder(DefaultDeviceFinder):
             )
             if not valid_addr:
                 continue
+            addrs.append(f"TCPIP::169.254.{ip[2]}.{ip[3]}::INSTR")
 
-            addr = f"TCPIP::169.254.{ip[2]}.{ip[3]}::INSTR"
-            try:
-                inst = rm.open_resource(addr)
-                devices.append(
-                    VISADevice(
-                        name=addr.split("::")[0],
-                        address=addr,
-                        description=inst.query("*IDN?"),
-                    )
-                )
-
-                inst.close()
-            except pyvisa.VisaIOError:
-                pass
-
-        return devices
+        return probe_concurrently(
+            addrs,
+            lambda addr: query_visa_device(rm, addr),
+            cache=visa_cache,
+            on_found=on_found,
+        )
 
 
 class LinuxDeviceFinder(DefaultDeviceFinder):
-    def get_cameras(self) -> list[CameraDevice]:
+    def get_cameras(self, on_found: OnFound = None) -> list[CameraDevice]:
         command = r"v4l2-ctl --list-devices | grep -A1 -P '^[^\s-][^:]+'"
         result = subprocess.run(command, shell=True, text=True, stdout=subprocess.PIPE)
 
         # fall back to OpenCV if v4l2-ctl is not installed
         if result.returncode != 0:
-            return super().get_cameras()
+            return super().get_cameras(on_found)
 
         # filter out empty lines
         lines = list(filter(None, result.stdout.split("\n")))
@@ -196,7 +211,8 @@ class LinuxDeviceFinder(DefaultDeviceFinder):
             CameraDevice(name=lines[i].strip(), id=lines[i + 1].strip())
             for i in range(len(lines) // 2)
         ]
-
+        for camera in cameras if on_found else []:
+            on_found(camera)
         return cameras
 
 
@@ -208,3 +224,37 @@ def get_device_finder():
             return LinuxDeviceFinder()
         case _:
             return DefaultDeviceFinder()
+
+
+async def discover_devices(
+    include_nidaqmx_drivers: bool = False,
+    include_nidmm_drivers: bool = False,
+    on_found: Optional[Callable[[str, BaseModel], None]] = None,
+) -> DeviceInfo:
+    """
+    Looks for every kind of device at the same time, in threads so the event
+    loop keeps serving the other requests. `on_found(kind, device)` is called
+    from these threads with each device as soon as it is found, `kind` being
+    the field of `DeviceInfo` it belongs to.
+    """
+    device_finder = get_device_finder()
+    finders = {
+        "cameras": device_finder.get_cameras,
+        "serialDevices": device_finder.get_serial_devices,
+        "visaDevices": device_finder.get_visa_devices,
+        "nidaqmxDevices": device_finder.get_nidaqmx_devices
+        if include_nidaqmx_drivers
+        else None,
+        "nidmmDevices": device_finder.get_nidmm_devices
+        if include_nidmm_drivers
+        else None,
+    }
+
+    async def find(kind: str, finder: Optional[Callable[[OnFound], list]]):
+        if finder is None:
+            return []
+        callback = (lambda device: on_found(kind, device)) if on_found else None
+        return await asyncio.to_thread(finder, callback)
+
+    found = await asyncio.gather(*(find(kind, f) for kind, f in finders.items()))
+    return DeviceInfo(**dict(zip(finders, found)))
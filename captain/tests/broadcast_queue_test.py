@@ -0,0 +1,100 @@
+import asyncio
+import time
+
+from captain.internal.broadcast_queue import OutboundMessage, OutboundQueue
+
+
+def result_message(node_id: str, value: int):
+    return {
+        "type": "worker_response",
+        "jobsetId": "test",
+        "NODE_RESULTS": {"id": node_id, "result": value},
+    }
+
+
+def running_message(node_id: str):
+    return {"type": "worker_response", "jobsetId": "test", "RUNNING_NODE": node_id}
+
+
+def status_message(status: str):
+    return {"type": "worker_response", "jobsetId": "test", "SYSTEM_STATUS": status}
+
+
+def test_messages_are_coalesced():
+    queue = OutboundQueue(send=None, max_pending_results=10)  # type: ignore
+    queue.put(OutboundMessage(status_message("running")))
+    for i in range(5):
+        queue.put(OutboundMessage(running_message(f"node-{i}")))
+        queue.put(OutboundMessage(result_message(f"node-{i % 2}", i)))
+    queue.put(OutboundMessage(status_message("done")))
+
+    pending = [m.message for m in queue.pending.values()]
+    assert pending[0] == status_message("running")
+    assert pending[-1] == status_message("done")
+    assert running_message("node-4") in pending
+    assert result_message("node-0", 4) in pending
+    assert result_message("node-1", 3) in pending
+    assert len(pending) == 5
+    assert queue.stats()["coalesced"] == 7
+
+
+def test_results_are_never_dropped():
+    queue = OutboundQueue(send=None, max_pending_results=3)  # type: ignore
+    for i in range(5):
+        queue.put(OutboundMessage(result_message(f"node-{i}", i)))
+    queue.put(OutboundMessage({"type": "worker_response", "FAILED_NODES": {"a": 1}}))
+
+    ids = [
+        m.message["NODE_RESULTS"]["id"]
+        for m in queue.pending.values()
+        if "NODE_RESULTS" in m.message
+    ]
+    # the latest result of a node may be its final one
+    assert ids == [f"node-{i}" for i in range(5)]
+    assert queue.stats()["pending"] == 6
+
+
+def test_backlog_is_sent_without_waiting_for_the_next_frame():
+    sent = []
+
+    async def send(message: OutboundMessage):
+        sent.append(message.message)
+
+    async def run():
+        queue = OutboundQueue(send, max_frame_rate=1, max_pending_results=2)
+        queue.start()
+        queue.put(OutboundMessage(status_message("running")))
+        await asyncio.sleep(0.05)
+        # the first frame was sent, the next one is due in a second
+        start = time.perf_counter()
+        for i in range(5):
+            queue.put(OutboundMessage(result_message(f"node-{i}", i)))
+        await queue.flush()
+        elapsed = time.perf_counter() - start
+        queue.stop()
+        return queue.stats(), elapsed
+
+    stats, elapsed = asyncio.run(run())
+    assert elapsed < 0.5
+    assert sent[1:] == [result_message(f"node-{i}", i) for i in range(5)]
+    assert stats["backlogged_frames"] == 1
+
+
+def test_sender_delivers_in_order():
+    sent = []
+
+    async def send(message: OutboundMessage):
+        sent.append(message.message)
+
+    async def run():
+        queue = OutboundQueue(send, max_frame_rate=1000)
+        queue.start()
+        for i in range(3):
+            queue.put(OutboundMessage(status_message(str(i))))
+        await queue.flush()
+        queue.stop()
+        return queue.stats()
+
+    stats = asyncio.run(run())
+    assert sent == [status_message(str(i)) for i in range(3)]
+    assert stats["sent"] == 3 and stats["pending"] == 0
@@ -0,0 +1,190 @@
+import asyncio
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from flojoy import CloudOutbox
+
+from captain.routes import cloud
+from captain.services import cloud_uploader
+
+NUM_PROJECTS = 8
+LATENCY = 0.2
+
+CREATED = {"createdAt": "2024-01-01", "workspaceId": "workspace"}
+
+
+class StubCloud(BaseHTTPRequestHandler):
+    hits: Counter = Counter()
+    posted: list[dict] = []
+    # status codes of the next posts, then 200
+    post_status: list[int] = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        status = self.post_status.pop(0) if self.post_status else 200
+        if status == 200:
+            self.posted.append(body)
+        self.send_response(status)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def do_GET(self):
+        kind, _, item = self.path.strip("/").partition("/")
+        self.hits[kind] += 1
+        time.sleep(LATENCY)
+        match kind:
+            case "workspace":
+                body = [{"id": "workspace"}]
+            case "project":
+                body = [
+                    {
+                        **CREATED,
+                        "id": f"project-{i}",
+                        "name": f"Project {i}",
+                        "updatedAt": None,
+                        # two projects per part variation
+                        "partVariationId": f"variation-{i // 2}",
+                        "repoUrl": None,
+                        "numCycles": 1,
+                    }
+                    for i in range(NUM_PROJECTS)
+                ]
+            case "partVariation":
+                body = {
+                    **CREATED,
+                    "id": item,
+                    "partId": "part",
+                    "partNumber": item,
+                    "description": "",
+                }
+            case "part":
+                body = {
+                    **CREATED,
+                    "id": item,
+                    "name": "Part",
+                    "productName": "Product",
+                    "description": "",
+                }
+            case _:
+                self.send_response(404)
+                self.end_headers()
+                return
+        content = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_cloud(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubCloud)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    monkeypatch.setattr(cloud, "get_flojoy_cloud_url", lambda: url)
+    monkeypatch.setattr(cloud_uploader, "get_flojoy_cloud_url", lambda: url)
+    monkeypatch.setattr(cloud, "get_env_var", lambda _: "secret")
+    StubCloud.hits.clear()
+    StubCloud.posted.clear()
+    StubCloud.post_status.clear()
+    for cached in [
+        cloud.headers_builder,
+        cloud.get_part,
+        cloud.get_cloud_part_variation,
+    ]:
+        cached.cache_clear()  # type: ignore
+    yield StubCloud.hits
+    server.shutdown()
+    server.server_close()
+
+
+def test_projects_are_fetched_concurrently_and_cached(stub_cloud):
+    async def get_projects_twice():
+        start = time.perf_counter()
+        response = await cloud.get_cloud_projects()
+        elapsed = time.perf_counter() - start
+        await cloud.get_cloud_projects()
+        await cloud.close_cloud_client()
+        return response, elapsed
+
+    response, elapsed = asyncio.run(get_projects_twice())
+    assert response.status_code == 200
+    projects = json.loads(response.body)
+    assert [p["value"] for p in projects] == [
+        f"project-{i}" for i in range(NUM_PROJECTS)
+    ]
+    assert projects[3]["part"]["partVariationId"] == "variation-1"
+    assert projects[3]["productName"] == "Product"
+
+    # workspace, projects, part variations and part, one after the other;
+    # 2 * NUM_PROJECTS + 2 round trips when sequential
+    assert elapsed < 6 * LATENCY
+    # the lookups are shared by the projects and by the second call
+    assert stub_cloud == {
+        "workspace": 1,
+        "project": 2,
+        "partVariation": NUM_PROJECTS // 2,
+        "part": 1,
+    }
+
+
+def test_ttl_cache_does_not_keep_failures():
+    calls = []
+
+    @cloud.ttl_cache(ttl=60)
+    async def lookup(key: str):
+        calls.append(key)
+        if len(calls) == 1:
+            raise ValueError("unavailable")
+        return key.upper()
+
+    async def run():
+        with pytest.raises(ValueError):
+            await lookup("a")
+        results = await asyncio.gather(lookup("a"), lookup("a"), lookup(key="a"))
+        return results + [await lookup("a")]
+
+    assert asyncio.run(run()) == ["A"] * 4
+    # the failure, then one call per distinct arguments
+    assert calls == ["a", "a", "a"]
+
+
+def test_sessions_are_queued_then_uploaded(stub_cloud, tmp_path, monkeypatch):
+    outbox = CloudOutbox(str(tmp_path / "outbox.sqlite"))
+    monkeypatch.setattr(cloud, "_outbox", outbox)
+    monkeypatch.setattr("flojoy.cloud_outbox.RETRY_BASE_DELAY", 0.0)
+    StubCloud.post_status.extend([503, 400])
+    session = cloud.Session(
+        serialNumber="SN-1",
+        stationId="station",
+        integrity=True,
+        aborted=False,
+        notes="",
+        commitHash="",
+        measurements=[],
+    )
+
+    async def run():
+        responses = [await cloud.post_cloud_session(None, session) for _ in range(3)]  # type: ignore
+        assert outbox.count() == 3
+        # the first post fails and is retried, the second is rejected
+        uploaded = [await cloud_uploader.upload_batch(outbox) for _ in range(2)]
+        await cloud.close_cloud_client()
+        return responses, uploaded
+
+    responses, uploaded = asyncio.run(run())
+    assert [r.status_code for r in responses] == [202] * 3
+    assert uploaded == [1, 1]
+    assert [body["serialNumber"] for body in StubCloud.posted] == ["SN-1"] * 2
+    assert outbox.count() == 0
+    assert outbox.count("failed") == 1
@@ -0,0 +1,26 @@
+from typing import get_args
+
+from flojoy.data_container import DCType
+
+from captain.benchmarks.data_container_benchmark import (
+    benchmark_data_container,
+    data_container_factory,
+)
+
+
+# test that every DCType can be benchmarked
+def test_every_type_is_benchmarked():
+    for dc_type in get_args(DCType):
+        dc = data_container_factory(dc_type, 16)()
+        assert dc.type == dc_type
+        timings = benchmark_data_container(dc_type, 16, repeat=1, min_time=0)
+        assert timings["construct_us"] is not None
+        assert timings["copy_us"] is not None
+
+
+def test_serializations_are_skipped_above_the_limit():
+    timings = benchmark_data_container(
+        "OrderedPair", 100, max_serialized=10, repeat=1, min_time=0
+    )
+    assert "json_us" not in timings
+    assert "plotly_us" not in timings
@@ -0,0 +1,52 @@
+import threading
+import time
+
+from captain.utils.device_probe import ProbeCache, probe_concurrently
+
+
+def test_resources_are_probed_concurrently_and_cached():
+    probed = []
+    lock = threading.Lock()
+
+    def probe(addr: str):
+        with lock:
+            probed.append(addr)
+        time.sleep(0.3)
+        # odd addresses are not instruments
+        return None if int(addr[-1]) % 2 else f"IDN {addr}"
+
+    addrs = [f"ASRL{i}" for i in range(10)]
+    cache = ProbeCache(ttl=60)
+    found = []
+    start = time.perf_counter()
+    devices = probe_concurrently(
+        addrs + addrs[:2], probe, cache=cache, on_found=found.append
+    )
+    assert time.perf_counter() - start < 1.5  # 3s one after the other
+    assert devices == [f"IDN ASRL{i}" for i in range(0, 10, 2)]
+    assert sorted(found) == devices
+    assert sorted(probed) == sorted(addrs)
+
+    # only the new resource is probed, the answers and non-answers are cached
+    probed.clear()
+    devices = probe_concurrently(addrs + ["ASRL10"], probe, cache=cache)
+    assert probed == ["ASRL10"]
+    assert devices[-1] == "IDN ASRL10"
+
+
+def test_slow_resources_are_skipped():
+    def probe(addr: str):
+        if addr == "slow":
+            time.sleep(2)
+        if addr == "broken":
+            raise OSError("no such device")
+        return addr
+
+    cache = ProbeCache()
+    start = time.perf_counter()
+    devices = probe_concurrently(["a", "slow", "broken", "b"], probe, 0.2, cache)
+    assert time.perf_counter() - start < 1.5
+    assert devices == ["a", "b"]
+    assert cache.get("broken") == (True, None)
+    # it may answer next time
+    assert cache.get("slow") == (False, None)
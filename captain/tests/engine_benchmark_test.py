@@ -0,0 +1,63 @@
+from captain.benchmarks.baseline import compare_results
+from captain.benchmarks.engine_benchmark import METRICS, run_engine
+from captain.benchmarks.scheduler_benchmark import simulate_run
+from captain.benchmarks.synthetic_graphs import (
+    conditional_flowchart,
+    loop_flowchart,
+    make_edge,
+)
+from captain.models.topology import Topology
+from captain.utils.flowchart_utils import flowchart_to_nx_graph
+
+
+# test that the producer/worker threads run the same jobs as the simulation
+def test_engine_runs_synthetic_flowcharts():
+    for flowchart in [
+        loop_flowchart(body_length=2, num_loops=5, depth=2),
+        conditional_flowchart(num_loops=4, branch_length=2),
+    ]:
+        graph = flowchart_to_nx_graph(flowchart)
+        expected = simulate_run(Topology(graph=graph, jobset_id="test"))
+        run = run_engine(graph, workers=2, timeout=30)
+        assert run.jobs == len(expected)
+        assert len(run.latencies) == run.jobs
+
+
+# test that fast loops run the same flowcharts with fewer queued jobs
+def test_engine_runs_fast_loops():
+    flowchart = loop_flowchart(body_length=2, num_loops=5)
+    # read after the loop, the body is released when the loop ends
+    flowchart["edges"].append(make_edge("NOOP-0-0-1", "NOOP-end-0"))
+    run = run_engine(flowchart_to_nx_graph(flowchart), timeout=30, fast_loops=True)
+    # source, LOOP and end
+    assert run.jobs == 3
+
+    # only the inner loop is compiled, the conditional body is not
+    for flowchart, compiled in [
+        (loop_flowchart(body_length=2, num_loops=5, depth=2), True),
+        (conditional_flowchart(num_loops=4, branch_length=2), False),
+    ]:
+        graph = flowchart_to_nx_graph(flowchart)
+        run = run_engine(graph, workers=2, timeout=30, fast_loops=True)
+        expected = simulate_run(Topology(graph=graph, jobset_id="test"))
+        assert (run.jobs < len(expected)) == compiled
+
+
+def test_conditional_branches_alternate():
+    graph = flowchart_to_nx_graph(conditional_flowchart(num_loops=4, branch_length=1))
+    executed = simulate_run(Topology(graph=graph, jobset_id="test"))
+    assert executed.count("NOOP-true-0") == 2
+    assert executed.count("NOOP-false-0") == 2
+    assert executed[-1] == "NOOP-end"
+
+
+def test_regressions_are_reported_beyond_the_tolerance():
+    baseline = {"loop": {"engine_jobs_per_second": 1000.0, "latency_p95_ms": 1.0}}
+    assert compare_results(baseline, baseline, METRICS, 0.1) == []
+    slower = {"loop": {"engine_jobs_per_second": 800.0, "latency_p95_ms": 1.05}}
+    regressions = compare_results(slower, baseline, METRICS, 0.1)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("loop.engine_jobs_per_second")
+    # sub-millisecond changes of the latency are noise
+    noisy = {"loop": {"latency_p95_ms": 1.09}}
+    assert compare_results(noisy, baseline, METRICS, 0.01) == []
@@ -0,0 +1,35 @@
+import os
+import sys
+
+from captain.utils.import_blocks import BlockModuleCache
+
+
+def test_block_modules_are_reloaded_only_when_changed(tmp_path, monkeypatch):
+    package = tmp_path / "cached_blocks"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    block = package / "BLOCK.py"
+    block.write_text("LOADS = []\nLOADS.append(1)\nVALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    cache = BlockModuleCache()
+    try:
+        module = cache.get("cached_blocks.BLOCK")
+        assert cache.get("cached_blocks.BLOCK") is module
+        assert module.LOADS == [1]
+
+        # same content with a new mtime is not reloaded
+        stat = os.stat(block)
+        os.utime(block, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        cache.get("cached_blocks.BLOCK")
+        assert module.LOADS == [1]
+
+        block.write_text("LOADS = []\nLOADS.append(1)\nVALUE = 22\n")
+        assert cache.get("cached_blocks.BLOCK").VALUE == 22
+
+        cache.invalidate([str(package / "helper.py")])
+        cache.get("cached_blocks.BLOCK")
+        assert cache.stats() == {"modules": 1, "hits": 2, "reloads": 2}
+    finally:
+        for name in ("cached_blocks.BLOCK", "cached_blocks"):
+            sys.modules.pop(name, None)
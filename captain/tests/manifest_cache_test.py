@@ -0,0 +1,52 @@
+import os
+import shutil
+
+import pytest
+
+from captain.utils.manifest import manifest_cache as cache_module
+from captain.utils.manifest.generate_manifest import generate_manifest
+from captain.utils.manifest.manifest_cache import ManifestCache
+
+TEST_NODES_PATH = os.path.join(os.getcwd(), "tests", "manifest_test_nodes")
+
+
+@pytest.mark.usefixtures("reload_flojoy")
+def test_manifests_are_parsed_once(tmp_path, monkeypatch):
+    block = tmp_path / "basic.py"
+    shutil.copy(os.path.join(TEST_NODES_PATH, "basic.py"), block)
+    cache_file = str(tmp_path / "cache.json")
+
+    parsed: list[str] = []
+    build_manifest = cache_module.build_manifest
+
+    def counting_build_manifest(path: str):
+        parsed.append(path)
+        return build_manifest(path)
+
+    monkeypatch.setattr(cache_module, "build_manifest", counting_build_manifest)
+
+    cache = ManifestCache(cache_file)
+    manifest = cache.get_many([str(block)])[str(block)]
+    assert manifest["key"] == "BASIC"
+    manifest["type"] = "changed by the caller"
+
+    # served from the cache file by a new instance, even after a touch
+    stat = os.stat(block)
+    os.utime(block, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    cache = ManifestCache(cache_file)
+    assert cache.get_many([str(block)])[str(block)]["type"] == "TEST_TYPE"
+    assert parsed == [str(block)]
+
+    block.write_text(block.read_text().replace("some_param", "other_param"))
+    assert "other_param" in cache.get_many([str(block)])[str(block)]["parameters"]
+    assert len(parsed) == 2
+    assert cache.stats() == {"blocks": 1, "hits": 1, "misses": 1}
+
+
+def test_missing_block_file_is_reported(tmp_path):
+    block_dir = tmp_path / "CATEGORY" / "BROKEN"
+    block_dir.mkdir(parents=True)
+    (block_dir / "README.md").write_text("no BROKEN.py")
+
+    with pytest.raises(ValueError, match="BROKEN.py"):
+        generate_manifest(str(tmp_path))
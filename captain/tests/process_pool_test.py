@@ -0,0 +1,90 @@
+import os
+
+import numpy as np
+import pytest
+from flojoy import JobFailure, JobService, JobSuccess, OrderedPair
+from flojoy.dao import Dao
+from flojoy.shared_memory import SHARED_ARRAY_MIN_BYTES as SHARED_MEMORY_THRESHOLD
+from flojoy.shared_memory import dumps, loads
+
+from captain.services.consumer.process_pool import BlockProcessPool
+
+from .test_apps.cpu_bound_blocks import FAIL, SQUARE
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = BlockProcessPool(max_workers=1)
+    yield pool
+    pool.shutdown()
+
+
+def test_large_arrays_roundtrip_through_shared_memory():
+    x = np.arange(SHARED_MEMORY_THRESHOLD, dtype=np.float64)
+    small = np.arange(10)
+    data = loads(dumps({"data": OrderedPair(x=x, y=x * 2), "small": small}))
+    assert isinstance(data["data"], OrderedPair)
+    np.testing.assert_array_equal(data["data"].y, x * 2)
+    np.testing.assert_array_equal(data["small"], small)
+
+
+def test_cpu_bound_block_runs_in_pool(pool: BlockProcessPool):
+    x = np.arange(SHARED_MEMORY_THRESHOLD, dtype=np.float64)
+    JobService().post_job_result("input", OrderedPair(x=x, y=x))
+    response = SQUARE(
+        node_id="SQUARE",
+        job_id="SQUARE",
+        jobset_id="test",
+        observe_blocks=[],
+        previous_jobs=[{"job_id": "input", "input_name": "default", "edge": "default"}],
+        executor=pool,
+    )
+    assert isinstance(response, JobSuccess)
+    result = JobService().get_job_result("SQUARE")
+    np.testing.assert_array_equal(result.y, x**2)
+    assert result.extra["pid"] != os.getpid()
+
+
+def test_block_failure_in_pool(pool: BlockProcessPool):
+    JobService().post_job_result("input", OrderedPair(x=[1], y=[1]))
+    response = FAIL(
+        node_id="FAIL",
+        job_id="FAIL",
+        jobset_id="test",
+        observe_blocks=[],
+        previous_jobs=[{"job_id": "input", "input_name": "default", "edge": "default"}],
+        executor=pool,
+    )
+    assert isinstance(response, JobFailure)
+    assert "expected failure" in response.error
+
+
+def test_results_stay_in_shared_memory(pool: BlockProcessPool):
+    dao = Dao.get_instance()
+    dao.enable_shared_results()
+    try:
+        x = np.arange(SHARED_MEMORY_THRESHOLD, dtype=np.float64)
+        JobService().post_job_result("input", OrderedPair(x=x, y=x))
+        response = SQUARE(
+            node_id="SQUARE",
+            job_id="SQUARE",
+            jobset_id="test",
+            observe_blocks=[],
+            previous_jobs=[
+                {"job_id": "input", "input_name": "default", "edge": "default"}
+            ],
+            executor=pool,
+        )
+        assert isinstance(response, JobSuccess)
+        result = JobService().get_job_result("SQUARE")
+        np.testing.assert_array_equal(result.y, x**2)
+        stats = dao.get_memory_stats()["shared_memory"]
+        # x is passed through by the block, only its y is a new segment
+        assert stats["segments"] == 3
+        assert stats["reused_arrays"] == 1
+        dao.delete_job("input")
+        assert dao.get_memory_stats()["shared_memory"]["segments"] == 2
+        dao.delete_job("SQUARE")
+        assert dao.get_memory_stats()["shared_memory"]["segments"] == 0
+    finally:
+        dao.enable_shared_results(False)
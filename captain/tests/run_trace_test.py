@@ -0,0 +1,52 @@
+import asyncio
+import json
+from queue import Queue
+
+import numpy as np
+from flojoy import JobService, OrderedPair
+
+from captain.services.consumer.worker import Worker
+from captain.types.worker import JobInfo, PoisonPill
+from captain.utils.run_trace import get_run_trace, start_run_trace
+
+from .test_apps.cpu_bound_blocks import SQUARE
+
+
+def test_worker_records_job_phases(tmp_path):
+    trace = start_run_trace("trace-test")
+    with trace.span("import_blocks", "pre_job"):
+        pass
+
+    JobService().post_job_result("input", OrderedPair(x=np.arange(10), y=np.ones(10)))
+    task_queue: Queue = Queue()
+    task_queue.put(
+        JobInfo(
+            job_id="SQUARE",
+            jobset_id="trace-test",
+            iteration_id="SQUARE",
+            previous_jobs=[
+                {"job_id": "input", "input_name": "default", "edge": "default"}
+            ],
+        )
+    )
+    task_queue.put(PoisonPill())
+    worker = Worker(task_queue, Queue(), {"SQUARE": SQUARE}, observe_blocks=[])
+    asyncio.run(worker.run())
+
+    assert get_run_trace("trace-test") is trace
+    summary = trace.summary()
+    assert set(summary["phase"]) == {
+        "fetch_inputs",
+        "block",
+        "validate",
+        "post_result",
+        "serialize",
+    }
+    assert summary["job"]["SQUARE"]["count"] == 1
+    assert summary["queue"]["queue_wait"]["count"] == 1
+    assert "import_blocks" in trace.durations("pre_job")
+
+    with open(trace.save(str(tmp_path))) as f:
+        chrome_trace = json.load(f)
+    phases = {event["ph"] for event in chrome_trace["traceEvents"]}
+    assert phases == {"M", "X", "b", "e"}
@@ -0,0 +1,14 @@
+import os
+
+import numpy as np
+from flojoy import OrderedPair, flojoy
+
+
+@flojoy(cpu_bound=True)
+def SQUARE(default: OrderedPair) -> OrderedPair:
+    return OrderedPair(x=default.x, y=np.square(default.y), extra={"pid": os.getpid()})
+
+
+@flojoy(cpu_bound=True)
+def FAIL(default: OrderedPair) -> OrderedPair:
+    raise ValueError("expected failure")
@@ -0,0 +1,167 @@
+import asyncio
+import time
+
+from captain.utils.config import ts_manager
+from captain.utils.test_sequencer.interpreter_pool import (
+    InterpreterPool,
+    shutdown_interpreter_pool,
+)
+from captain.utils.test_sequencer.run_test_sequence import run_test_sequence
+
+
+def make_test(tmp_path, name: str, code: str, run_in_parallel: bool = False):
+    path = tmp_path / f"{name}.py"
+    path.write_text(code)
+    return {
+        "type": "test",
+        "id": f"id-{name}",
+        "groupId": "group",
+        "path": str(path),
+        "testName": name,
+        "runInParallel": run_in_parallel,
+        "testType": "python",
+        "status": "pending",
+        "isSavedToCloud": False,
+        "exportToCloud": False,
+    }
+
+
+def run_sequence(monkeypatch, tree) -> list[dict]:
+    messages = []
+
+    async def broadcast(message):
+        messages.append(dict(message))
+
+    monkeypatch.setattr(ts_manager.ws, "broadcast", broadcast)
+    asyncio.run(run_test_sequence(tree, ts_manager))
+    return messages
+
+
+# test that consecutive parallel tests run at the same time and that the
+# conditional after them sees all their results
+def test_parallel_tests_run_concurrently(tmp_path, monkeypatch):
+    sleep = "import time\ntime.sleep(0.5)\n"
+    parallel = [
+        make_test(tmp_path, name, sleep + code, run_in_parallel=True)
+        for name, code in [("a", ""), ("b", ""), ("c", ""), ("d", "exit(1)\n")]
+    ]
+    tree = {
+        "type": "root",
+        "identifiers": ["a", "b", "c", "d"],
+        "maxParallel": 4,
+        "children": [
+            *parallel,
+            {
+                "type": "conditional",
+                "conditionalType": "if",
+                "role": "start",
+                "id": "if",
+                "groupId": "group",
+                "condition": "$a & $b & $c & !$d",
+                "main": [make_test(tmp_path, "yes", "")],
+                "else": [make_test(tmp_path, "no", "")],
+            },
+        ],
+    }
+
+    start = time.perf_counter()
+    messages = run_sequence(monkeypatch, tree)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 1.5  # 2s if run one after the other
+    done = {m["target_id"]: m["status"] for m in messages if m["state"] == "test_done"}
+    assert done == {
+        "id-a": "pass",
+        "id-b": "pass",
+        "id-c": "pass",
+        "id-d": "fail",
+        "id-yes": "pass",
+    }
+    assert messages[-1]["state"] == "test_set_done"
+
+
+def test_parallel_tests_respect_the_cap(tmp_path, monkeypatch):
+    sleep = "import time\ntime.sleep(0.3)\n"
+    tree = {
+        "type": "root",
+        "identifiers": [],
+        "maxParallel": 1,
+        "children": [
+            make_test(tmp_path, name, sleep, run_in_parallel=True)
+            for name in ["a", "b", "c"]
+        ],
+    }
+    start = time.perf_counter()
+    messages = run_sequence(monkeypatch, tree)
+    assert time.perf_counter() - start >= 0.9
+    assert [m["status"] for m in messages if m["state"] == "test_done"] == ["pass"] * 3
+
+
+def test_interpreter_pool_isolates_the_tests(tmp_path):
+    helper = tmp_path / "helper_module.py"
+    helper.write_text("calls = []\n")
+    test = tmp_path / "isolated.py"
+    test.write_text(
+        "import os, sys, helper_module\n"
+        "helper_module.calls.append(1)\n"
+        "assert helper_module.calls == [1], helper_module.calls\n"
+        "assert os.environ['FLOJOY_DATA_NAME'] == 'isolated'\n"
+        "os.environ['LEAKED'] = '1'\n"
+        "print('done')\n"
+        "sys.exit(int(sys.argv[0].endswith('isolated.py')) * 3)\n"
+    )
+    pool = InterpreterPool(size=1, preload=["numpy"])
+    try:
+
+        async def run(path: str, timeout: float | None = None):
+            env = {"FLOJOY_DATA_NAME": "isolated"}
+            return await pool.run("python", path, env, timeout)
+
+        for _ in range(2):
+            result = asyncio.run(run(str(test)))
+            assert result.returncode == 3, result.stderr.decode()
+            assert result.stdout == b"done\n"
+
+        slow = tmp_path / "slow.py"
+        slow.write_text("import time\ntime.sleep(10)\n")
+        result = asyncio.run(run(str(slow), timeout=0.5))
+        assert b"timed out" in result.stderr
+
+        crash = tmp_path / "crash.py"
+        crash.write_text("import os\nos._exit(7)\n")
+        assert asyncio.run(run(str(crash))).returncode == 7
+
+        # the interpreters killed above were replaced
+        assert asyncio.run(run(str(test))).returncode == 3
+        env_check = tmp_path / "env_check.py"
+        env_check.write_text("import os\nassert 'LEAKED' not in os.environ\n")
+        assert asyncio.run(run(str(env_check))).returncode == 0
+    finally:
+        pool.shutdown()
+
+
+def test_sequence_runs_in_interpreter_pool(tmp_path, monkeypatch):
+    export = (
+        "from flojoy_cloud import test_sequencer\n"
+        "test_sequencer.export(1.5)\n"
+        "assert test_sequencer.is_in_range(1.5)\n"
+    )
+    pytest_file = "def test_ok():\n    assert True\n"
+    tree = {
+        "type": "root",
+        "identifiers": [],
+        "useInterpreterPool": True,
+        "maxParallel": 2,
+        "preloadModules": ["flojoy_cloud.test_sequencer"],
+        "children": [
+            {**make_test(tmp_path, "export", export), "minValue": 1, "maxValue": 2},
+            {**make_test(tmp_path, "test_ok", pytest_file), "testType": "pytest"},
+        ],
+    }
+    try:
+        messages = run_sequence(monkeypatch, tree)
+    finally:
+        shutdown_interpreter_pool()
+    done = [m for m in messages if m["state"] == "test_done"]
+    assert [m["status"] for m in done] == ["pass", "pass"], done
+    assert done[0]["value"] == 1.5
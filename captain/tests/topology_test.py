@@ -1,13 +1,26 @@
 import asyncio
+import json
 import unittest
 from queue import Queue
 
+from captain.benchmarks.legacy_topology import LegacyTopology
+from captain.benchmarks.scheduler_benchmark import simulate_run
+from captain.benchmarks.synthetic_graphs import (
+    chain_flowchart,
+    conditional_flowchart,
+    loop_flowchart,
+    make_edge,
+    make_node,
+    wide_flowchart,
+)
 from captain.models.topology import Topology
 from captain.services.consumer.worker import Worker
 from captain.services.producer.producer import Producer
 from captain.types.worker import JobInfo, JobSuccess
+from captain.utils.flowchart_utils import flowchart_to_nx_graph
 
 from .test_apps.sample_app import graph as sample_app_graph
+from .test_apps.sample_app import sample_app as sample_app_json
 
 
 class TopologyTest(unittest.TestCase):
@@ -48,6 +61,103 @@ class TopologyTest(unittest.TestCase):
         assert new_jobs is not None
         assert len(new_jobs) != 0
 
+    # test that loop bodies are re-run num_loops times before following "end"
+    def test_loop_body_is_restarted(self):
+        graph = flowchart_to_nx_graph(loop_flowchart(body_length=3, num_loops=5))
+        topology = Topology(graph=graph, jobset_id="test_123")
+        executed = simulate_run(topology)
+        assert topology.is_finished()
+        assert executed.count("LOOP-0") == 6
+        assert executed.count("NOOP-0-0-2") == 5
+        assert executed.count("NOOP-end-0") == 1
+        assert executed[-1] == "NOOP-end-0"
+
+    # test that the compiled scheduler runs the same jobs as the
+    # networkx based one it replaced
+    def test_same_order_as_legacy_scheduler(self):
+        flowcharts = [
+            json.loads(sample_app_json),
+            chain_flowchart(20),
+            wide_flowchart(20),
+            loop_flowchart(body_length=4, num_loops=3, body_width=3),
+            loop_flowchart(body_length=2, num_loops=3, depth=3),
+        ]
+        for flowchart in flowcharts:
+            graph = flowchart_to_nx_graph(flowchart)
+            expected = simulate_run(LegacyTopology(graph=graph, jobset_id="test_123"))
+            executed = simulate_run(Topology(graph=graph, jobset_id="test_123"))
+            assert executed == expected
+
+    # test that results are only dropped when they are not read again
+    def test_result_consumers(self):
+        flowchart = loop_flowchart(body_length=2, num_loops=3)
+        flowchart["nodes"].append(make_node("NOOP-other"))
+        # read by the loop body, on every iteration
+        flowchart["edges"].append(make_edge("NOOP-other", "NOOP-0-0-1"))
+        flowchart["edges"].append(make_edge("NOOP-source", "NOOP-0-0-0"))
+        topology = Topology(
+            graph=flowchart_to_nx_graph(flowchart),
+            jobset_id="test_123",
+            observe_blocks=["NOOP-0-0-0"],
+        )
+        consumers = topology.compiled.result_consumers(set(topology.observe_blocks))
+        assert consumers == {"LOOP-0": 2}
+
+        flowchart = chain_flowchart(4)
+        flowchart["nodes"].append(
+            make_node(
+                "FEEDBACK",
+                "FEEDBACK",
+                {
+                    "referred_node": {
+                        "type": "NodeReference",
+                        "param": "referred_node",
+                        "value": "NOOP-1",
+                    }
+                },
+            )
+        )
+        topology = Topology(graph=flowchart_to_nx_graph(flowchart), jobset_id="t")
+        keep = topology.compiled.referenced_nodes()
+        assert keep == {"NOOP-1"}
+        assert topology.compiled.result_consumers(keep) == {"NOOP-0": 1, "NOOP-2": 1}
+
+    # test that only loop bodies of pure blocks are compiled
+    def test_loop_bodies(self):
+        flowchart = loop_flowchart(body_length=2, num_loops=3, body_width=2, depth=2)
+        compiled = Topology(
+            graph=flowchart_to_nx_graph(flowchart), jobset_id="t"
+        ).compiled
+        # the outer body contains a LOOP
+        assert list(compiled.loop_bodies) == [compiled.index["LOOP-1"]]
+        body = [compiled.ids[i] for i in compiled.loop_bodies[compiled.index["LOOP-1"]]]
+        assert sorted(body) == sorted(
+            f"NOOP-1-{branch}-{i}" for branch in range(2) for i in range(2)
+        )
+        assert body.index("NOOP-1-0-0") < body.index("NOOP-1-0-1")
+
+        compiled = Topology(
+            graph=flowchart_to_nx_graph(conditional_flowchart(3, 1)), jobset_id="t"
+        ).compiled
+        assert not compiled.loop_bodies
+
+        flowchart = loop_flowchart(body_length=2, num_loops=3)
+        flowchart["nodes"][-1]["data"]["path"] = (
+            "DATA/VISUALIZATION/PLOTLY/LINE/LINE.py"
+        )
+        topology = Topology(
+            graph=flowchart_to_nx_graph(flowchart), jobset_id="t", fast_loops=True
+        )
+        fast_loop = topology.get_fast_loop("LOOP-0")
+        assert [job.job_id for job in fast_loop.body] == ["NOOP-0-0-0", "NOOP-0-0-1"]
+        assert fast_loop.display == {"NOOP-0-0-1"}
+
+        flowchart["nodes"][-1]["data"]["path"] = "HARDWARE/DAQ/READ/READ.py"
+        compiled = Topology(
+            graph=flowchart_to_nx_graph(flowchart), jobset_id="t"
+        ).compiled
+        assert not compiled.loop_bodies
+
     MAX_TIMEOUT = 3
 
     # test that flowchart ran successfully
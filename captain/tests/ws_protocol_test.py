@@ -0,0 +1,81 @@
+import asyncio
+from typing import Any
+
+import numpy as np
+from flojoy import OrderedPair
+
+from captain.internal.ws_protocol import (
+    BINARY_PROTOCOL,
+    decode_binary,
+    encode_binary,
+)
+from captain.internal.wsmanager import ConnectionManager
+from captain.types.worker import WorkerJobResponse
+
+
+def make_message(x: np.ndarray) -> WorkerJobResponse:
+    fig = {
+        "data": [{"x": x, "y": np.sin(x), "z": np.ones((2, 3), dtype=np.int64)}],
+        "layout": {"title": "plot"},
+    }
+    return WorkerJobResponse(
+        jobset_id="test",
+        result={"plotly_fig": fig, "data": OrderedPair(x=x[:5], y=x[:5])},
+        cmd="LINE",
+        node_id="LINE-1",
+    )
+
+
+def test_binary_frame_roundtrip():
+    x = np.linspace(0, 1, 1001)
+    decoded = decode_binary(encode_binary(make_message(x)))
+
+    trace = decoded["NODE_RESULTS"]["result"]["plotly_fig"]["data"][0]
+    np.testing.assert_array_equal(trace["x"], x)
+    np.testing.assert_array_equal(trace["y"], np.sin(x))
+    assert trace["z"].shape == (2, 3)
+    assert trace["z"].dtype == np.float64
+    assert decoded["NODE_RESULTS"]["result"]["data"]["type"] == "OrderedPair"
+    assert decoded["NODE_RESULTS"]["result"]["plotly_fig"]["layout"] == {
+        "title": "plot"
+    }
+    assert decoded["jobsetId"] == "test"
+
+
+def test_binary_frame_buffers_are_aligned():
+    message = {"a": np.arange(3, dtype=np.int8), "b": np.arange(3, dtype=np.float64)}
+    frame = encode_binary(message)
+    decoded = decode_binary(frame)
+    np.testing.assert_array_equal(decoded["b"], message["b"])
+    assert (
+        decoded["b"].ctypes.data % 8 == np.frombuffer(frame, np.uint8).ctypes.data % 8
+    )
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent: list[Any] = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data: str):
+        self.sent.append(data)
+
+    async def send_bytes(self, data: bytes):
+        self.sent.append(data)
+
+
+def test_broadcast_uses_the_protocol_of_each_connection():
+    ws = ConnectionManager()
+    text_socket, binary_socket = FakeWebSocket(), FakeWebSocket()
+
+    async def run():
+        await ws.connect(text_socket, "text")  # type: ignore
+        await ws.connect(binary_socket, "binary", protocol=BINARY_PROTOCOL)  # type: ignore
+        await ws.broadcast(make_message(np.arange(10.0)))
+        await ws.flush()
+
+    asyncio.run(run())
+    assert isinstance(text_socket.sent[0], str)
+    assert isinstance(binary_socket.sent[0], bytes)
@@ -1,3 +1,5 @@
+from flojoy.decimation import DecimationMethod
+from flojoy.profiling import ProfilerMode
 from pydantic import BaseModel
 
 
@@ -13,6 +15,16 @@ class PostWFC(BaseModel):
     nodeDelay: float
     maximumRuntime: float
     maximumConcurrentWorkers: int
+    # run blocks marked as cpu_bound in a pool of processes
+    useProcessPool: bool = False
+    # number of points per plot trace sent to the front-end, 0 sends them all
+    maxPlotPoints: int = 0
+    plotDecimation: DecimationMethod = "lttb"
+    # blocks to profile, the profiles are saved under the flojoy cache dir
+    profileBlocks: list[str] = []
+    profiler: ProfilerMode = "sampling"
+    # run the LOOP bodies made of pure blocks in a tight loop in one worker
+    fastLoops: bool = False
 
 
 class WorkerSuccessResponse(BaseModel):
@@ -1,3 +1,4 @@
+import time
 from queue import Queue
 from typing import Any, Callable, Union
 
@@ -17,12 +18,38 @@ class JobInfo:
         iteration_id: str = "",
         ctrls: dict[str, Any] | None = None,
         previous_jobs: list[dict[str, str]] | None = None,
+        fast_loop: "FastLoop | None" = None,
     ):
         self.job_id = job_id
         self.jobset_id = jobset_id
         self.iteration_id = iteration_id
         self.ctrls = ctrls or {}
         self.previous_jobs = previous_jobs or []
+        # compiled body of a LOOP job, run by the worker along with the LOOP
+        self.fast_loop = fast_loop
+        # time.perf_counter when the job was queued
+        self.queued_at = time.perf_counter()
+
+
+class FastLoop:
+    """
+    Compiled body of a LOOP: the worker running the LOOP job also runs its
+    body, in order, at every iteration until the LOOP ends, without going
+    through the task queue. Results are only sent to the front-end every
+    so often.
+    """
+
+    def __init__(
+        self,
+        body: list[JobInfo],
+        display: set[str],  # blocks only run when the front-end is updated
+        is_cancelled: Callable[[], bool],
+    ):
+        self.body = body
+        self.display = display
+        self.is_cancelled = is_cancelled
+        # number of iterations of the body, set by the worker
+        self.iterations = 0
 
 
 class NodeResults(dict):
@@ -0,0 +1,109 @@
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Hashable, Iterable, Optional, TypeVar
+
+from captain.utils.logger import logger
+
+"""
+Concurrent probing of hardware resources for the device discovery.
+
+Asking each VISA resource for its `*IDN?` one after the other makes the
+discovery as slow as the sum of the probes, most of which are timeouts of
+resources that are not instruments. The probes run
+in a thread pool instead, and their results are cached per resource: the
+next discoveries only probe the resources that were not listed before.
+"""
+
+T = TypeVar("T")
+
+PROBE_TIMEOUT = 2.0
+"""Seconds a resource has to answer"""
+
+PROBE_CACHE_TTL = 30.0
+
+MAX_PROBES = 32
+"""Probes running at the same time"""
+
+_executor = ThreadPoolExecutor(
+    max_workers=MAX_PROBES, thread_name_prefix="device-probe"
+)
+
+
+class ProbeCache:
+    """Results of the probes, None included, for `ttl` seconds"""
+
+    def __init__(self, ttl: float = PROBE_CACHE_TTL):
+        self.ttl = ttl
+        self._results: dict[Hashable, tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> tuple[bool, Any]:
+        with self._lock:
+            cached = self._results.get(key)
+        if cached is None or time.monotonic() - cached[0] > self.ttl:
+            return False, None
+        return True, cached[1]
+
+    def set(self, key: Hashable, result: Any):
+        with self._lock:
+            self._results[key] = (time.monotonic(), result)
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+
+
+def probe_concurrently(
+    resources: Iterable[Hashable],
+    probe: Callable[[Any], Optional[T]],
+    timeout: float = PROBE_TIMEOUT,
+    cache: ProbeCache | None = None,
+    on_found: Callable[[T], None] | None = None,
+) -> list[T]:
+    """
+    Probes the resources at the same time, returns what they found in the
+    order of `resources`. `probe` returns None for a resource that is not a
+    device. `on_found` is called, from another thread, with each device as
+    soon as it is found. Resources that do not answer within `timeout`
+    seconds are skipped.
+    """
+    # duplicates are probed once
+    resources = list(dict.fromkeys(resources))
+    results: dict[Hashable, Optional[T]] = {}
+    futures = {}
+    for resource in resources:
+        hit, result = cache.get(resource) if cache else (False, None)
+        if hit:
+            results[resource] = result
+            if result is not None and on_found:
+                on_found(result)
+        else:
+            futures[_executor.submit(probe, resource)] = resource
+
+    # the probes beyond MAX_PROBES wait for the first ones
+    deadline = timeout * math.ceil(len(futures) / MAX_PROBES) + 0.5
+    try:
+        for future in as_completed(futures, timeout=deadline):
+            resource = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.debug(f"Probing {resource} failed: {e}")
+                result = None
+            if cache:
+                cache.set(resource, result)
+            results[resource] = result
+            if result is not None and on_found:
+                on_found(result)
+    except TimeoutError:
+        # not cached, they may answer next time
+        missing = [
+            resource for future, resource in futures.items() if not future.done()
+        ]
+        logger.warning(f"No answer within {deadline}s from {missing}")
+
+    return [
+        r for r in (results.get(resource) for resource in resources) if r is not None
+    ]
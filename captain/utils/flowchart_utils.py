@@ -1,5 +1,4 @@
 import asyncio
-import importlib.metadata
 import json
 import os
 import time
@@ -7,13 +6,22 @@ import traceback
 from queue import Queue
 from subprocess import PIPE, Popen
 from threading import Thread
-from typing import Any, cast
+from typing import Any, Callable, cast
 
 import networkx as nx
+from flojoy.dao import Dao
+from flojoy.decimation import DecimationMethod
+from flojoy.profiling import ProfilerMode
+from flojoy.package_index import (
+    block_requirement,
+    invalidate_installed_packages,
+    missing_requirements,
+)
 from flojoy.utils import clear_flojoy_memory
 
 from captain.internal.manager import Manager
 from captain.models.topology import Topology
+from captain.services.consumer.process_pool import get_block_process_pool
 from captain.services.consumer.worker import Worker
 from captain.services.producer.producer import Producer
 from captain.types.flowchart import PostWFC
@@ -26,6 +34,7 @@ from captain.types.worker import (
 from captain.utils.broadcast import Signaler
 from captain.utils.import_blocks import pre_import_functions
 from captain.utils.logger import logger
+from captain.utils.run_trace import start_run_trace
 
 from .status_codes import STATUS_CODES
 
@@ -37,6 +46,11 @@ def run_worker(
     observe_blocks: list[str],
     node_delay: float,
     signaler: Signaler,
+    executor: Callable[[Callable[..., Any], dict[str, Any]], Any] | None = None,
+    max_plot_points: int = 0,
+    plot_decimation: DecimationMethod = "lttb",
+    profile_blocks: list[str] | None = None,
+    profiler: ProfilerMode = "sampling",
 ):
     try:
         # TODO: Figure out a way to make this work with python threads (previously this was a Python Process)
@@ -53,6 +67,11 @@ def run_worker(
             observe_blocks=observe_blocks,
             node_delay=node_delay,
             signaler=signaler,
+            executor=executor,
+            max_plot_points=max_plot_points,
+            plot_decimation=plot_decimation,
+            profile_blocks=profile_blocks,
+            profiler=profiler,
         )
         asyncio.run(worker.run())
     except Exception as e:
@@ -89,6 +108,8 @@ def create_topology(
         graph=graph,
         jobset_id=request.jobsetId,
         node_delay=request.nodeDelay / 1000,
+        observe_blocks=request.observeBlocks,
+        fast_loops=request.fastLoops,
     )
 
 
@@ -119,6 +140,11 @@ def spawn_workers(
     observe_blocks: list[str],
     node_delay: float,
     max_workers: int,
+    use_process_pool: bool = False,
+    max_plot_points: int = 0,
+    plot_decimation: DecimationMethod = "lttb",
+    profile_blocks: list[str] | None = None,
+    profiler: ProfilerMode = "sampling",
 ):
     if manager.running_topology is None:
         logger.error("Could not spawn workers, no topology detected")
@@ -130,6 +156,9 @@ def spawn_workers(
     logger.info(f"Spawning {worker_number} workers")
     manager.thread_count = worker_number
 
+    # worker threads hand cpu_bound blocks over to the process pool
+    executor = get_block_process_pool(max_workers) if use_process_pool else None
+
     signaler = Signaler(manager.ws)
     logger.debug("Starting worker")
     for _ in range(worker_number):
@@ -142,6 +171,11 @@ def spawn_workers(
                 observe_blocks,
                 node_delay,
                 signaler,
+                executor,
+                max_plot_points,
+                plot_decimation,
+                profile_blocks,
+                profiler,
             ),
         )
         worker_process.daemon = True
@@ -221,6 +255,17 @@ def clear_memory():
     clear_flojoy_memory()
 
 
+def get_missing_block_requirements(nodes: list[dict[str, Any]]) -> list[str]:
+    """pip requirements to install for the blocks of a flowchart, without duplicates"""
+    requirements: dict[str, str] = {}
+    for node in nodes:
+        for package in node["data"].get("pip_dependencies") or []:
+            checked, installed = block_requirement(package["name"], package.get("v"))
+            requirements.setdefault(checked, installed)
+    missing = missing_requirements(list(requirements))
+    return list(dict.fromkeys(requirements[req] for req in missing))
+
+
 async def prepare_jobs_and_run_fc(request: PostWFC, manager: Manager):
     pre_job_op_start = time.time()
     logger.debug(f"Pre job operation started at: {pre_job_op_start}")
@@ -234,20 +279,27 @@ async def prepare_jobs_and_run_fc(request: PostWFC, manager: Manager):
     # clean up before next run
     clean_up_function()
 
+    # results of process pool blocks are kept in shared memory,
+    # so they are passed to other processes without being copied
+    Dao.get_instance().enable_shared_results(request.useProcessPool)
+
     await manager.ws.broadcast(
         WorkerJobResponse(
             jobset_id=request.jobsetId, sys_status=STATUS_CODES["BUILDING_TOPOLOGY"]
         )
     )
 
+    trace = start_run_trace(request.jobsetId)
+
     # Create new task queue and finish queue
     manager.task_queue = Queue()
     manager.finish_queue = Queue()
 
     # Create the topology
-    manager.running_topology = create_topology(
-        request,
-    )  # pass clean up func for when topology ends
+    with trace.span("build_topology", "pre_job"):
+        manager.running_topology = create_topology(
+            request,
+        )  # pass clean up func for when topology ends
 
     """
     ____________________________________________________________________________
@@ -259,30 +311,13 @@ async def prepare_jobs_and_run_fc(request: PostWFC, manager: Manager):
 
     await asyncio.create_task(Signaler(manager.ws).signal_prejob_op(request.jobsetId))
 
-    nodes = fc["nodes"]
-    packages_dict = {
-        package.name: package.version for package in importlib.metadata.distributions()
-    }
-    missing_packages: list[str] = []
-
     socket_msg["SYSTEM_STATUS"] = STATUS_CODES["COLLECTING_PIP_DEPENDENCIES"]
     await asyncio.create_task(manager.ws.broadcast(socket_msg))
 
-    for node in nodes:
-        if "pip_dependencies" not in node["data"]:
-            continue
-        for package in node["data"]["pip_dependencies"]:
-            pckg = packages_dict.get(package["name"])
-            if not pckg:
-                pckg_str = (
-                    f"{package['name']}=={package['v']}"
-                    if "v" in package
-                    else f"{package['name']}"
-                )
-                logger.debug(f"Package: {package['name']} is missing!")
-                missing_packages.append(pckg_str)
-            else:
-                logger.debug(f"Package: {package['name']} is already installed!")
+    with trace.span("check_packages", "pre_job"):
+        missing_packages = get_missing_block_requirements(fc["nodes"])
+    for package in missing_packages:
+        logger.debug(f"Package: {package} is missing!")
 
     if missing_packages:
         socket_msg["SYSTEM_STATUS"] = STATUS_CODES["INSTALLING_PACKAGES"]
@@ -291,7 +326,8 @@ async def prepare_jobs_and_run_fc(request: PostWFC, manager: Manager):
         logger.info(
             f"{', '.join(missing_packages)} packages will be installed with pip!"
         )
-        installation_succeed = await install_packages(missing_packages)
+        with trace.span("install_packages", "pre_job"):
+            installation_succeed = await install_packages(missing_packages)
         logger.debug(f"installing packages was successful? {installation_succeed}")
 
         if not installation_succeed:
@@ -305,7 +341,8 @@ async def prepare_jobs_and_run_fc(request: PostWFC, manager: Manager):
     await manager.ws.broadcast(socket_msg)
 
     # get the amount of workers needed
-    funcs, errs = pre_import_functions(topology=manager.running_topology)
+    with trace.span("import_blocks", "pre_job"):
+        funcs, errs = pre_import_functions(topology=manager.running_topology)
 
     if errs:
         socket_msg["SYSTEM_STATUS"] = STATUS_CODES["IMPORTING_BLOCK_FUNCTIONS_FAILED"]
@@ -317,6 +354,10 @@ async def prepare_jobs_and_run_fc(request: PostWFC, manager: Manager):
     logger.debug(
         f"PRE JOB OPERATION TOOK {time.time() - pre_job_op_start} SECONDS TO COMPLETE"
     )
+    manager.running_topology.pre_job_timings = trace.durations("pre_job")
+    logger.debug(
+        f"Pre job phases (seconds): {manager.running_topology.pre_job_timings}"
+    )
     """
     END PRE JOB OPERATION
     ____________________________________________________________________________
@@ -333,6 +374,11 @@ async def prepare_jobs_and_run_fc(request: PostWFC, manager: Manager):
         request.observeBlocks,
         request.nodeDelay,
         request.maximumConcurrentWorkers,
+        request.useProcessPool,
+        request.maxPlotPoints,
+        request.plotDecimation,
+        request.profileBlocks,
+        request.profiler,
     )
     spawn_producer(manager)
 
@@ -375,3 +421,5 @@ async def install_packages(missing_packages: list[str]):
     except Exception as e:
         logger.error(f"{e}{traceback.format_exc()}")
         return False
+    finally:
+        invalidate_installed_packages()
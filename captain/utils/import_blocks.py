@@ -1,8 +1,12 @@
+import hashlib
 import importlib
 import os
 import sys
+import threading
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, cast
+from types import ModuleType
+from typing import Any, Iterable, cast
 
 from flojoy import NoInitFunctionError, get_node_init_function
 
@@ -54,6 +58,94 @@ def pre_import_functions(topology: Topology):
 mapping: dict[str, str] = {}
 
 
+@dataclass
+class CachedModule:
+    module: ModuleType
+    file: str
+    mtime_ns: int
+    size: int
+    digest: str
+
+
+def file_digest(file: str) -> str:
+    with open(file, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+class BlockModuleCache:
+    """
+    Block modules imported once per server lifetime.
+
+    A module is reloaded only when its file changed: the mtime and size of
+    the file are checked on every lookup, the content hash only when they
+    differ (so touching a file does not re-execute the module). The
+    BlocksWatcher also invalidates the modules of the changed directories,
+    which covers helper modules imported by a block.
+    """
+
+    def __init__(self):
+        self.modules: dict[str, CachedModule] = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.reloads = 0
+
+    def get(self, module_path: str) -> ModuleType:
+        with self.lock:
+            cached = self.modules.get(module_path)
+            if cached is not None:
+                stat = os.stat(cached.file)
+                if (stat.st_mtime_ns, stat.st_size) == (cached.mtime_ns, cached.size):
+                    self.hits += 1
+                    return cached.module
+                digest = file_digest(cached.file)
+                if digest == cached.digest:
+                    cached.mtime_ns, cached.size = stat.st_mtime_ns, stat.st_size
+                    self.hits += 1
+                    return cached.module
+                module = importlib.reload(cached.module)
+                self.reloads += 1
+            elif module_path in sys.modules:
+                # imported before the cache knew about it, it may be stale
+                module = importlib.reload(sys.modules[module_path])
+                self.reloads += 1
+            else:
+                module = importlib.import_module(module_path)
+
+            file = cast(str, module.__file__)
+            stat = os.stat(file)
+            self.modules[module_path] = CachedModule(
+                module=module,
+                file=file,
+                mtime_ns=stat.st_mtime_ns,
+                size=stat.st_size,
+                digest=file_digest(file),
+            )
+            return module
+
+    def invalidate(self, paths: Iterable[str]):
+        """Forgets the modules living in the directories of the changed paths"""
+        dirs = {os.path.dirname(os.path.abspath(path)) for path in paths}
+        with self.lock:
+            for module_path, cached in list(self.modules.items()):
+                if os.path.dirname(os.path.abspath(cached.file)) in dirs:
+                    # reloaded, not imported again, on the next lookup
+                    del self.modules[module_path]
+
+    def clear(self):
+        with self.lock:
+            self.modules.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "modules": len(self.modules),
+            "hits": self.hits,
+            "reloads": self.reloads,
+        }
+
+
+block_modules = BlockModuleCache()
+
+
 def get_module_func(file_name: str):
     blocks_path = get_blocks_path()
 
@@ -64,10 +156,7 @@ def get_module_func(file_name: str):
     file_path = mapping.get(file_name)
 
     if file_path is not None:
-        module = importlib.import_module(file_path)
-        # this will pick latest changes from module always
-        module = importlib.reload(module)
-        return module
+        return block_modules.get(file_path)
 
     else:
         logger.error(f"File {file_name} not found in subdirectories of {blocks_path}..")
@@ -96,6 +185,7 @@ def create_map(custom_blocks_dir: str | None):
 
             for module_path in modules_to_delete:
                 del sys.modules[module_path]
+            block_modules.clear()
 
     parent_dir = Path(os.path.abspath(blocks_dir)).parent.__str__()
     if custom_blocks_dir:
@@ -3,6 +3,7 @@ from typing import Any, Optional, Union
 
 from captain.utils.blocks_path import get_blocks_path
 from captain.utils.manifest.build_manifest import create_manifest
+from captain.utils.manifest.manifest_cache import manifest_cache
 
 __all__ = ["generate_manifest"]
 
@@ -78,7 +79,44 @@ ORDERING = [
 ]
 
 
-def browse_directories(dir_path: str, cur_type: Optional[str] = None, depth: int = 0):
+def is_skipped_dir(entry: os.DirEntry[str]) -> bool:
+    return (
+        entry.name.startswith(".")
+        or entry.name.startswith("_")
+        or entry.name == "assets"
+        or entry.name == "utils"
+        or entry.name == "MANIFEST"
+        or "examples" in entry.path
+        or "a1-[autogen]" in entry.path
+        or "appendix" in entry.path
+        or not os.listdir(entry)
+    )
+
+
+def block_file(dir_path: str) -> str:
+    return os.path.join(dir_path, f"{os.path.basename(dir_path)}.py")
+
+
+def find_block_files(dir_path: str) -> list[str]:
+    """Block files of the directories visited by `browse_directories`"""
+    subdirs = [
+        entry.path
+        for entry in os.scandir(dir_path)
+        if entry.is_dir() and not is_skipped_dir(entry)
+    ]
+    if not subdirs:
+        # a missing block file is reported by `browse_directories`
+        path = block_file(dir_path)
+        return [path] if os.path.isfile(path) else []
+    return [path for subdir in subdirs for path in find_block_files(subdir)]
+
+
+def browse_directories(
+    dir_path: str,
+    cur_type: Optional[str] = None,
+    depth: int = 0,
+    manifests: Optional[dict[str, dict[str, Any]]] = None,
+):
     result: dict[str, Union[str, list[Any], None]] = {}
     basename = os.path.basename(dir_path)
     result["name"] = "ROOT" if depth == 0 else NAME_MAP.get(basename, basename)
@@ -92,17 +130,7 @@ def browse_directories(dir_path: str, cur_type: Optional[str] = None, depth: int
 
     for entry in entries:
         if entry.is_dir():
-            if (
-                entry.name.startswith(".")
-                or entry.name.startswith("_")
-                or entry.name == "assets"
-                or entry.name == "utils"
-                or entry.name == "MANIFEST"
-                or "examples" in entry.path
-                or "a1-[autogen]" in entry.path
-                or "appendix" in entry.path
-                or not os.listdir(entry)
-            ):
+            if is_skipped_dir(entry):
                 continue
 
             cur_type = (
@@ -115,19 +143,23 @@ def browse_directories(dir_path: str, cur_type: Optional[str] = None, depth: int
                 )  # else use default
             )
 
-            subdir = browse_directories(entry.path, cur_type, depth=depth + 1)
+            subdir = browse_directories(
+                entry.path, cur_type, depth=depth + 1, manifests=manifests
+            )
             result["children"].append(subdir)
         elif entry.is_file() and entry.name.endswith(".py"):
             continue
     if not result["children"] and os.listdir(dir_path):
-        try:
-            n_file_name = f"{os.path.basename(dir_path)}.py"
-            n_path = os.path.join(dir_path, n_file_name)
-            result = create_manifest(n_path)
-        except Exception as e:
-            raise ValueError(
-                f"Failed to generate manifest from {os.path.basename(dir_path)}.py, reason: {str(e)}"
-            )
+        n_path = block_file(dir_path)
+        if manifests is not None and os.path.abspath(n_path) in manifests:
+            result = manifests[os.path.abspath(n_path)]
+        else:
+            try:
+                result = create_manifest(n_path)
+            except Exception as e:
+                raise ValueError(
+                    f"Failed to generate manifest from {os.path.basename(dir_path)}.py, reason: {str(e)}"
+                )
 
         if not result.get("type"):
             result["type"] = cur_type
@@ -145,6 +177,7 @@ def sort_order(element: dict[str, Any]):
 
 def generate_manifest(blocks_path: str | None):
     blocks_path = blocks_path if blocks_path else get_blocks_path()
-    blocks_map = browse_directories(blocks_path)
+    manifests = manifest_cache.get_many(find_block_files(blocks_path))
+    blocks_map = browse_directories(blocks_path, manifests=manifests)
     blocks_map["children"].sort(key=sort_order)  # type: ignore
     return blocks_map
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterable
+
+from fastapi.encoders import jsonable_encoder
+
+from captain.utils.blocks_path import get_flojoy_dir
+from captain.utils.logger import logger
+from captain.utils.manifest.build_manifest import create_manifest
+
+"""
+Persistent cache of the block manifests.
+
+Building the manifest of a block executes and inspects its module, which is
+slow for a few hundred blocks. The manifest of every block file is kept in
+a JSON file under the flojoy dir, stamped with the mtime, size and content
+hash of the file; only the blocks that changed are parsed again, in
+parallel on a process pool when there are many of them.
+"""
+
+MANIFEST_CACHE_FILE = "manifest_cache.json"
+# below this number of changed blocks, spawning processes is not worth it
+PARALLEL_THRESHOLD = 16
+
+# the cache is discarded when the manifest generator itself changes
+GENERATOR_FILES = ("build_manifest.py", "build_ast.py")
+
+
+def file_digest(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def generator_digest() -> str:
+    digest = hashlib.sha1()
+    for name in GENERATOR_FILES:
+        with open(os.path.join(os.path.dirname(__file__), name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def build_manifest(path: str) -> dict[str, Any]:
+    try:
+        return jsonable_encoder(create_manifest(path))
+    except Exception as e:
+        raise ValueError(
+            f"Failed to generate manifest from {os.path.basename(path)}, reason: {str(e)}"
+        )
+
+
+class ManifestCache:
+    def __init__(self, cache_file: str | None = None):
+        self.cache_file = cache_file or os.path.join(
+            get_flojoy_dir(), MANIFEST_CACHE_FILE
+        )
+        self.generator = generator_digest()
+        self.entries: dict[str, dict[str, Any]] = {}
+        self.lock = threading.Lock()
+        self.loaded = False
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, paths: Iterable[str]) -> dict[str, dict[str, Any]]:
+        """Returns the manifest of each block file, parsing only the changed ones"""
+        with self.lock:
+            self._load()
+            manifests: dict[str, dict[str, Any]] = {}
+            stale: dict[str, tuple[int, int, str]] = {}
+            for path in paths:
+                path = os.path.abspath(path)
+                stat = os.stat(path)
+                entry = self.entries.get(path)
+                if entry is not None and (entry["mtime_ns"], entry["size"]) == (
+                    stat.st_mtime_ns,
+                    stat.st_size,
+                ):
+                    manifests[path] = entry["manifest"]
+                    continue
+                digest = file_digest(path)
+                if entry is not None and entry["digest"] == digest:
+                    entry["mtime_ns"], entry["size"] = stat.st_mtime_ns, stat.st_size
+                    manifests[path] = entry["manifest"]
+                    self.dirty = True
+                    continue
+                stale[path] = (stat.st_mtime_ns, stat.st_size, digest)
+
+            self.hits += len(manifests)
+            self.misses += len(stale)
+            for path, manifest in zip(stale, self._parse(list(stale))):
+                mtime_ns, size, digest = stale[path]
+                self.entries[path] = {
+                    "mtime_ns": mtime_ns,
+                    "size": size,
+                    "digest": digest,
+                    "manifest": manifest,
+                }
+                manifests[path] = manifest
+                self.dirty = True
+            self._save()
+
+        # callers fill in the type of blocks inheriting it from their directory
+        return {path: dict(manifest) for path, manifest in manifests.items()}
+
+    def invalidate(self, paths: Iterable[str]):
+        with self.lock:
+            for path in paths:
+                if self.entries.pop(os.path.abspath(path), None) is not None:
+                    self.dirty = True
+
+    def stats(self) -> dict[str, int]:
+        return {"blocks": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+    def _parse(self, paths: list[str]) -> list[dict[str, Any]]:
+        if len(paths) < PARALLEL_THRESHOLD:
+            return [build_manifest(path) for path in paths]
+        logger.info(f"Parsing {len(paths)} block manifests in parallel..")
+        # spawn, forking the threads of the server is not safe
+        with ProcessPoolExecutor(
+            max_workers=min(os.cpu_count() or 1, len(paths)),
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as pool:
+            return list(pool.map(build_manifest, paths, chunksize=4))
+
+    def _load(self):
+        if self.loaded:
+            return
+        self.loaded = True
+        try:
+            with open(self.cache_file) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return
+        if cache.get("generator") == self.generator:
+            self.entries = cache.get("entries", {})
+
+    def _save(self):
+        if not self.dirty:
+            return
+        tmp_file = f"{self.cache_file}.tmp"
+        try:
+            with open(tmp_file, "w") as f:
+                json.dump({"generator": self.generator, "entries": self.entries}, f)
+            os.replace(tmp_file, self.cache_file)
+            self.dirty = False
+        except OSError as e:
+            logger.error(f"Failed to save the manifest cache: {e}")
+
+
+manifest_cache = ManifestCache()
@@ -0,0 +1,259 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from itertools import count
+from typing import Any, Iterator
+
+from flojoy.tracing import Phase
+
+from captain.utils.blocks_path import get_flojoy_dir
+from captain.utils.logger import logger
+
+"""
+Timings of a flowchart run.
+
+Every run records the pre job operation phases (topology build, package
+check, block import) and, for each job, the time spent waiting in the task
+queue, fetching the inputs, running the block, validating, serializing and
+broadcasting its result.
+
+The trace of a run is served by `/runs/{jobset_id}/profile` and saved under
+the flojoy dir when the run finishes, in the Chrome trace event format
+(open it with Perfetto or chrome://tracing).
+"""
+
+# runs kept in memory and on disk
+MAX_RUN_TRACES = 10
+# events recorded per run, long running loops would grow it without bound
+MAX_TRACE_EVENTS = 200_000
+
+PROCESS_ID = 1
+
+
+class RunTrace:
+    def __init__(self, jobset_id: str):
+        self.jobset_id = jobset_id
+        self.t0 = time.perf_counter()
+        self.started_at = time.time()
+        self.events: list[dict[str, Any]] = []
+        self.dropped_events = 0
+        self.threads: dict[int, str] = {}
+        # category -> name -> [count, seconds], kept even when events are dropped
+        self.totals: dict[str, dict[str, list[Any]]] = {}
+        self.async_ids = count()
+        self.lock = threading.Lock()
+
+    def add_span(
+        self,
+        name: str,
+        category: str,
+        start: float,
+        end: float,
+        args: dict[str, Any] | None = None,
+    ):
+        """Records a span of the current thread, `start` and `end` come from time.perf_counter"""
+        tid = threading.get_ident()
+        event: dict[str, Any] = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - self.t0) * 1e6,
+            "dur": (end - start) * 1e6,
+            "pid": PROCESS_ID,
+            "tid": tid,
+        }
+        if args:
+            event["args"] = args
+        with self.lock:
+            if tid not in self.threads:
+                self.threads[tid] = threading.current_thread().name
+            self._add(event, category, name, end - start)
+
+    def add_async_span(
+        self,
+        name: str,
+        category: str,
+        start: float,
+        end: float,
+        args: dict[str, Any] | None = None,
+    ):
+        """Records a span that can overlap others, like the time a job waits in the queue"""
+        with self.lock:
+            span_id = next(self.async_ids)
+            begin: dict[str, Any] = {
+                "name": name,
+                "cat": category,
+                "ph": "b",
+                "id": span_id,
+                "ts": (start - self.t0) * 1e6,
+                "pid": PROCESS_ID,
+            }
+            if args:
+                begin["args"] = args
+            if self._add(begin, category, name, end - start):
+                self.events.append(
+                    {
+                        "name": name,
+                        "cat": category,
+                        "ph": "e",
+                        "id": span_id,
+                        "ts": (end - self.t0) * 1e6,
+                        "pid": PROCESS_ID,
+                    }
+                )
+
+    def _add(self, event: dict[str, Any], category: str, name: str, duration: float):
+        stats = self.totals.setdefault(category, {}).setdefault(name, [0, 0.0])
+        stats[0] += 1
+        stats[1] += duration
+        if len(self.events) >= MAX_TRACE_EVENTS:
+            self.dropped_events += 1
+            return False
+        self.events.append(event)
+        return True
+
+    @contextmanager
+    def span(
+        self, name: str, category: str, args: dict[str, Any] | None = None
+    ) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(name, category, start, time.perf_counter(), args)
+
+    def add_job(
+        self,
+        job_id: str,
+        block: str,
+        queued_at: float,
+        started_at: float,
+        ended_at: float,
+        phases: list[Phase],
+    ):
+        args = {"job_id": job_id}
+        self.add_async_span("queue_wait", "queue", queued_at, started_at, args)
+        self.add_span(block, "job", started_at, ended_at, args)
+        for phase, start, end in phases:
+            self.add_span(phase, "phase", start, end, {"block": block, **args})
+
+    def durations(self, category: str) -> dict[str, float]:
+        """Seconds spent in the spans of a category, summed by name"""
+        with self.lock:
+            return {
+                name: total
+                for name, (_, total) in self.totals.get(category, {}).items()
+            }
+
+    def summary(self) -> dict[str, Any]:
+        """Count, total and mean time (in ms) of the spans, slowest first"""
+        with self.lock:
+            summary: dict[str, Any] = {
+                category: dict(
+                    sorted(
+                        (
+                            (
+                                name,
+                                {
+                                    "count": n,
+                                    "total_ms": total * 1e3,
+                                    "mean_ms": total * 1e3 / n,
+                                },
+                            )
+                            for name, (n, total) in stats.items()
+                        ),
+                        key=lambda item: -item[1]["total_ms"],
+                    )
+                )
+                for category, stats in self.totals.items()
+            }
+        return {
+            "jobset_id": self.jobset_id,
+            **summary,
+            "dropped_events": self.dropped_events,
+        }
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        with self.lock:
+            events = list(self.events)
+            threads = dict(self.threads)
+        metadata = [
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": PROCESS_ID,
+                "args": {"name": f"flowchart {self.jobset_id}"},
+            }
+        ] + [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": PROCESS_ID,
+                "tid": tid,
+                "args": {"name": name},
+            }
+            for tid, name in threads.items()
+        ]
+        return {
+            "traceEvents": metadata + events,
+            "displayTimeUnit": "ms",
+            "otherData": {
+                "jobset_id": self.jobset_id,
+                "started_at": self.started_at,
+                "dropped_events": self.dropped_events,
+            },
+        }
+
+    def save(self, directory: str | None = None) -> str:
+        directory = directory or get_traces_dir()
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{os.path.basename(self.jobset_id)}.json")
+        with open(path, "w") as f:
+            json.dump(self.to_chrome_trace(), f)
+        prune_saved_traces(directory)
+        return path
+
+
+_run_traces: OrderedDict[str, RunTrace] = OrderedDict()
+_run_traces_lock = threading.Lock()
+
+
+def get_traces_dir() -> str:
+    return os.path.join(get_flojoy_dir(), "traces")
+
+
+def prune_saved_traces(directory: str):
+    files = sorted(
+        (entry for entry in os.scandir(directory) if entry.name.endswith(".json")),
+        key=lambda entry: entry.stat().st_mtime,
+    )
+    for entry in files[:-MAX_RUN_TRACES]:
+        os.remove(entry.path)
+
+
+def start_run_trace(jobset_id: str) -> RunTrace:
+    trace = RunTrace(jobset_id)
+    with _run_traces_lock:
+        _run_traces[jobset_id] = trace
+        _run_traces.move_to_end(jobset_id)
+        while len(_run_traces) > MAX_RUN_TRACES:
+            _run_traces.popitem(last=False)
+    return trace
+
+
+def get_run_trace(jobset_id: str) -> RunTrace | None:
+    return _run_traces.get(jobset_id)
+
+
+def save_run_trace(jobset_id: str):
+    trace = get_run_trace(jobset_id)
+    if trace is None:
+        return
+    try:
+        path = trace.save()
+        logger.info(f"Saved the trace of the run to {path}")
+    except OSError as e:
+        logger.error(f"Failed to save the trace of the run: {e}")
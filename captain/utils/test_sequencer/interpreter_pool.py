@@ -0,0 +1,257 @@
+import asyncio
+import importlib
+import io
+import os
+import queue
+import runpy
+import sys
+import threading
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from multiprocessing import get_context
+from multiprocessing.connection import Connection
+from typing import Literal
+
+from captain.utils.logger import logger
+
+"""
+Warm interpreters for the test sequencer.
+
+Starting `python` or `pytest` for every test of a sequence pays the
+interpreter startup and the imports of numpy, pyvisa, tm_devices... each
+time. The interpreter pool keeps spawned python processes alive with these
+modules imported beforehand, and runs the python files and pytest node ids
+in them one at a time.
+
+A test still starts from a clean state: it runs in a fresh `__main__`
+namespace and the modules it imported, `sys.argv`, `sys.path`, the working
+directory and `os.environ` are restored after it. Only the preloaded
+modules are shared between tests. A test that does not finish within its
+timeout, or that crashes its interpreter, is killed and the interpreter is
+replaced.
+
+The interpreters are spawned from the python running captain, with its
+`sys.path`: the tests see the packages of Studio, not those of the
+`python` or `pytest` found on the PATH that run the tests otherwise.
+"""
+
+RunKind = Literal["python", "pytest"]
+
+DEFAULT_PRELOAD = ["numpy", "pytest", "flojoy_cloud.test_sequencer"]
+
+
+class CommandResult:
+    def __init__(self, returncode: int, stdout: bytes, stderr: bytes):
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+
+    def __repr__(self) -> str:
+        return f"CommandResult(returncode={self.returncode})"
+
+
+def timed_out(timeout: float) -> CommandResult:
+    return CommandResult(1, b"", f"Test timed out after {timeout} seconds".encode())
+
+
+# -- child process side --
+
+
+def _exit_code(e: SystemExit, stderr: io.StringIO) -> int:
+    # same exit codes as `python file.py`
+    if e.code is None:
+        return 0
+    if isinstance(e.code, int):
+        return e.code
+    print(e.code, file=stderr)
+    return 1
+
+
+def _run_in_child(kind: RunKind, path: str, env: dict[str, str]) -> CommandResult:
+    modules = set(sys.modules)
+    environ = dict(os.environ)
+    argv, sys_path, cwd = list(sys.argv), list(sys.path), os.getcwd()
+    stdout, stderr = io.StringIO(), io.StringIO()
+    os.environ.update(env)
+    try:
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            if kind == "python":
+                sys.argv = [path]
+                sys.path.insert(0, os.path.dirname(os.path.abspath(path)))
+                runpy.run_path(path, run_name="__main__")
+                returncode = 0
+            else:
+                import pytest
+
+                returncode = int(pytest.main([path, "-p", "no:cacheprovider"]))
+    except SystemExit as e:
+        returncode = _exit_code(e, stderr)
+    except BaseException:
+        traceback.print_exc(file=stderr)
+        returncode = 1
+    finally:
+        os.environ.clear()
+        os.environ.update(environ)
+        sys.argv, sys.path[:] = argv, sys_path
+        os.chdir(cwd)
+        # the next test imports its modules again
+        for name in set(sys.modules) - modules:
+            del sys.modules[name]
+    return CommandResult(
+        returncode, stdout.getvalue().encode(), stderr.getvalue().encode()
+    )
+
+
+def interpreter_main(conn: Connection, preload: list[str], sys_path: list[str]):
+    """Entry point executed inside the pool processes."""
+    sys.path[:] = sys_path
+    for module in preload:
+        try:
+            importlib.import_module(module)
+        except Exception as e:
+            print(f"Could not preload {module}: {e}", file=sys.stderr)
+    conn.send("ready")
+    while True:
+        try:
+            kind, path, env = conn.recv()
+        except EOFError:
+            return
+        conn.send(_run_in_child(kind, path, env))
+
+
+# -- main process side --
+
+
+class Interpreter:
+    def __init__(self, preload: list[str]):
+        self.conn, child_conn = get_context("spawn").Pipe()
+        self.process = get_context("spawn").Process(
+            target=interpreter_main,
+            args=(child_conn, preload, list(sys.path)),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+
+    def exited(self) -> CommandResult:
+        # the test killed its interpreter, e.g. os._exit or a segfault
+        self.process.join(1)
+        message = f"The interpreter exited with code {self.process.exitcode}"
+        return CommandResult(self.process.exitcode or 1, b"", message.encode())
+
+    def receive(self, timeout: float | None) -> CommandResult | None:
+        """Next message of the interpreter, None if it takes more than `timeout`"""
+        try:
+            if not self.conn.poll(timeout):
+                return None
+            return self.conn.recv()
+        except (EOFError, OSError):
+            return self.exited()
+
+    def run(
+        self, kind: RunKind, path: str, env: dict[str, str], timeout: float | None
+    ) -> CommandResult | None:
+        try:
+            if not self.ready:
+                # the preloading does not count in the timeout of the test
+                self.conn.recv()
+                self.ready = True
+            self.conn.send((kind, path, env))
+        except (EOFError, OSError):
+            return self.exited()
+        return self.receive(timeout)
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class InterpreterPool:
+    """
+    Runs python files and pytest node ids in `size` warm interpreters.
+    Up to `size` tests run at the same time, the others wait for a free
+    interpreter.
+    """
+
+    def __init__(self, size: int, preload: list[str] | None = None):
+        self.size = size
+        self.preload = DEFAULT_PRELOAD if preload is None else preload
+        self.idle: queue.Queue[Interpreter] = queue.Queue()
+        for _ in range(size):
+            self.idle.put(Interpreter(self.preload))
+
+    async def _acquire(self) -> Interpreter:
+        # polled so that a cancelled test never takes an interpreter
+        while True:
+            try:
+                return self.idle.get_nowait()
+            except queue.Empty:
+                await asyncio.sleep(0.01)
+
+    async def run(
+        self,
+        kind: RunKind,
+        path: str,
+        env: dict[str, str],
+        timeout: float | None = None,
+    ) -> CommandResult:
+        interpreter = await self._acquire()
+        try:
+            result = await asyncio.to_thread(interpreter.run, kind, path, env, timeout)
+        except BaseException:
+            # cancelled while the test runs
+            interpreter.kill()
+            self.idle.put(Interpreter(self.preload))
+            raise
+        if result is None or not interpreter.is_alive():
+            # the test is still running or killed its interpreter
+            interpreter.kill()
+            interpreter = Interpreter(self.preload)
+        self.idle.put(interpreter)
+        if result is None:
+            assert timeout is not None
+            return timed_out(timeout)
+        return result
+
+    def shutdown(self):
+        while True:
+            try:
+                self.idle.get_nowait().kill()
+            except queue.Empty:
+                return
+
+
+_pool: InterpreterPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_interpreter_pool(size: int, preload: list[str] | None = None):
+    """
+    Returns the interpreter pool shared by all the sequences, the
+    interpreters are kept alive between runs so the imports are paid once.
+    """
+    global _pool
+    size = max(1, min(size, os.cpu_count() or 1))
+    preload = DEFAULT_PRELOAD if preload is None else preload
+    with _pool_lock:
+        if _pool is not None and (_pool.size, _pool.preload) != (size, preload):
+            _pool.shutdown()
+            _pool = None
+        if _pool is None:
+            logger.info(f"Starting test sequencer interpreter pool of {size}")
+            _pool = InterpreterPool(size, preload)
+        return _pool
+
+
+def shutdown_interpreter_pool():
+    """Kills the interpreters of the pool, called when captain shuts down"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
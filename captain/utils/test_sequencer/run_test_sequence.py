@@ -1,12 +1,13 @@
 import asyncio
+from contextvars import ContextVar
 from datetime import datetime
 import logging
-import subprocess
+import os
 import time
 from captain.routes.cloud import utcnow_str
 from flojoy_cloud import test_sequencer
 import traceback
-from typing import Callable, List, Union
+from typing import Awaitable, Callable, List, Union
 import pydantic
 from captain.internal.manager import TSManager
 from captain.models.test_sequencer import (
@@ -23,6 +24,13 @@ from captain.types.test_sequence import MsgState, TestSequenceMessage
 from captain.types.worker import PoisonPill
 from captain.utils.config import ts_manager
 from captain.utils.logger import logger
+from captain.utils.test_sequencer.interpreter_pool import (
+    CommandResult,
+    InterpreterPool,
+    RunKind,
+    get_interpreter_pool,
+    timed_out,
+)
 
 
 class TestResult:
@@ -46,6 +54,10 @@ class TestError:
         self.error = error
 
 
+DEFAULT_MAX_PARALLEL = os.cpu_count() or 4
+"""Tests of a parallel group running at the same time, unless the sequence sets it"""
+
+
 class Context:
     def __init__(
         self,
@@ -62,8 +74,57 @@ Extract = tuple[
 ]
 
 
-def _with_stream_test_result(func: Callable[[TestNode], Extract]):
-    # TODO: support run in parallel feature
+class TestExecutor:
+    """Where the tests of the running sequence are executed"""
+
+    def __init__(
+        self, pool: InterpreterPool | None = None, timeout: float | None = None
+    ):
+        self.pool = pool
+        self.timeout = timeout
+
+
+_executor: ContextVar[TestExecutor] = ContextVar("executor", default=TestExecutor())
+
+
+async def _run_command(
+    cmd: list[str], node: TestNode, timeout: float | None = None
+) -> CommandResult:
+    """
+    Runs a test command without blocking the event loop, so the tests of a
+    parallel group run at the same time. The test exports its data under
+    its own id, whatever the other running tests set in os.environ.
+    """
+    env = {**os.environ, test_sequencer.OPTIONAL_NAME_ENV: node.id}
+    proc = await asyncio.create_subprocess_exec(
+        *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE, env=env
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+    except TimeoutError:
+        proc.kill()
+        await proc.wait()
+        assert timeout is not None
+        return timed_out(timeout)
+    except asyncio.CancelledError:
+        # another test of the group failed or the sequence was stopped
+        proc.kill()
+        await proc.wait()
+        raise
+    assert proc.returncode is not None
+    return CommandResult(proc.returncode, stdout, stderr)
+
+
+async def _run_test_file(kind: RunKind, node: TestNode) -> CommandResult:
+    """Runs a python file or pytest node id, in a warm interpreter if enabled"""
+    executor = _executor.get()
+    if executor.pool is None:
+        return await _run_command([kind, node.path], node, executor.timeout)
+    env = {test_sequencer.OPTIONAL_NAME_ENV: node.id}
+    return await executor.pool.run(kind, node.path, env, executor.timeout)
+
+
+def _with_stream_test_result(func: Callable[[TestNode], Awaitable[Extract]]):
     async def wrapper(node: TestNode) -> Extract:
         await _stream_result_to_frontend(
             MsgState.running, test_id=node.id, result=StatusTypes.pending
@@ -73,7 +134,7 @@ def _with_stream_test_result(func: Callable[[TestNode], Extract]):
             f"Running test {node.id} - min: {node.min_value} | max: {node.max_value}"
         )
         test_sequencer._set_min_max(node.min_value, node.max_value)
-        children_getter, test_result = func(node)
+        children_getter, test_result = await func(node)
         measured_value = test_sequencer._get_most_recent_data(node.id)
         if test_result is None:
             raise Exception(f"{node.id}: Test returned None")
@@ -96,7 +157,7 @@ def _with_stream_test_result(func: Callable[[TestNode], Extract]):
 
 
 @_with_stream_test_result
-def _run_python(node: TestNode) -> Extract:
+async def _run_python(node: TestNode) -> Extract:
     """
     runs python file.
     @params file_path: path to the file
@@ -107,9 +168,7 @@ def _run_python(node: TestNode) -> Extract:
     """
     start_time = time.time()
     logger.info(f"[Python Runner] Running {node.path}")
-    result = subprocess.run(
-        ["python", node.path], stdout=subprocess.PIPE, stderr=subprocess.PIPE
-    )
+    result = await _run_test_file("python", node)
     logger.info(f"[Python Runner] Running {result}")
     end_time = time.time()
     if result.returncode == 0:
@@ -132,7 +191,7 @@ def _run_python(node: TestNode) -> Extract:
 
 
 @_with_stream_test_result
-def _run_pytest(node: TestNode) -> Extract:
+async def _run_pytest(node: TestNode) -> Extract:
     """
     @params file_path: path to the file
     @returns:
@@ -141,9 +200,7 @@ def _run_pytest(node: TestNode) -> Extract:
         str: error message if any
     """
     start_time = time.time()
-    result = subprocess.run(
-        ["pytest", node.path], stdout=subprocess.PIPE, stderr=subprocess.PIPE
-    )
+    result = await _run_test_file("pytest", node)
     end_time = time.time()
 
     if result.returncode == 0:
@@ -166,7 +223,7 @@ def _run_pytest(node: TestNode) -> Extract:
 
 
 @_with_stream_test_result
-def _run_placeholder(node: TestNode) -> Extract:
+async def _run_placeholder(node: TestNode) -> Extract:
     """
     @params file_path: path to the file
     @returns:
@@ -187,7 +244,7 @@ def _run_placeholder(node: TestNode) -> Extract:
 
 
 @_with_stream_test_result
-def _run_robotframework(node: TestNode) -> Extract:
+async def _run_robotframework(node: TestNode) -> Extract:
     """
     runs python file.
     @params file_path: path to the file
@@ -202,7 +259,7 @@ def _run_robotframework(node: TestNode) -> Extract:
         cmd = ["robot", "--test", *node.args, node.path]
     else:
         cmd = ["robot", node.path]
-    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    result = await _run_command(cmd, node, _executor.get().timeout)
     logger.info(f"[Robot Framework Runner] Running {result}")
     end_time = time.time()
     if result.returncode == 0:
@@ -329,13 +386,61 @@ async def _extract_from_node(
     return children_getter, test_result
 
 
+def _group_children(
+    children: List[TestRootNode] | List[TestSequenceElementNode],
+) -> list[list[TestRootNode | TestSequenceElementNode]]:
+    """
+    Splits the children in groups run one after the other: consecutive
+    tests flagged `run_in_parallel` form one group, every other node is a
+    group of its own.
+    """
+    groups: list[list[TestRootNode | TestSequenceElementNode]] = []
+    parallel = False
+    for child in children:
+        is_parallel = isinstance(child, TestNode) and child.run_in_parallel
+        if is_parallel and parallel:
+            groups[-1].append(child)
+        else:
+            groups.append([child])
+        parallel = is_parallel
+    return groups
+
+
 # TODO have pydantic model for data, convert camelCase to snake_case
 async def run_test_sequence(data, ts_manager: TSManager):
     data = pydantic.TypeAdapter(TestRootNode).validate_python(data)
     identifiers = set(data.identifiers)
     context = Context({}, identifiers)
+    max_parallel = data.max_parallel or DEFAULT_MAX_PARALLEL
+    semaphore = asyncio.Semaphore(max_parallel)
+    pool = None
+    if data.use_interpreter_pool:
+        pool = get_interpreter_pool(max_parallel, data.preload_modules)
+    _executor.set(TestExecutor(pool, data.test_timeout))
     try:
 
+        async def run_test(node: TestNode) -> TestResult | None:
+            async with semaphore:
+                await ts_manager.wait_if_paused(node.id)
+                _, test_result = await _extract_from_node(node, map_to_handler_run)
+            return test_result
+
+        async def run_parallel(nodes: list[TestNode]):
+            # every test streams its result as soon as it is done, but the
+            # results are added in the order of the sequence once the whole
+            # group is done, so the conditionals after it see all of them
+            tasks = [asyncio.create_task(run_test(node)) for node in nodes]
+            try:
+                test_results = await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+            for test_result in test_results:
+                if test_result:
+                    context.result_dict[test_result.test_node.test_name] = test_result
+
         async def run_dfs(node: TestRootNode | TestSequenceElementNode):
             if isinstance(node, TestNode):
                 await ts_manager.wait_if_paused(node.id)
@@ -350,8 +455,11 @@ async def run_test_sequence(data, ts_manager: TSManager):
             children = children_getter(context)
             if not children:
                 return
-            for child in children:
-                await run_dfs(child)
+            for group in _group_children(children):
+                if len(group) > 1:
+                    await run_parallel(group)  # type: ignore
+                else:
+                    await run_dfs(group[0])
 
         await _stream_result_to_frontend(state=MsgState.test_set_start)
         await run_dfs(data)  # run tests
@@ -9,6 +9,8 @@ from .data_container import *  # noqa: F403
 from .utils import *  # noqa: F403
 from .parameter_types import *  # noqa: F403
 from .small_memory import *  # noqa: F403
+from .stream_buffer import *  # noqa: F403
+from .cloud_outbox import *  # noqa: F403
 from .flojoy_node_venv import *  # noqa: F403
 from .job_service import *  # noqa: F403
 from .node_init import *  # noqa: F403
@@ -25,4 +25,5 @@ def flojoy(
     deps: Optional[list[str]] = None,
     inject_node_metadata: bool = False,
     inject_connection: bool = False,
+    cpu_bound: bool = False,
 ) -> Callable[..., DataContainer | dict[str, Any] | None]: ...  # noqa: F405
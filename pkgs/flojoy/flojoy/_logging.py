@@ -217,6 +217,9 @@ class MPSpawnReadWritePipe:
         def flush(self):
             pass
 
+    # seconds waited for data by read_is_empty
+    POLL_TIMEOUT = 0.05
+
     def __init__(self) -> None:
         super().__init__()
         self.read_conn, self.write_conn = multiprocessing.get_context("spawn").Pipe(
@@ -226,7 +229,8 @@ class MPSpawnReadWritePipe:
         self._writer_is_closed = False
 
     def read_is_empty(self) -> bool:
-        return not self.read_conn.poll()
+        # wait a little for data, so the logging thread does not spin
+        return not self.read_conn.poll(self.POLL_TIMEOUT)
 
     def read_is_closed(self) -> bool:
         return self.read_conn.closed
@@ -0,0 +1,200 @@
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+
+from .CONSTANTS import FLOJOY_CACHE_DIR
+
+"""
+Durable outbox of the payloads uploaded to Flojoy Cloud.
+
+Test sessions and `FLOJOY_CLOUD_UPLOAD` measurements are not posted while
+the station waits: they are written to a SQLite database under the flojoy
+directory, which takes a few milliseconds whatever the network does, and
+Studio uploads them in the background (see
+`captain.services.cloud_uploader`). A failed upload is retried with an
+exponential backoff, the entries survive a restart of Studio.
+
+The payloads are stored as zlib-compressed JSON. Any process may enqueue,
+e.g. blocks running in their own virtual environment: SQLite serializes the
+writes.
+"""
+
+__all__ = ["CloudOutbox", "OutboxEntry", "make_measurement_payload"]
+
+OUTBOX_PATH = os.path.join(FLOJOY_CACHE_DIR, "cloud_outbox.sqlite")
+
+RETRY_BASE_DELAY = 2.0
+RETRY_MAX_DELAY = 600.0
+
+
+class OutboxEncoder(json.JSONEncoder):
+    def default(self, o: Any):
+        if isinstance(o, np.ndarray):
+            return o.tolist()
+        if isinstance(o, np.generic):
+            return o.item()
+        return super().default(o)
+
+
+def make_measurement_payload(data: Any, unit: str | None = None) -> dict[str, Any]:
+    """The `data` of a measurement, as expected by Flojoy Cloud"""
+    match data:
+        case bool() | np.bool_():
+            return {"type": "boolean", "value": bool(data)}
+        case pd.DataFrame():
+            # numpy arrays, turned into lists by the encoder in one pass
+            value = {str(name): data[name].to_numpy() for name in data.columns}
+            return {"type": "dataframe", "value": value}
+        case int() | float() | np.integer() | np.floating():
+            return {"type": "scalar", "value": data, "unit": unit}
+        case _:
+            raise TypeError(f"Unsupported data type: {type(data)}")
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter, so stations do not retry together"""
+    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+@dataclass
+class OutboxEntry:
+    id: int
+    endpoint: str
+    body: bytes  # JSON
+    attempts: int
+
+    @property
+    def payload(self) -> dict[str, Any]:
+        return json.loads(self.body)
+
+
+class CloudOutbox:
+    """
+    Payloads waiting to be posted to an endpoint of the Flojoy Cloud API.
+    Entries are `pending` until uploaded (then deleted), or `failed` when
+    the cloud rejected them for good, they are kept for inspection.
+    """
+
+    def __init__(self, path: str = OUTBOX_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            path, timeout=30, check_same_thread=False, isolation_level=None
+        )
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    endpoint TEXT NOT NULL,
+                    payload BLOB NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_error TEXT
+                )
+                """
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt)"
+            )
+
+    def enqueue(self, endpoint: str, payload: dict[str, Any]) -> int:
+        """Stores a payload to post to `endpoint`, returns the id of the entry"""
+        blob = zlib.compress(json.dumps(payload, cls=OutboxEncoder).encode(), 1)
+        now = time.time()
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO outbox (endpoint, payload, next_attempt, created_at)"
+                " VALUES (?, ?, ?, ?)",
+                (endpoint, blob, now, now),
+            )
+        assert cursor.lastrowid is not None
+        return cursor.lastrowid
+
+    def due(self, limit: int, now: float | None = None) -> list[OutboxEntry]:
+        """The oldest pending entries whose backoff is over"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, endpoint, payload, attempts FROM outbox"
+                " WHERE status = 'pending' AND next_attempt <= ?"
+                " ORDER BY id LIMIT ?",
+                (time.time() if now is None else now, limit),
+            ).fetchall()
+        return [
+            OutboxEntry(id, endpoint, zlib.decompress(blob), attempts)
+            for id, endpoint, blob, attempts in rows
+        ]
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        # the updates of a batch are written at once
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def uploaded(self, ids: Iterable[int]):
+        with self._transaction() as db:
+            db.executemany("DELETE FROM outbox WHERE id = ?", [(id,) for id in ids])
+
+    def retry(self, errors: dict[int, str]):
+        """Schedules the next attempt of the entries that failed to upload"""
+        now = time.time()
+        with self._transaction() as db:
+            attempts = dict(
+                db.execute(
+                    f"SELECT id, attempts FROM outbox WHERE id IN ({_params(errors)})",
+                    list(errors),
+                ).fetchall()
+            )
+            db.executemany(
+                "UPDATE outbox SET attempts = ?, next_attempt = ?, last_error = ?"
+                " WHERE id = ?",
+                [
+                    (attempts[id] + 1, now + retry_delay(attempts[id] + 1), error, id)
+                    for id, error in errors.items()
+                    if id in attempts
+                ],
+            )
+
+    def fail(self, errors: dict[int, str]):
+        """Keeps the entries rejected by the cloud without retrying them"""
+        with self._transaction() as db:
+            db.executemany(
+                "UPDATE outbox SET status = 'failed', attempts = attempts + 1,"
+                " last_error = ? WHERE id = ?",
+                [(error, id) for id, error in errors.items()],
+            )
+
+    def count(self, status: str = "pending") -> int:
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM outbox WHERE status = ?", (status,)
+            ).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def _params(values: Iterable[Any]) -> str:
+    return ", ".join("?" for _ in values)
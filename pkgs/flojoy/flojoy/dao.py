@@ -3,6 +3,8 @@ from pandas import DataFrame as PandasDataFrame
 from typing import Any, Callable
 from threading import Lock
 from .data_container import DCNpArrayType
+from .shared_memory import SharedResultStore
+from .stream_buffer import StreamBuffer
 
 MAX_LIST_SIZE = 1000
 
@@ -44,6 +46,10 @@ class Dao:
         self.job_results = {}
         self.node_init_container = {}
         self.node_init_func = {}
+        self.result_store: SharedResultStore | None = None
+        self.job_consumers: dict[str, int] = {}  # consumers of each job result
+        self.pending_consumers: dict[str, int] = {}  # consumers yet to read it
+        self.released_results = 0
 
     """
     METHODS FOR JOB RESULTS
@@ -57,12 +63,23 @@ class Dao:
         return res
 
     def post_job_result(self, job_id: str, result: Any):
+        store = self.result_store
+        if store is not None:
+            store.share(job_id, result)
         with _dict_job_lock:
             self.job_results[job_id] = result
+            consumers = self.job_consumers.get(job_id)
+            if consumers is not None:
+                self.pending_consumers[job_id] = consumers
 
     def clear_job_results(self):
         with _dict_job_lock:
             self.job_results.clear()
+            self.job_consumers.clear()
+            self.pending_consumers.clear()
+            self.released_results = 0
+        if self.result_store is not None:
+            self.result_store.clear()
 
     def job_exists(self, job_id: str) -> bool:
         with _dict_job_lock:
@@ -71,6 +88,59 @@ class Dao:
     def delete_job(self, job_id: str):
         with _dict_job_lock:
             self.job_results.pop(job_id, None)
+            self.pending_consumers.pop(job_id, None)
+        if self.result_store is not None:
+            self.result_store.evict(job_id)
+
+    def set_job_consumers(self, job_id: str, consumers: int):
+        """
+        Sets how many jobs read the result of the job, every time the
+        result is posted it can be released that many times before
+        being evicted.
+        """
+        with _dict_job_lock:
+            self.job_consumers[job_id] = consumers
+
+    def release_job_result(self, job_id: str) -> bool:
+        """
+        Signals that a consumer of the job is done with its result,
+        the result is evicted after the last consumer. Jobs without a
+        consumer count are never evicted this way.
+        Returns True if the result was evicted.
+        """
+        with _dict_job_lock:
+            remaining = self.pending_consumers.get(job_id)
+            if remaining is None:
+                return False
+            if remaining > 1:
+                self.pending_consumers[job_id] = remaining - 1
+                return False
+            del self.pending_consumers[job_id]
+            self.job_results.pop(job_id, None)
+            self.released_results += 1
+        if self.result_store is not None:
+            self.result_store.evict(job_id)
+        return True
+
+    def enable_shared_results(self, enabled: bool = True):
+        """Switches job results of large arrays to shared memory segments"""
+        if enabled and self.result_store is None:
+            self.result_store = SharedResultStore()
+        elif not enabled and self.result_store is not None:
+            self.result_store.clear()
+            self.result_store = None
+
+    def get_memory_stats(self) -> dict[str, Any]:
+        with _dict_job_lock:
+            stats: dict[str, Any] = {
+                "job_results": len(self.job_results),
+                "pending_consumers": len(self.pending_consumers),
+                "released_results": self.released_results,
+            }
+        stats["shared_memory"] = (
+            self.result_store.stats() if self.result_store is not None else None
+        )
+        return stats
 
     """
     METHODS FOR SMALL MEMORY
@@ -115,6 +185,16 @@ class Dao:
         self.check_if_valid(encoded, ndarray)
         return encoded
 
+    def set_stream_buffer(self, key: str, buffer: StreamBuffer):
+        with _dict_sm_lock:
+            self.storage[key] = buffer
+
+    def get_stream_buffer(self, key: str) -> StreamBuffer | None:
+        with _dict_sm_lock:
+            buffer = self.storage.get(key, None)
+        self.check_if_valid(buffer, StreamBuffer)
+        return buffer
+
     def get_str(self, key: str) -> str | None:
         with _dict_sm_lock:
             encoded = self.storage.get(key, None)
@@ -1,11 +1,13 @@
 import difflib
 import typing
+from copy import deepcopy
 import numpy as np
 from pandas import DataFrame as PandasDataFrame
-from box import Box, box_list
 import plotly.graph_objects as go  # type:ignore
 from typing import Union, Literal, get_args, Any, cast
 
+from .stream_buffer import StreamBuffer
+
 
 def find_closest_match(given_str: str, available_str: list[str]):
     closest_match = difflib.get_close_matches(given_str, available_str, n=1)
@@ -30,6 +32,7 @@ DCType = Literal[
     "Surface",
     "Vector",
     "Stateful",
+    "Stream",
     "ParametricDataFrame",
     "ParametricGrayscale",
     "ParametricImage",
@@ -60,11 +63,31 @@ DCKwargsValue = Union[
 
 ExtraType = dict[str, Any] | None
 
+# allowed keys, required keys and whether the type is parametric
+ValidationRule = tuple[frozenset[str], tuple[str, ...], bool]
+
+
+def _build_validation_rules(
+    type_keys_map: dict[DCType, list[str]],
+) -> dict[str, ValidationRule]:
+    rules: dict[str, ValidationRule] = {}
+    for dc_type in get_args(DCType):
+        parametric = dc_type.startswith("Parametric")
+        keys = list(type_keys_map[dc_type.removeprefix("Parametric")])  # type:ignore
+        if parametric:
+            keys.append("t")
+        rules[dc_type] = (frozenset(keys + ["extra", "type"]), tuple(keys), parametric)
+    return rules
+
 
-class DataContainer(Box):
+class DataContainer(dict[str, Any]):
     """
     A class that processes various types of data and supports dot assignment
 
+    The data is stored in the dict itself (which is what gets serialized),
+    attributes are mapped to its keys. Containers have no instance
+    `__dict__`, subclasses must declare `__slots__ = ()` to keep it that way.
+
     Learn more: https://github.com/flojoy-io/flojoy-python/issues/4
 
     Usage
@@ -97,6 +120,7 @@ class DataContainer(Box):
         "s",
         "fig",
         "obj",
+        "stream",
         "extra",
     ]
     combinations = {
@@ -115,6 +139,7 @@ class DataContainer(Box):
         "bytes": ["extra"],
         "bool": ["extra"],
         "s": ["extra"],
+        "stream": ["extra"],
         "extra": [*(k for k in allowed_keys if k not in ["extra"])],
         "fig": ["t", "extra"],
     }
@@ -133,6 +158,7 @@ class DataContainer(Box):
         "String": ["s"],
         "Boolean": ["b"],
         "Stateful": ["obj"],
+        "Stream": ["stream"],
     }
 
     SKIP_ARRAYIEFY_TYPES = [
@@ -143,14 +169,28 @@ class DataContainer(Box):
         PandasDataFrame,
         np.ndarray,
     ]  # value types not to be arrayified
+    _skip_arrayify_types = frozenset(SKIP_ARRAYIEFY_TYPES)
+    _skip_arrayify_keys = frozenset(["type", "extra", "c", "obj", "stream"])
+    _validation_rules = _build_validation_rules(type_keys_map)
+
+    __slots__ = ()
 
     type: DCType
 
-    def copy(self):
-        # Create an instance of DataContainer class
-        copied_instance = DataContainer(**self)
+    def copy(self, deep: bool = False):
+        """
+        Copies the container, the values are shared with the copy unless
+        `deep` is set
+        """
+        if deep:
+            return deepcopy(self)
+        copied_instance = self.__class__.__new__(self.__class__)
+        dict.update(copied_instance, self)
         return copied_instance
 
+    def to_dict(self) -> dict[str, Any]:
+        return dict(self)
+
     def _ndarrayify(
         self, value: DCKwargsValue
     ) -> Union[
@@ -163,11 +203,6 @@ class DataContainer(Box):
             for k, v in value.items():
                 arrayified_value[k] = cast(DCNpArrayType, self._ndarrayify(v))
             return arrayified_value
-        elif isinstance(value, box_list.BoxList):
-            arrayified_value: dict[str, DCNpArrayType] = {}
-            for k, v in value.__dict__.items():
-                arrayified_value[k] = cast(DCNpArrayType, self._ndarrayify(v))
-            return arrayified_value
         elif isinstance(value, list):
             return np.array(value)
         elif value is None:
@@ -181,25 +216,45 @@ class DataContainer(Box):
     def __init__(  # type:ignore
         self, type: DCType = "OrderedPair", **kwargs: DCKwargsValue
     ):
-        self.type = type
+        dict.__setitem__(self, "type", type)
         for k, v in kwargs.items():
             self[k] = v
 
-    def __getattribute__(self, __name: str) -> Any:
-        return super().__getattribute__(__name)
+    def __getattr__(self, name: str) -> Any:
+        # only called for names that are not attributes of the class
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(
+                f"'{self.__class__.__name__}' object has no attribute '{name}'"
+            ) from None
+
+    def __setattr__(self, name: str, value: DCKwargsValue) -> None:
+        self[name] = value
 
-    def __getitem__(self, key: str, _ignore_default: bool = False) -> Any:
-        return super().__getitem__(key, _ignore_default)  # type:ignore
+    def __delattr__(self, name: str) -> None:
+        try:
+            del self[name]
+        except KeyError:
+            raise AttributeError(name) from None
 
     def __setitem__(self, key: str, value: DCKwargsValue) -> None:
         if (
-            key not in ["type", "extra", "c", "obj"]
-            and type(value) not in self.SKIP_ARRAYIEFY_TYPES
+            key not in self._skip_arrayify_keys
+            and type(value) not in self._skip_arrayify_types
         ):
-            formatted_value = self._ndarrayify(value)
-            super().__setitem__(key, formatted_value)  # type:ignore
-        else:
-            super().__setitem__(key, value)  # type: ignore
+            value = self._ndarrayify(value)  # type:ignore
+        dict.__setitem__(self, key, value)
+
+    def update(self, *args: Any, **kwargs: Any) -> None:  # type:ignore
+        for k, v in dict(*args, **kwargs).items():
+            self[k] = v
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({dict.__repr__(self)})"
+
+    def __str__(self) -> str:
+        return dict.__repr__(self)
 
     def __check_combination(self, key: str, keys: list[str], allowed_keys: list[str]):
         for i in keys:
@@ -209,34 +264,17 @@ class DataContainer(Box):
                 )
 
     def __validate_key_for_type(self, data_type: DCType, key: str):
-        if data_type.startswith("parametric_") and key != "t":
-            splitted_type = cast(DCType, data_type.split("parametric_")[1])
-            self.__validate_key_for_type(splitted_type, key)
-        else:
-            if (
-                key not in self.type_keys_map[data_type] + ["extra"]
-                and data_type != "plotly"
-            ):
-                raise KeyError(
-                    self.__build_error_text(
-                        key, data_type, self.type_keys_map[data_type]
-                    )
-                )
+        allowed_keys, type_keys, _ = self._validation_rules[data_type]
+        if key not in allowed_keys:
+            raise KeyError(self.__build_error_text(key, data_type, list(type_keys)))
 
     def __check_for_missing_keys(self, dc_type: DCType, keys: list[str]):
-        if dc_type.startswith("parametric_"):
-            if "t" not in keys:
-                raise KeyError(f't key must be provided for "{dc_type}"')
-            t = self["t"]
-            is_ascending_order = all(t[i] <= t[i + 1] for i in range(len(t) - 1))
-            if is_ascending_order is not True:
-                raise ValueError("t key must be in ascending order")
-            splitted_type = cast(DCType, dc_type.split("parametric_")[1])
-            self.__check_for_missing_keys(splitted_type, keys)
-        else:
-            for k in self.type_keys_map[dc_type]:
-                if k not in keys:
-                    raise KeyError(f'"{k}" key must be provided for type "{dc_type}"')
+        _, type_keys, parametric = self._validation_rules[dc_type]
+        if parametric and "t" not in keys:
+            raise KeyError(f't key must be provided for "{dc_type}"')
+        for k in type_keys:
+            if k not in keys:
+                raise KeyError(f'"{k}" key must be provided for type "{dc_type}"')
 
     def __build_error_text(self, key: str, data_type: str, available_keys: list[str]):
         return (
@@ -245,7 +283,19 @@ class DataContainer(Box):
         )
 
     def validate(self):
-        dc_type = self.type
+        dc_type = self["type"]
+        rule = self._validation_rules.get(dc_type)
+
+        if rule is not None:
+            allowed_keys, type_keys, parametric = rule
+            if self.keys() <= allowed_keys and all(k in self for k in type_keys):
+                if parametric:
+                    t = np.asarray(self["t"])
+                    if t.size > 1 and not np.all(t[1:] >= t[:-1]):
+                        raise ValueError("t key must be in ascending order")
+                return
+            # find which key is wrong
+            self.__validate_keys(dc_type)
 
         if dc_type not in self.allowed_types:
             closest_type = find_closest_match(dc_type, self.allowed_types)
@@ -258,6 +308,8 @@ class DataContainer(Box):
                 f'unsupported type "{dc_type}" passed to '
                 f"DataContainer class, {helper_text}"
             )
+
+    def __validate_keys(self, dc_type: DCType):
         dc_keys = list(cast(list[str], self.keys()))
         for k in dc_keys:
             if k != "type":
@@ -271,6 +323,8 @@ class DataContainer(Box):
 
 
 class OrderedPair(DataContainer):
+    __slots__ = ()
+
     x: DCNpArrayType
     y: DCNpArrayType
 
@@ -281,6 +335,8 @@ class OrderedPair(DataContainer):
 
 
 class ParametricOrderedPair(DataContainer):
+    __slots__ = ()
+
     x: DCNpArrayType
     y: DCNpArrayType
     t: DCNpArrayType
@@ -296,6 +352,8 @@ class ParametricOrderedPair(DataContainer):
 
 
 class OrderedTriple(DataContainer):
+    __slots__ = ()
+
     x: DCNpArrayType
     y: DCNpArrayType
     z: DCNpArrayType
@@ -311,6 +369,8 @@ class OrderedTriple(DataContainer):
 
 
 class ParametricOrderedTriple(DataContainer):
+    __slots__ = ()
+
     x: DCNpArrayType
     y: DCNpArrayType
     z: DCNpArrayType
@@ -330,6 +390,8 @@ class ParametricOrderedTriple(DataContainer):
 
 
 class Surface(DataContainer):
+    __slots__ = ()
+
     x: DCNpArrayType
     y: DCNpArrayType
     z: DCNpArrayType
@@ -350,6 +412,8 @@ class Surface(DataContainer):
 
 
 class ParametricSurface(DataContainer):
+    __slots__ = ()
+
     x: DCNpArrayType
     y: DCNpArrayType
     z: DCNpArrayType
@@ -372,6 +436,8 @@ class ParametricSurface(DataContainer):
 
 
 class Scalar(DataContainer):
+    __slots__ = ()
+
     c: int | float
 
     def __init__(self, c: int | float, extra: ExtraType = None):  # type:ignore
@@ -379,6 +445,8 @@ class Scalar(DataContainer):
 
 
 class ParametricScalar(DataContainer):
+    __slots__ = ()
+
     c: int | float
     t: DCNpArrayType
 
@@ -389,6 +457,8 @@ class ParametricScalar(DataContainer):
 
 
 class Vector(DataContainer):
+    __slots__ = ()
+
     v: DCNpArrayType
 
     def __init__(self, v: DCNpArrayType, extra: ExtraType = None):  # type:ignore
@@ -396,6 +466,8 @@ class Vector(DataContainer):
 
 
 class ParametricVector(DataContainer):
+    __slots__ = ()
+
     v: DCNpArrayType
 
     def __init__(  # type: ignore
@@ -405,6 +477,8 @@ class ParametricVector(DataContainer):
 
 
 class Matrix(DataContainer):
+    __slots__ = ()
+
     m: DCNpArrayType
 
     def __init__(self, m: DCNpArrayType, extra: ExtraType = None):  # type:ignore
@@ -412,6 +486,8 @@ class Matrix(DataContainer):
 
 
 class ParametricMatrix(DataContainer):
+    __slots__ = ()
+
     m: DCNpArrayType
     t: DCNpArrayType
 
@@ -422,6 +498,8 @@ class ParametricMatrix(DataContainer):
 
 
 class DataFrame(DataContainer):
+    __slots__ = ()
+
     m: PandasDataFrame
 
     def __init__(self, df: PandasDataFrame, extra: ExtraType = None):  # type:ignore
@@ -429,6 +507,8 @@ class DataFrame(DataContainer):
 
 
 class ParametricDataFrame(DataContainer):
+    __slots__ = ()
+
     m: PandasDataFrame
     t: DCNpArrayType
 
@@ -439,6 +519,8 @@ class ParametricDataFrame(DataContainer):
 
 
 class Plotly(DataContainer):
+    __slots__ = ()
+
     fig: go.Figure
 
     def __init__(self, fig: go.Figure, extra: ExtraType = None):  # type:ignore
@@ -446,6 +528,8 @@ class Plotly(DataContainer):
 
 
 class ParametricPlotly(DataContainer):
+    __slots__ = ()
+
     fig: go.Figure
     t: DCNpArrayType
 
@@ -456,6 +540,8 @@ class ParametricPlotly(DataContainer):
 
 
 class Image(DataContainer):
+    __slots__ = ()
+
     r: DCNpArrayType
     g: DCNpArrayType
     b: DCNpArrayType
@@ -473,6 +559,8 @@ class Image(DataContainer):
 
 
 class Bytes(DataContainer):
+    __slots__ = ()
+
     b: bytes
 
     def __init__(
@@ -483,6 +571,8 @@ class Bytes(DataContainer):
 
 
 class String(DataContainer):
+    __slots__ = ()
+
     s: str
 
     def __init__(self, s: str):
@@ -490,6 +580,8 @@ class String(DataContainer):
 
 
 class Boolean(DataContainer):
+    __slots__ = ()
+
     b: bool
 
     def __init__(
@@ -500,6 +592,8 @@ class Boolean(DataContainer):
 
 
 class ParametricImage(DataContainer):
+    __slots__ = ()
+
     t: DCNpArrayType
     r: DCNpArrayType
     g: DCNpArrayType
@@ -519,6 +613,8 @@ class ParametricImage(DataContainer):
 
 
 class Grayscale(DataContainer):
+    __slots__ = ()
+
     m: DCNpArrayType
 
     def __init__(self, img: DCNpArrayType, extra: ExtraType = None):  # type:ignore
@@ -526,6 +622,8 @@ class Grayscale(DataContainer):
 
 
 class ParametricGrayscale(DataContainer):
+    __slots__ = ()
+
     m: DCNpArrayType
     t: DCNpArrayType
 
@@ -536,7 +634,54 @@ class ParametricGrayscale(DataContainer):
 
 
 class Stateful(DataContainer):
+    __slots__ = ()
+
     obj: Any
 
     def __init__(self, obj: Any, extra: ExtraType = None):
         super().__init__(type="Stateful", obj=obj, extra=extra)
+
+
+class Stream(DataContainer):
+    """
+    Samples appended by chunks to a growable columnar buffer, e.g. the
+    acquisitions of a loop. Appending is amortized O(1) per sample and the
+    columns are numpy views on the buffer.
+
+    Parameters
+    ----------
+    stream : StreamBuffer, optional
+        The buffer holding the columns, a new one without a maximum length by default.
+    """
+
+    __slots__ = ()
+
+    stream: StreamBuffer
+
+    def __init__(self, stream: StreamBuffer | None = None, extra: ExtraType = None):
+        super().__init__(
+            type="Stream",
+            stream=stream if stream is not None else StreamBuffer(),
+            extra=extra,
+        )
+
+    def append(self, **chunks: Any):
+        """Appends a chunk of samples to every column, see `StreamBuffer.append`"""
+        self.stream.append(**chunks)
+
+    def append_container(self, dc: DataContainer):
+        """Appends the arrays of an OrderedPair, OrderedTriple, Vector, Scalar or Matrix"""
+        if isinstance(dc, Stream):
+            self.stream.append(**dc.stream.to_dict())
+            return
+        if dc.type not in [
+            "OrderedPair",
+            "OrderedTriple",
+            "Vector",
+            "Scalar",
+            "Matrix",
+        ]:
+            raise ValueError(f"Cannot append a {dc.type} to a Stream")
+        self.stream.append(
+            **{key: np.atleast_1d(dc[key]) for key in self.type_keys_map[dc.type]}
+        )
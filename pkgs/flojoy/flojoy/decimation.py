@@ -0,0 +1,148 @@
+from typing import Any, Literal
+
+import numpy as np
+
+"""
+Decimation of plot traces before they are sent to the front-end.
+
+Visualization blocks routinely produce traces with millions of points, far
+more than a plot can show. The traces of the plotly figures sent to the UI
+are reduced to a point budget, the job results used by the downstream
+blocks are left untouched.
+
+- `lttb`: Largest-Triangle-Three-Buckets, keeps the shape of the curve
+- `minmax`: keeps the minimum and maximum of each bucket (envelope), so
+  spikes and the amplitude of noisy signals are preserved
+"""
+
+DecimationMethod = Literal["lttb", "minmax", "none"]
+
+# trace types with one (x, y) pair per point
+DECIMATED_TRACE_TYPES = {"scatter", "scattergl"}
+# per point attributes sliced along with x and y
+POINT_ATTRIBUTES = ("x", "y", "text", "hovertext", "customdata", "ids")
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets.
+
+    Vectorized variant: each bucket keeps the point forming the largest
+    triangle with the averages of the previous and next buckets.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    inner = n - 2
+    size = -(-inner // (n_out - 2))  # ceil
+    n_buckets = -(-inner // size)
+    padding = n_buckets * size - inner
+
+    bx = np.pad(x[1:-1].astype(np.float64), (0, padding), constant_values=np.nan)
+    by = np.pad(y[1:-1].astype(np.float64), (0, padding), constant_values=np.nan)
+    bx = bx.reshape(n_buckets, size)
+    by = by.reshape(n_buckets, size)
+
+    with np.errstate(invalid="ignore"):
+        mean_x = np.nanmean(bx, axis=1)
+        mean_y = np.nanmean(by, axis=1)
+    prev_x = np.concatenate(([x[0]], mean_x[:-1]))
+    prev_y = np.concatenate(([y[0]], mean_y[:-1]))
+    next_x = np.concatenate((mean_x[1:], [x[-1]]))
+    next_y = np.concatenate((mean_y[1:], [y[-1]]))
+
+    area = np.abs(
+        (prev_x - next_x)[:, None] * (by - prev_y[:, None])
+        - (prev_x[:, None] - bx) * (next_y - prev_y)[:, None]
+    )
+    area[np.isnan(area)] = -1
+    selected = np.argmax(area, axis=1) + np.arange(n_buckets) * size + 1
+    return np.concatenate(([0], selected, [n - 1]))
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of the minimum and maximum of each bucket, in order"""
+    n = len(y)
+    if n_out >= n or n_out < 2:
+        return np.arange(n)
+
+    n_buckets = max(1, (n_out - 2) // 2)
+    size = -(-n // n_buckets)
+    n_buckets = -(-n // size)
+    padding = n_buckets * size - n
+    values = y.astype(np.float64)
+    nan = np.isnan(values)
+    low = np.pad(np.where(nan, np.inf, values), (0, padding), constant_values=np.inf)
+    high = np.pad(np.where(nan, -np.inf, values), (0, padding), constant_values=-np.inf)
+    offsets = np.arange(n_buckets) * size
+    argmin = np.argmin(low.reshape(n_buckets, size), axis=1) + offsets
+    argmax = np.argmax(high.reshape(n_buckets, size), axis=1) + offsets
+    indices = np.unique(np.concatenate((argmin, argmax, [0, n - 1])))
+    return indices[indices < n]
+
+
+def decimate_trace(
+    trace: dict[str, Any], max_points: int, method: DecimationMethod = "lttb"
+) -> dict[str, Any]:
+    """Returns the trace reduced to `max_points` points, or the trace itself"""
+    if method == "none" or trace.get("type", "scatter") not in DECIMATED_TRACE_TYPES:
+        return trace
+    y = trace.get("y")
+    if y is None or len(y) <= max_points:
+        return trace
+    y = np.asarray(y)
+    if y.ndim != 1 or y.dtype.kind not in "biuf":
+        return trace
+
+    x = trace.get("x")
+    if x is None:
+        x = np.arange(len(y))
+    x = np.asarray(x)
+    if len(x) != len(y):
+        return trace
+
+    if method == "minmax":
+        indices = minmax_indices(y, max_points)
+    else:
+        # non numeric x axes (dates, categories) are decimated by position
+        positions = x if x.dtype.kind in "biuf" else np.arange(len(y))
+        indices = lttb_indices(positions, y, max_points)
+
+    decimated = dict(trace)
+    decimated["x"] = x
+    for key in POINT_ATTRIBUTES:
+        value = decimated.get(key)
+        if value is not None and not isinstance(value, str) and len(value) == len(y):
+            decimated[key] = np.asarray(value)[indices]
+    return decimated
+
+
+def decimate_figure(
+    fig: dict[str, Any] | None, max_points: int, method: DecimationMethod = "lttb"
+) -> dict[str, Any] | None:
+    """Decimates the traces of a plotly figure dict, the figure is not modified"""
+    if not fig or max_points <= 0 or method == "none":
+        return fig
+    traces = fig.get("data")
+    if not traces:
+        return fig
+    decimated = [decimate_trace(trace, max_points, method) for trace in traces]
+    if all(a is b for a, b in zip(decimated, traces)):
+        return fig
+    return {**fig, "data": decimated}
+
+
+def decimate_result(
+    result: dict[str, Any] | None, max_points: int, method: DecimationMethod = "lttb"
+) -> dict[str, Any] | None:
+    """
+    Decimates the figure of a result object built by
+    `get_frontend_res_obj_from_result`, returns a new object if needed.
+    """
+    if not result or not isinstance(result.get("plotly_fig"), dict):
+        return result
+    fig = decimate_figure(result["plotly_fig"], max_points, method)
+    if fig is result["plotly_fig"]:
+        return result
+    return {**result, "plotly_fig": fig}
@@ -20,9 +20,10 @@ def TORCH_NODE(default: Matrix) -> Matrix:
 
 """
 
+import atexit
 import hashlib
-import importlib.metadata
 import inspect
+import json
 import logging
 import multiprocessing
 import multiprocessing.connection
@@ -33,17 +34,20 @@ import sys
 import threading
 import traceback
 import venv
+import weakref
 from collections.abc import Iterable, Mapping
-from contextlib import ExitStack, contextmanager
-from functools import wraps
+from contextlib import ExitStack
+from functools import lru_cache, wraps
 from time import sleep
 from typing import Any, Callable
 
 import cloudpickle
 import portalocker
 
-from ._logging import LogPipe, LogPipeMode, StreamEnum
+from . import shared_memory
+from ._logging import LogPipe, LogPipeMode, PipeWriter
 from .CONSTANTS import FLOJOY_CACHE_DIR
+from .package_index import get_installed_packages, list_packages, missing_requirements
 
 __all__ = ["run_in_venv"]
 
@@ -52,28 +56,19 @@ def _get_venv_cache_dir():
     return os.path.join(FLOJOY_CACHE_DIR, "flojoy_node_venv")
 
 
-def _get_venv_syspath(venv_executable: os.PathLike[Any]) -> list[str]:
-    """Get the sys.path of the virtual environment."""
+def _get_pip_cache_dir():
+    """Wheel and http cache of pip, shared by all the virtual environments"""
+    return os.path.join(FLOJOY_CACHE_DIR, "pip_cache")
+
+
+@lru_cache(maxsize=None)
+def _get_venv_syspath(venv_executable: os.PathLike[Any] | str) -> list[str]:
+    """Get the sys.path of the virtual environment, computed once per executable."""
     command = [venv_executable, "-c", "import sys\nprint(sys.path)"]
     cmd_output = subprocess.run(command, check=True, capture_output=True, text=True)
     return eval(cmd_output.stdout)
 
 
-@contextmanager
-def swap_sys_path(
-    venv_executable: os.PathLike[Any], extra_sys_path: list[str] | None = None
-):
-    """Temporarily swap the sys.path of the child process with the sys.path of the parent process."""
-    old_path = sys.path
-    try:
-        new_path = _get_venv_syspath(venv_executable)
-        extra_sys_path = [] if extra_sys_path is None else extra_sys_path
-        sys.path = new_path + extra_sys_path
-        yield
-    finally:
-        sys.path = old_path
-
-
 def _get_venv_executable_path(
     venv_path: os.PathLike[Any] | str,
 ) -> os.PathLike[Any] | str:
@@ -93,6 +88,91 @@ def _get_venv_lockfile_path(
     )
 
 
+def _get_venv_packages_path(venv_path: os.PathLike[Any] | str) -> str:
+    """Get the path to the file listing the packages installed in the virtual environment."""
+    return os.path.join(venv_path, ".venv_packages.json")
+
+
+def _read_venv_packages(venv_path: os.PathLike[Any] | str) -> dict[str, str] | None:
+    """Packages of a complete virtual environment, None if unknown."""
+    if not os.path.exists(os.path.join(venv_path, ".venv_is_complete")):
+        return None
+    try:
+        with open(_get_venv_packages_path(venv_path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _record_venv_packages(venv_path: os.PathLike[Any] | str):
+    venv_root = os.path.realpath(venv_path)
+    site_dirs = [
+        path
+        for path in _get_venv_syspath(_get_venv_executable_path(venv_path))
+        if os.path.realpath(path).startswith(venv_root)
+    ]
+    with open(_get_venv_packages_path(venv_path), "w") as f:
+        json.dump(list_packages(site_dirs), f)
+
+
+def _find_superset_venv(
+    venv_path: os.PathLike[Any] | str, pip_dependencies: list[str]
+) -> str | None:
+    """A complete virtual environment next to venv_path that satisfies all the dependencies."""
+    for entry in os.scandir(os.path.dirname(venv_path)):
+        if not entry.is_dir() or os.path.realpath(entry.path) == os.path.realpath(
+            venv_path
+        ):
+            continue
+        packages = _read_venv_packages(entry.path)
+        if packages is not None and not missing_requirements(
+            pip_dependencies, packages
+        ):
+            return entry.path
+    return None
+
+
+def _clone_venv(
+    source_path: os.PathLike[Any] | str,
+    venv_path: os.PathLike[Any] | str,
+    logger: logging.Logger,
+) -> bool:
+    """Clone a complete virtual environment, with hard links when possible."""
+    try:
+        # Don't wait for a virtual environment that is being updated
+        with portalocker.Lock(
+            _get_venv_lockfile_path(source_path),
+            mode="ab",
+            timeout=0,
+            fail_when_locked=True,
+            flags=portalocker.LOCK_SH | portalocker.LOCK_NB,
+        ):
+            if _read_venv_packages(source_path) is None:
+                return False
+            logger.info(f"Cloning virtual environment {source_path} to {venv_path}...")
+
+            def link_or_copy(src: str, dst: str):
+                try:
+                    os.link(src, dst)
+                except OSError:
+                    shutil.copy2(src, dst)
+
+            shutil.copytree(
+                source_path,
+                venv_path,
+                symlinks=True,
+                copy_function=link_or_copy,
+                ignore=shutil.ignore_patterns(".venv_is_complete", "__pycache__"),
+            )
+            return True
+    except portalocker.exceptions.LockException:
+        return False
+    except OSError as e:
+        logger.warning(f"Failed to clone virtual environment {source_path}: {e}")
+        shutil.rmtree(venv_path, ignore_errors=True)
+        return False
+
+
 def _bootstrap_venv(
     venv_path: os.PathLike[Any],
     pip_dependencies: list[str],
@@ -117,12 +197,30 @@ def _bootstrap_venv(
                 f"For some reason, the virtual environment at {venv_path} was found to be incomplete. Deleting the virtual environment and creating a new one..."
             )
             shutil.rmtree(venv_path, ignore_errors=True)
-            logger.info(f"Creating new virtual environment at {venv_path}...")
-            venv.create(venv_path, with_pip=True)
-        # At this point, the venv should be created and
-        # _get_venv_executable_path should return a valid path (with symlinks resolved)
+            # Start from an existing virtual environment that has everything needed
+            source_path = _find_superset_venv(venv_path, pip_dependencies)
+            if source_path is None or not _clone_venv(source_path, venv_path, logger):
+                logger.info(f"Creating new virtual environment at {venv_path}...")
+                venv.create(venv_path, with_pip=True)
+            else:
+                with open(venv_is_complete_path, "w") as f:
+                    f.write("")
+        # Nothing to install if the pinned packages are already there
+        packages = _read_venv_packages(venv_path)
+        if packages is not None and not missing_requirements(
+            pip_dependencies, packages
+        ):
+            logger.info(f"Virtual environment at {venv_path} is up to date.")
+            return
         venv_executable = _get_venv_executable_path(venv_path)
-        command = [venv_executable, "-m", "pip", "install"]
+        command = [
+            venv_executable,
+            "-m",
+            "pip",
+            "install",
+            "--cache-dir",
+            _get_pip_cache_dir(),
+        ]
         if not verbose:
             command += ["-q", "-q"]
         command += list(pip_dependencies)
@@ -183,13 +281,15 @@ def _bootstrap_venv(
                 stderr=logpipe_stdout.log_buffer.getvalue().encode("utf-8"),
             )
 
+        _record_venv_packages(venv_path)
         # Create a file to mark the virtual environment as complete
         with open(venv_is_complete_path, "w") as f:
             f.write("")
 
 
 class PipInstallThread(threading.Thread):
-    _bounded_semaphore = threading.BoundedSemaphore(1)
+    # virtual environments are bootstrapped concurrently, each one has its own lock
+    _bounded_semaphore = threading.BoundedSemaphore(os.cpu_count() or 1)
     _cancel_all_threads = threading.Event()
     _threads = dict()
     _exceptions = dict()
@@ -227,48 +327,159 @@ class PipInstallThread(threading.Thread):
             sleep(0.1)
 
 
-class PickleableFunctionWithPipeIO:
-    """A wrapper for a function that can be pickled and executed in a child process."""
+def _venv_worker_main(
+    func_serialized: bytes,
+    conn: multiprocessing.connection.Connection,
+    stdout_writer: PipeWriter,
+    stderr_writer: PipeWriter,
+    sys_path: list[str],
+):
+    """Entry point of a worker process, runs the function for every call received on the pipe."""
+    sys.path = sys_path
+    sys.stdout = stdout_writer
+    sys.stderr = stderr_writer
+    fn = None
+    while True:
+        try:
+            request = conn.recv_bytes()
+        except EOFError:
+            break
+        # an empty message asks the worker to exit
+        if not request:
+            break
+        try:
+            # the function (and the modules it imports) is loaded once per worker
+            if fn is None:
+                fn = cloudpickle.loads(func_serialized)
+            kwargs = shared_memory.loads(request)
+            output = fn(**kwargs)
+            serialized_result = shared_memory.dumps(output)
+        except Exception as e:
+            # Not all exceptions are expected to be picklable
+            # so we clone their traceback and send our own custom type of exception
+            exc = ChildProcessError(
+                f"Child process failed with an exception of type {type(e)}."
+            ).with_traceback(e.__traceback__)
+            serialized_result = cloudpickle.dumps(
+                (exc, traceback.format_exception(type(e), e, e.__traceback__))
+            )
+        conn.send_bytes(serialized_result)
+
+
+class _VenvWorker:
+    """A long-lived process running a function with the python executable of a virtual environment."""
 
     def __init__(
         self,
-        func: Callable,
-        child_conn: multiprocessing.connection.Connection,
-        venv_executable: str,
+        func: Callable[..., Any],
+        venv_executable: os.PathLike[Any] | str,
+        logger: logging.Logger,
     ):
-        self._func_serialized = cloudpickle.dumps(func)
         func_module_path = os.path.dirname(os.path.realpath(inspect.getabsfile(func)))
         # Check that the function is in a directory indeed
-        self._extra_sys_path = (
-            [func_module_path] if os.path.isdir(func_module_path) else None
+        extra_sys_path = [func_module_path] if os.path.isdir(func_module_path) else []
+        self._stack = ExitStack()
+        log_pipe_stdout = self._stack.enter_context(
+            LogPipe(logger=logger, log_level=logging.INFO, mode=LogPipeMode.MP_SPAWN)
+        )
+        log_pipe_stderr = self._stack.enter_context(
+            LogPipe(logger=logger, log_level=logging.ERROR, mode=LogPipeMode.MP_SPAWN)
         )
-        self._child_conn = child_conn
-        self._venv_executable = venv_executable
+        self.conn, child_conn = multiprocessing.get_context("spawn").Pipe()
+        # Create a new multiprocessing context for the child process in "spawn" mode
+        # while setting its executable to the virtual environment python executable
+        child_mp_context = multiprocessing.get_context("spawn")
+        child_mp_context.set_executable(venv_executable)
+        # Append a name and a random suffix
+        self.process = child_mp_context.Process(
+            name=f"run_in_venv_{os.urandom(4).hex()}",
+            target=_venv_worker_main,
+            args=(
+                cloudpickle.dumps(func),
+                child_conn,
+                log_pipe_stdout.get_pipe_writer(),
+                log_pipe_stderr.get_pipe_writer(),
+                _get_venv_syspath(venv_executable) + extra_sys_path,
+            ),
+        )
+        self.process.start()
+        child_conn.close()
+
+    def call(self, kwargs: dict[str, Any]) -> bytes:
+        try:
+            # large arrays are passed through shared memory
+            self.conn.send_bytes(shared_memory.dumps(kwargs))
+            return self.conn.recv_bytes()
+        except (EOFError, OSError):
+            raise ChildProcessError(
+                f"Child process {self.process.name} exited unexpectedly with code {self.process.exitcode}."
+            )
 
-    def __call__(self, *args_serialized, **kwargs_serialized):
-        with swap_sys_path(
-            venv_executable=self._venv_executable, extra_sys_path=self._extra_sys_path
-        ):
-            try:
-                fn = cloudpickle.loads(self._func_serialized)
-                args = [cloudpickle.loads(arg) for arg in args_serialized]
-                kwargs = {
-                    key: cloudpickle.loads(value)
-                    for key, value in kwargs_serialized.items()
-                }
-                # Capture logs here too
-                output = fn(*args, **kwargs)
-                serialized_result = cloudpickle.dumps(output)
-            except Exception as e:
-                # Not all exceptions are expected to be picklable
-                # so we clone their traceback and send our own custom type of exception
-                exc = ChildProcessError(
-                    f"Child process failed with an exception of type {type(e)}."
-                ).with_traceback(e.__traceback__)
-                serialized_result = cloudpickle.dumps(
-                    (exc, traceback.format_exception(type(e), e, e.__traceback__))
-                )
-        self._child_conn.send_bytes(serialized_result)
+    def close(self, timeout: float = 5):
+        try:
+            self.conn.send_bytes(b"")
+        except OSError:
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.conn.close()
+        # the logs are flushed once the process has exited
+        self._stack.close()
+
+
+class _VenvWorkerPool:
+    """
+    Warm workers of a function decorated with `run_in_venv`.
+
+    Workers are reused across calls, so the modules imported by the function
+    (and anything it caches at module level, a loaded model for instance)
+    stay in memory. Concurrent calls get a worker each.
+    """
+
+    _pools: "weakref.WeakSet[_VenvWorkerPool]" = weakref.WeakSet()
+
+    def __init__(self, func: Callable[..., Any], logger: logging.Logger):
+        self.func = func
+        self.logger = logger
+        self.idle: list[_VenvWorker] = []
+        self.lock = threading.Lock()
+        _VenvWorkerPool._pools.add(self)
+
+    def call(self, venv_executable: os.PathLike[Any] | str, kwargs: dict[str, Any]):
+        with self.lock:
+            worker = self.idle.pop() if self.idle else None
+        if worker is None:
+            self.logger.info(f"Spawning process for function {self.func.__name__}...")
+            worker = _VenvWorker(self.func, venv_executable, self.logger)
+        try:
+            serialized_result = worker.call(kwargs)
+        except BaseException:
+            worker.close()
+            raise
+        with self.lock:
+            self.idle.append(worker)
+        return serialized_result
+
+    def shutdown(self):
+        with self.lock:
+            workers, self.idle = self.idle, []
+        for worker in workers:
+            worker.close()
+
+    @classmethod
+    def shutdown_all(cls):
+        for pool in list(cls._pools):
+            pool.shutdown()
+
+
+def shutdown_venv_workers():
+    """Stops the idle worker processes of every function decorated with `run_in_venv`."""
+    _VenvWorkerPool.shutdown_all()
+
+
+atexit.register(shutdown_venv_workers)
 
 
 def run_in_venv(pip_dependencies: list[str], verbose: bool = True):
@@ -306,10 +517,7 @@ def run_in_venv(pip_dependencies: list[str], verbose: bool = True):
             return func
 
         # Pre-pend flojoy and cloudpickle as mandatory pip dependencies
-        packages_dict = {
-            package.name: package.version
-            for package in importlib.metadata.distributions()
-        }
+        packages_dict = get_installed_packages()
         pip_dependencies = sorted(
             [
                 "flojoy",
@@ -336,6 +544,7 @@ def run_in_venv(pip_dependencies: list[str], verbose: bool = True):
             args=(venv_path, pip_dependencies, logger, verbose),
         )
         thread.start()
+        pool = _VenvWorkerPool(func, logger)
 
         @wraps(func)
         def wrapper(*args: Any, **kwargs: dict[str, Any]):
@@ -351,65 +560,13 @@ def run_in_venv(pip_dependencies: list[str], verbose: bool = True):
                 PipInstallThread.terminate_all()
                 # Re-raise from the main thread
                 raise PipInstallThread._exceptions[thread.name]
-            logger.info(
-                f"Pip install complete. Spawning process for function {func.__name__}..."
+            # Resolve the function arguments using inspect
+            # this is needed to avoid pickling issues
+            serialized_result = pool.call(
+                venv_executable, inspect.getcallargs(func, *args, **kwargs)
             )
-            # Generate a new multiprocessing context for the parent process in "spawn" mode
-            parent_mp_context = multiprocessing.get_context("spawn")
-            parent_conn, child_conn = parent_mp_context.Pipe()
-            # Create a new multiprocessing context for the child process in "spawn" mode
-            # while setting its executable to the virtual environment python executable
-            child_mp_context = multiprocessing.get_context("spawn")
-            child_mp_context.set_executable(venv_executable)
-            with ExitStack() as stack:
-                log_pipe_stdout = stack.enter_context(
-                    LogPipe(
-                        logger=logger, log_level=logging.INFO, mode=LogPipeMode.MP_SPAWN
-                    )
-                )
-                log_pipe_stderr = stack.enter_context(
-                    LogPipe(
-                        logger=logger,
-                        log_level=logging.ERROR,
-                        mode=LogPipeMode.MP_SPAWN,
-                    )
-                )
-                # Serialize function arguments using cloudpickle
-                pickleable_func_with_pipe = PickleableFunctionWithPipeIO(
-                    func=func,
-                    child_conn=child_conn,
-                    venv_executable=venv_executable,
-                )
-                # Wrap the function with a decorator that redirects stdout and stderr to the log pipes
-                mp_func = LogPipe.wrap_and_redirect_stream(
-                    pickleable_func_with_pipe,
-                    StreamEnum.STDOUT,
-                    log_pipe_stdout.get_pipe_writer(),
-                )
-                mp_func = LogPipe.wrap_and_redirect_stream(
-                    mp_func, StreamEnum.STDERR, log_pipe_stderr.get_pipe_writer()
-                )
-                # Resolve the function arguments using inspect
-                # this is needed to avoid pickling issues
-                kwargs_serialized = {
-                    key: cloudpickle.dumps(value)
-                    for key, value in inspect.getcallargs(func, *args, **kwargs).items()
-                }
-                # Create a new process that will run the Python code
-                # Append a name and a random suffix
-                process = child_mp_context.Process(
-                    name=f"run_in_venv_{os.urandom(4).hex()}",
-                    target=mp_func,
-                    kwargs=kwargs_serialized,
-                )
-                # Start the process
-                process.start()
-                # Fetch result from the child process
-                serialized_result = parent_conn.recv_bytes()
-                # Wait for the process to finish
-                process.join()
             # Check if the process sent an exception with a traceback
-            result = cloudpickle.loads(serialized_result)
+            result = shared_memory.loads(serialized_result)
             if isinstance(result, tuple) and isinstance(result[0], Exception):
                 # Fetch exception and formatted traceback (list[str])
                 exception, tcb = result
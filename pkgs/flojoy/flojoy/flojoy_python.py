@@ -1,4 +1,4 @@
-import inspect
+import logging
 import os
 import traceback
 from contextlib import ContextDecorator
@@ -15,6 +15,8 @@ from .models.JobResults.JobFailure import JobFailure
 from .models.JobResults.JobSuccess import JobSuccess
 from .node_init import NodeInitService
 from .parameter_types import format_param_value
+from .profiling import ProfilerMode, profile_block
+from .tracing import trace_phase
 from .utils import get_hf_hub_cache_path
 
 __all__ = ["flojoy", "DefaultParams", "display"]
@@ -115,6 +117,7 @@ def flojoy(
     deps: Optional[list[str]] = None,
     inject_node_metadata: bool = False,
     inject_connection: bool = False,
+    cpu_bound: bool = False,
 ):
     """
     Decorator to turn Python functions with numerical return
@@ -130,6 +133,13 @@ def flojoy(
     Parameters
     ----------
     `func`: Python function that returns DataContainer object
+    `cpu_bound`: mark the block as CPU-bound, when the run provides an
+    `executor` (process pool) the block body is executed by it instead of
+    the worker thread. Blocks using a device connection or an init container
+    always run in the main process.
+
+    When the node is in `profile_blocks`, the block body runs under the
+    `profiler` (see flojoy.profiling) in the calling thread.
 
     Returns
     -------
@@ -162,6 +172,7 @@ def flojoy(
     def decorator(func: Callable[..., Optional[DataContainer | dict[str, Any]]]):
         # Wrap func here to override the HF_HOME env var
         func = cache_huggingface_to_flojoy()(func)
+        parameters = signature(func).parameters
 
         @wraps(func)
         def wrapper(
@@ -171,6 +182,9 @@ def flojoy(
             observe_blocks: list[str],
             previous_jobs: list[dict[str, str]] = [],
             ctrls: dict[str, Any] | None = None,
+            executor: Callable[[Callable[..., Any], dict[str, Any]], Any] | None = None,
+            profile_blocks: list[str] | None = None,
+            profiler: ProfilerMode = "sampling",
         ):
             try:
                 logger.debug(f"previous jobs: {previous_jobs}")
@@ -186,17 +200,17 @@ def flojoy(
                 logger.debug(
                     f"executing node_id: {node_id} previous_jobs: {previous_jobs}"
                 )
-                dict_inputs = fetch_inputs(previous_jobs)
+                with trace_phase("fetch_inputs"):
+                    dict_inputs = fetch_inputs(previous_jobs)
 
                 # constructing the inputs
                 logger.debug(f"constructing inputs for {func.__name__}")
                 args: dict[str, Any] = {}
-                sig = signature(func)
 
                 args = {**args, **dict_inputs}
 
                 for param, value in func_params.items():
-                    if param in sig.parameters:
+                    if param in parameters:
                         args[param] = value
 
                 if inject_node_metadata:
@@ -207,7 +221,9 @@ def flojoy(
                         node_type="default",
                     )
 
-                logger.debug(f"{node_id} params: {args}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    # the inputs are formatted with their whole arrays
+                    logger.debug(f"{node_id} params: {args}")
 
                 # check if node has an init container and if so, inject it
                 if NodeInitService().has_init_store(node_id):
@@ -227,38 +243,50 @@ def flojoy(
 
                 # This fixes when people forget to add `= None` in
                 # default: Optional[DataContainer] = None
-                if (
-                    "default" not in args
-                    and "default" in inspect.signature(func).parameters.keys()
-                ):
+                if "default" not in args and "default" in parameters:
                     args["default"] = None
 
                 ##########################
                 # calling the node function
                 ##########################
-                dc_obj = func(**args)  # DataContainer object from node
+                with trace_phase("block"):
+                    if profile_blocks and node_id in profile_blocks:
+                        with profile_block(jobset_id, node_id, profiler):
+                            dc_obj = func(**args)
+                    elif (
+                        executor is not None
+                        and cpu_bound
+                        and not inject_connection
+                        and "init_container" not in args
+                    ):
+                        dc_obj = executor(wrapper, args)
+                    else:
+                        dc_obj = func(**args)  # DataContainer object from node
                 ##########################
                 # end calling the node function
                 ##########################
 
                 # some special nodes like LOOP return dict instead of `DataContainer`
-                if isinstance(dc_obj, DataContainer) and not isinstance(
-                    dc_obj, Stateful
-                ):
-                    dc_obj.validate()  # Validate returned DataContainer object
-                elif dc_obj is not None:
-                    for value in dc_obj.values():
-                        if isinstance(value, DataContainer):
-                            value.validate()
+                with trace_phase("validate"):
+                    if isinstance(dc_obj, DataContainer) and not isinstance(
+                        dc_obj, Stateful
+                    ):
+                        dc_obj.validate()  # Validate returned DataContainer object
+                    elif dc_obj is not None:
+                        for value in dc_obj.values():
+                            if isinstance(value, DataContainer):
+                                value.validate()
 
                 # post result to the job service so we can get it later if needed
-                JobService().post_job_result(job_id, dc_obj)
+                with trace_phase("post_result"):
+                    JobService().post_job_result(job_id, dc_obj)
 
                 # Package the result and return it
                 FN = func.__name__
-                result = get_frontend_res_obj_from_result(
-                    node_id, observe_blocks, dc_obj
-                )
+                with trace_phase("serialize"):
+                    result = get_frontend_res_obj_from_result(
+                        node_id, observe_blocks, dc_obj
+                    )
                 return JobSuccess(
                     result=result,
                     fn=FN,
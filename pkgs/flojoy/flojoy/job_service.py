@@ -24,6 +24,12 @@ class JobService:
     def delete_job(self, job_id: str):
         self.dao.delete_job(job_id)
 
+    def set_job_consumers(self, job_id: str, consumers: int):
+        self.dao.set_job_consumers(job_id, consumers)
+
+    def release_job_result(self, job_id: str) -> bool:
+        return self.dao.release_job_result(job_id)
+
     def reset(self):
         self.dao.clear_job_results()
         self.dao.clear_small_memory()
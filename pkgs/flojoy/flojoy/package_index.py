@@ -0,0 +1,138 @@
+import importlib.metadata
+import os
+import site
+import sys
+import threading
+
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.utils import canonicalize_name
+from packaging.version import InvalidVersion, Version
+
+__all__ = [
+    "get_installed_packages",
+    "list_packages",
+    "invalidate_installed_packages",
+    "is_requirement_satisfied",
+    "missing_requirements",
+    "pinned_requirement",
+    "block_requirement",
+]
+
+"""
+Index of the packages installed in the current environment.
+
+Listing the distributions reads the metadata of every installed package,
+which takes hundreds of milliseconds in large environments. The index is
+built once and rebuilt only when it is invalidated explicitly (after
+installing packages) or when a site-packages directory changed.
+"""
+
+
+def list_packages(path: list[str] | None = None) -> dict[str, str]:
+    """Packages installed in the given directories (sys.path by default)"""
+    return {
+        canonicalize_name(dist.metadata["Name"]): dist.version
+        for dist in importlib.metadata.distributions(
+            **({} if path is None else {"path": path})
+        )
+        if dist.metadata["Name"]
+    }
+
+
+class _PackageIndex:
+    def __init__(self):
+        self.packages: dict[str, str] | None = None
+        self.stamp: tuple[int, ...] = ()
+        self.lock = threading.Lock()
+
+    def get(self) -> dict[str, str]:
+        with self.lock:
+            stamp = _site_packages_stamp()
+            if self.packages is None or stamp != self.stamp:
+                self.packages = list_packages()
+                self.stamp = stamp
+            return self.packages
+
+    def invalidate(self):
+        with self.lock:
+            self.packages = None
+
+
+def _site_packages_stamp() -> tuple[int, ...]:
+    """mtimes of the directories packages get installed into"""
+    dirs = set(site.getsitepackages() + [site.getusersitepackages()])
+    dirs.update(path for path in sys.path if path.endswith("site-packages"))
+    stamp: list[int] = []
+    for path in sorted(dirs):
+        try:
+            stamp.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            stamp.append(0)
+    return tuple(stamp)
+
+
+_index = _PackageIndex()
+
+
+def get_installed_packages() -> dict[str, str]:
+    """Installed packages, by canonical name, with their version"""
+    return _index.get()
+
+
+def invalidate_installed_packages():
+    _index.invalidate()
+
+
+def pinned_requirement(name: str, version: str | float | None = None) -> str:
+    """
+    Requirement of a block dependency, a bare version is pinned
+    (`{"torch": "2.0.1"}` means `torch==2.0.1`) and a specifier is kept
+    as is (`{"numpy": ">=1.24"}`)
+    """
+    if not version:
+        return name
+    version = str(version).strip()
+    if version[0].isdigit():
+        return f"{name}=={version}"
+    return f"{name}{version}"
+
+
+def block_requirement(name: str, version: str | float | None = None) -> tuple[str, str]:
+    """
+    The requirement a block dependency checks, and the one installed when it
+    is not met. A bare version is only what gets installed when the package
+    is missing, any installed version of it is kept; a specifier is checked.
+    """
+    installed = pinned_requirement(name, version)
+    if version and str(version).strip()[0].isdigit():
+        return name, installed
+    return installed, installed
+
+
+def is_requirement_satisfied(
+    requirement: str, packages: dict[str, str] | None = None
+) -> bool:
+    """Whether the requirement is met by the packages (the installed ones by default)"""
+    try:
+        req = Requirement(requirement)
+    except InvalidRequirement:
+        return False
+    if req.marker is not None and not req.marker.evaluate():
+        return True
+    if packages is None:
+        packages = get_installed_packages()
+    installed = packages.get(canonicalize_name(req.name))
+    if installed is None:
+        return False
+    if not req.specifier:
+        return True
+    try:
+        return req.specifier.contains(Version(installed), prereleases=True)
+    except InvalidVersion:
+        return False
+
+
+def missing_requirements(
+    requirements: list[str], packages: dict[str, str] | None = None
+) -> list[str]:
+    return [req for req in requirements if not is_requirement_satisfied(req, packages)]
@@ -63,6 +63,11 @@ def data_container_to_plotly(data: DataContainer) -> dict[str, Any] | None:
                         name=i,
                     )
                 )
+        case "Stream":
+            columns = data_copy.stream.to_dict()
+            x = columns.pop("x", np.arange(len(data_copy.stream)))
+            for name, col in columns.items():
+                fig.add_trace(go.Scatter(x=x, y=col, mode="lines", name=name))
         case "Surface":
             fig = go.Figure(
                 data=[go.Surface(x=data_copy.x, y=data_copy.y, z=data_copy.z)]
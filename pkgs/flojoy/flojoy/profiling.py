@@ -0,0 +1,132 @@
+import cProfile
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from types import FrameType
+from typing import Iterator, Literal
+
+from .CONSTANTS import FLOJOY_CACHE_DIR
+
+"""
+Profiling of individual blocks, enabled per node by the flowchart request.
+
+- `sampling`: a background thread samples the stack of the block every
+  millisecond, the samples are written as collapsed stacks (one
+  `frame;frame;frame count` line per stack) which flame graph tools such as
+  speedscope or flamegraph.pl read directly. The overhead does not depend
+  on the number of function calls made by the block.
+- `cprofile`: deterministic profiling with cProfile, written as a pstats
+  file (snakeviz, `python -m pstats`).
+
+The profiles of the iterations of a block in a loop are merged into the
+same file.
+"""
+
+ProfilerMode = Literal["sampling", "cprofile"]
+
+# seconds between two samples of the sampling profiler
+SAMPLING_INTERVAL = 0.001
+
+
+def get_profiles_dir(jobset_id: str) -> str:
+    return os.path.join(FLOJOY_CACHE_DIR, "profiles", os.path.basename(jobset_id))
+
+
+def frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(
+        ";", ","
+    )
+
+
+def collapse_stack(frame: FrameType | None, stop: FrameType | None = None) -> str:
+    """Stack of a frame, outermost first, up to (excluding) the `stop` frame"""
+    labels: list[str] = []
+    while frame is not None and frame is not stop:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+    """Samples the stack of a thread from a background thread"""
+
+    def __init__(
+        self,
+        thread_id: int,
+        root: FrameType | None = None,
+        interval: float = SAMPLING_INTERVAL,
+    ):
+        self.thread_id = thread_id
+        # frames from the root up are not part of the samples
+        self.root = root
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None or self._in_profiler(frame):
+                continue
+            stack = collapse_stack(frame, self.root)
+            if stack:
+                self.samples[stack] += 1
+
+    def _in_profiler(self, frame: FrameType | None) -> bool:
+        """Whether the thread is leaving the profiled context (stopping the profiler)"""
+        while frame is not None and frame is not self.root:
+            if frame.f_code.co_filename == __file__:
+                return True
+            frame = frame.f_back
+        return False
+
+    def write(self, path: str):
+        with open(path, "a") as f:
+            for stack, count in self.samples.items():
+                f.write(f"{stack} {count}\n")
+
+
+@contextmanager
+def profile_block(
+    jobset_id: str, node_id: str, mode: ProfilerMode = "sampling"
+) -> Iterator[None]:
+    """Profiles the code run in the context, the profile is saved under the flojoy dir"""
+    profiles_dir = get_profiles_dir(jobset_id)
+    os.makedirs(profiles_dir, exist_ok=True)
+
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            path = os.path.join(profiles_dir, f"{node_id}.prof")
+            stats = pstats.Stats(profiler)
+            if os.path.exists(path):
+                stats.add(path)
+            stats.dump_stats(path)
+        return
+
+    # the frame running the `with` statement: this generator <- __enter__ <- caller
+    caller = sys._getframe(0).f_back
+    root = caller.f_back if caller is not None else None
+    sampler = SamplingProfiler(threading.get_ident(), root)
+    sampler.start()
+    try:
+        yield
+    finally:
+        sampler.stop()
+        sampler.write(os.path.join(profiles_dir, f"{node_id}.collapsed"))
@@ -0,0 +1,279 @@
+import io
+import pickle
+import threading
+import weakref
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any
+
+import cloudpickle
+import numpy as np
+
+from .data_container import DataContainer
+
+"""
+Shared memory backend for job results.
+
+Large numpy arrays of DataContainer results (x, y, z, t, m, r/g/b/a, v) are
+placed into named shared memory segments. Inside the process they are used
+as regular numpy arrays (views on the mapping), other processes (process
+pool workers, run_in_venv children) attach to the same segment by name,
+so only a small handle has to be pickled.
+
+Segments are reference counted by the job ids whose results use them: a
+block returning one of its inputs (e.g. `OrderedPair(x=default.x, ...)`)
+shares the segment of the upstream job instead of copying it. A segment is
+unlinked once every job referencing it has been evicted, the mapping itself
+goes away when the last numpy view on it is garbage collected.
+"""
+
+__all__ = ["SharedResultStore", "dumps", "loads"]
+
+# arrays smaller than this are cheaper to copy/pickle than to share
+SHARED_ARRAY_MIN_BYTES = 64 * 1024
+
+DATA_CONTAINER_ARRAY_KEYS = ("x", "y", "z", "t", "m", "r", "g", "b", "a", "v")
+
+
+def is_shareable(value: Any) -> bool:
+    return (
+        type(value) is np.ndarray
+        and value.nbytes >= SHARED_ARRAY_MIN_BYTES
+        and value.flags.c_contiguous
+        and not value.dtype.hasobject
+        and value.dtype.fields is None
+    )
+
+
+class Segment:
+    """
+    A named shared memory segment mapped in this process.
+
+    Numpy views are created on the mmap of the segment rather than on
+    `SharedMemory.buf`, so the `SharedMemory` object can be closed right
+    away: the mapping stays valid for as long as a view references it.
+    """
+
+    # address of the mapping -> segment, for every segment mapped in this process
+    _mapped: dict[int, "Segment"] = {}
+    _mapped_lock = threading.Lock()
+
+    def __init__(self, shm: SharedMemory):
+        self.name = shm.name
+        self.size = shm.size
+        self.unlinked = False
+        self._shm = shm
+        mapping = shm._mmap
+        # release the memoryview and the file descriptor, keep the mapping
+        shm._buf.release()  # type: ignore
+        shm._buf = None
+        shm._mmap = None
+        shm.close()
+        self.address: int = np.frombuffer(mapping, dtype=np.uint8, count=1).ctypes.data
+        self._mapping = weakref.ref(mapping, self._on_unmapped)
+        self._strong_mapping: Any = mapping
+        with Segment._mapped_lock:
+            Segment._mapped[self.address] = self
+
+    @classmethod
+    def create(cls, size: int) -> "Segment":
+        return cls(SharedMemory(create=True, size=max(size, 1)))
+
+    @classmethod
+    def attach(cls, name: str) -> "Segment":
+        return cls(SharedMemory(name=name))
+
+    @classmethod
+    def of(cls, array: np.ndarray) -> "Segment | None":
+        """Returns the segment whose mapping starts at the data of the array"""
+        segment = cls._mapped.get(array.ctypes.data)
+        if segment is None or segment.unlinked or array.nbytes > segment.size:
+            return None
+        return segment
+
+    def view(self, shape: tuple[int, ...], dtype: np.dtype[Any]) -> np.ndarray:
+        mapping = self._mapping()
+        if mapping is None:
+            raise ValueError(f"Shared memory segment {self.name} is not mapped")
+        array = np.ndarray(shape, dtype=dtype, buffer=mapping)
+        # from now on the views keep the mapping alive
+        self._strong_mapping = None
+        return array
+
+    def unlink(self):
+        if self.unlinked:
+            return
+        self.unlinked = True
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _on_unmapped(self, _: Any):
+        with Segment._mapped_lock:
+            if Segment._mapped.get(self.address) is self:
+                del Segment._mapped[self.address]
+
+
+def share_array(array: np.ndarray) -> tuple[Segment, np.ndarray]:
+    """Copies the array into a new segment, returns the segment and the view"""
+    segment = Segment.create(array.nbytes)
+    view = segment.view(array.shape, array.dtype)
+    view[...] = array
+    return segment, view
+
+
+class SharedResultStore:
+    """
+    Keeps track of the shared memory segments used by job results.
+    Used by the Dao when shared memory results are enabled.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.segments: dict[str, Segment] = {}
+        self.segment_owners: dict[str, set[str]] = {}
+        self.job_segments: dict[str, set[str]] = {}
+        self.bytes_in_use = 0
+        self.peak_bytes = 0
+        self.shared_arrays = 0
+        self.reused_arrays = 0
+        self.evicted_segments = 0
+        self.evicted_bytes = 0
+
+    def share(self, job_id: str, result: Any) -> Any:
+        """
+        Moves the large arrays of the DataContainers in `result` into shared
+        memory segments owned by `job_id`, replacing the previous result of
+        the job. The result is modified in place.
+        """
+        names: set[str] = set()
+        for dc in iter_data_containers(result):
+            for key in DATA_CONTAINER_ARRAY_KEYS:
+                value = dc.get(key)
+                if not is_shareable(value):
+                    continue
+                with self.lock:
+                    segment = Segment.of(value)
+                    if segment is None:
+                        segment, value = share_array(value)
+                        dc[key] = value
+                    self._track(segment)
+                    if self.segment_owners[segment.name]:
+                        self.reused_arrays += 1
+                    else:
+                        self.shared_arrays += 1
+                    self.segment_owners[segment.name].add(job_id)
+                    names.add(segment.name)
+        with self.lock:
+            previous = self.job_segments.pop(job_id, set())
+            if names:
+                self.job_segments[job_id] = names
+            self._release(job_id, previous - names)
+        return result
+
+    def adopt(self, segment: Segment):
+        """Tracks a segment received from another process until a job claims it"""
+        with self.lock:
+            self._track(segment)
+
+    def evict(self, job_id: str):
+        """Drops the references of the job, unlinks the segments nobody uses"""
+        with self.lock:
+            self._release(job_id, self.job_segments.pop(job_id, set()))
+
+    def clear(self):
+        with self.lock:
+            for name in list(self.segments.keys()):
+                self._untrack(name)
+            self.job_segments.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self.lock:
+            return {
+                "segments": len(self.segments),
+                "jobs": len(self.job_segments),
+                "bytes_in_use": self.bytes_in_use,
+                "peak_bytes": self.peak_bytes,
+                "shared_arrays": self.shared_arrays,
+                "reused_arrays": self.reused_arrays,
+                "evicted_segments": self.evicted_segments,
+                "evicted_bytes": self.evicted_bytes,
+            }
+
+    def _track(self, segment: Segment):
+        if segment.name in self.segments:
+            return
+        self.segments[segment.name] = segment
+        self.segment_owners[segment.name] = set()
+        self.bytes_in_use += segment.size
+        self.peak_bytes = max(self.peak_bytes, self.bytes_in_use)
+
+    def _release(self, job_id: str, names: set[str]):
+        for name in names:
+            owners = self.segment_owners.get(name)
+            if owners is None:
+                continue
+            owners.discard(job_id)
+            if not owners:
+                self._untrack(name)
+
+    def _untrack(self, name: str):
+        segment = self.segments.pop(name)
+        del self.segment_owners[name]
+        segment.unlink()
+        self.bytes_in_use -= segment.size
+        self.evicted_segments += 1
+        self.evicted_bytes += segment.size
+
+
+def iter_data_containers(result: Any):
+    if isinstance(result, DataContainer):
+        yield result
+    elif isinstance(result, dict):
+        for value in result.values():
+            yield from iter_data_containers(value)
+
+
+# -- pickling with shared memory handles --
+
+
+def _attach_array(name: str, shape: tuple[int, ...], dtype: str, transfer: bool):
+    segment = Segment.attach(name)
+    array = segment.view(shape, np.dtype(dtype))
+    if transfer:
+        # the segment was created only to send this array,
+        # the receiving process is now responsible for it
+        from .dao import Dao  # avoid circular import
+
+        store = Dao.get_instance().result_store
+        if store is None:
+            segment.unlink()
+        else:
+            store.adopt(segment)
+    return array
+
+
+class SharedArrayPickler(cloudpickle.Pickler):
+    """
+    Pickler that replaces large numpy arrays by shared memory handles.
+    Arrays that already live in a segment are not copied.
+    """
+
+    def reducer_override(self, obj: Any):
+        if not is_shareable(obj):
+            return super().reducer_override(obj)
+        segment = Segment.of(obj)
+        transfer = segment is None
+        if segment is None:
+            segment, _ = share_array(obj)
+        return _attach_array, (segment.name, obj.shape, obj.dtype.str, transfer)
+
+
+def dumps(obj: Any) -> bytes:
+    buffer = io.BytesIO()
+    SharedArrayPickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(obj)
+    return buffer.getvalue()
+
+
+def loads(data: bytes) -> Any:
+    return pickle.loads(data)
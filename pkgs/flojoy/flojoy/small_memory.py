@@ -43,6 +43,10 @@ class SmallMemory:
                 meta_data["type"] = "bool"
                 self.dao.set_obj(value_type_key, meta_data)
                 self.dao.set_bool(memory_key, value)
+            case "flojoy.stream_buffer.StreamBuffer":
+                meta_data["type"] = "stream_buffer"
+                self.dao.set_obj(value_type_key, meta_data)
+                self.dao.set_stream_buffer(memory_key, value)
             case _:
                 raise ValueError(
                     f"SmallMemory currently does not support '{v_type}' type data!"
@@ -67,6 +71,8 @@ class SmallMemory:
                 return self.dao.get_np_array(memory_key)
             case "pd_dframe":
                 return self.dao.get_pd_dataframe(memory_key)
+            case "stream_buffer":
+                return self.dao.get_stream_buffer(memory_key)
             case _:
                 return None
 
@@ -0,0 +1,242 @@
+import os
+import shutil
+import tempfile
+import weakref
+from typing import Any
+
+import numpy as np
+
+"""
+Growable columnar buffer backing the `Stream` DataContainer.
+
+Samples are appended by chunks to preallocated columns whose capacity
+doubles when full, so appending costs amortized O(1) per sample instead of
+the O(n) copy of `numpy.append`. Reading a column returns a numpy view on
+the buffer, no data is copied.
+
+With `maxlen`, only the last `maxlen` samples are kept: the columns hold
+twice that many rows and the kept samples are moved back to the front when
+the end is reached, which keeps the views contiguous at an amortized O(1)
+cost per sample.
+
+With `spill_bytes`, the columns are moved to memory-mapped files once they
+need more than that many bytes, so long acquisitions are not bounded by
+the RAM.
+"""
+
+__all__ = ["StreamBuffer"]
+
+INITIAL_CAPACITY = 1024
+
+
+def _remove_dir(path: str):
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def _remove_file(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        # already removed with the spill directory
+        pass
+
+
+class StreamBuffer:
+    """
+    Columns of samples of the same length, appended by chunks.
+
+    A view returned by `column` stays valid until the next append, which
+    may move or overwrite the samples: copy it to keep it longer.
+    """
+
+    def __init__(
+        self,
+        maxlen: int | None = None,
+        spill_bytes: int | None = None,
+        spill_dir: str | None = None,
+    ):
+        if maxlen is not None and maxlen <= 0:
+            raise ValueError("maxlen must be a positive number of samples")
+        self.maxlen = maxlen
+        self.spill_bytes = spill_bytes
+        self.spill_dir = spill_dir
+        self._columns: dict[str, np.ndarray] = {}
+        self._capacity = 0
+        self._start = 0
+        self._stop = 0
+        self._spill_path: str | None = None
+        self._files = 0
+        self.resizes = 0
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    @property
+    def columns(self) -> list[str]:
+        return list(self._columns)
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def spilled(self) -> bool:
+        return self._spill_path is not None
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self._columns.values())
+
+    def append(self, **chunks: Any):
+        """
+        Appends a chunk of samples to every column, e.g.
+        `append(x=timestamps, y=values)`. Scalars are chunks of one sample.
+        The columns are created by the first append, their dtype is
+        promoted if a chunk does not fit in it (e.g. floats after ints).
+        """
+        arrays = {name: np.asarray(chunk) for name, chunk in chunks.items()}
+        arrays = {
+            name: array.reshape(1) if array.ndim == 0 else array
+            for name, array in arrays.items()
+        }
+        if not arrays:
+            return
+        lengths = {len(array) for array in arrays.values()}
+        if len(lengths) != 1:
+            raise ValueError(
+                f"The chunks of a stream must have the same length, got {lengths}"
+            )
+        if self._columns and arrays.keys() != self._columns.keys():
+            raise ValueError(
+                f"The stream has the columns {self.columns}, got {list(arrays)}"
+            )
+        n = lengths.pop()
+        if self.maxlen is not None and n > self.maxlen:
+            arrays = {name: array[-self.maxlen :] for name, array in arrays.items()}
+            n = self.maxlen
+        if not self._columns:
+            capacity = max(INITIAL_CAPACITY, 2 * n)
+            if self.maxlen is not None:
+                capacity = min(capacity, 2 * self.maxlen)
+            self._allocate(arrays, capacity)
+        elif self._stop + n > self._capacity:
+            self._make_room(n)
+
+        for name, array in arrays.items():
+            column = self._columns[name]
+            if array.dtype != column.dtype:
+                dtype = np.result_type(column.dtype, array.dtype)
+                if dtype != column.dtype:
+                    column = self._promote(name, dtype)
+            column[self._stop : self._stop + n] = array
+        self._stop += n
+        if self.maxlen is not None and len(self) > self.maxlen:
+            self._start = self._stop - self.maxlen
+
+    def column(self, name: str, start: int = 0, stop: int | None = None) -> np.ndarray:
+        """View on the samples [start, stop) of a column"""
+        begin, end, _ = slice(start, stop).indices(len(self))
+        return self._columns[name][self._start + begin : self._start + max(begin, end)]
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.column(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._columns
+
+    def to_dict(self) -> dict[str, np.ndarray]:
+        return {name: self.column(name) for name in self._columns}
+
+    def to_plotly_json(self) -> dict[str, np.ndarray]:
+        # used by PlotlyJSONEncoder
+        return self.to_dict()
+
+    def clear(self):
+        self._start = self._stop = 0
+
+    def _allocate(self, template: dict[str, np.ndarray], capacity: int):
+        """Replaces the columns by empty ones of the given capacity"""
+        nbytes = sum(
+            capacity * array.dtype.itemsize * int(np.prod(array.shape[1:]))
+            for array in template.values()
+        )
+        spill = self.spilled or (
+            self.spill_bytes is not None and nbytes > self.spill_bytes
+        )
+        if spill and self._spill_path is None:
+            self._spill_path = tempfile.mkdtemp(
+                prefix="flojoy_stream_", dir=self.spill_dir
+            )
+            weakref.finalize(self, _remove_dir, self._spill_path)
+        self._columns = {
+            name: self._new_column(array.dtype, (capacity, *array.shape[1:]), spill)
+            for name, array in template.items()
+        }
+        self._capacity = capacity
+
+    def _new_column(self, dtype: np.dtype, shape: tuple[int, ...], spill: bool):
+        if not spill:
+            return np.empty(shape, dtype=dtype)
+        assert self._spill_path is not None
+        self._files += 1
+        path = os.path.join(self._spill_path, f"{self._files}.bin")
+        column = np.memmap(path, dtype=dtype, mode="w+", shape=shape)
+        # removed once unmapped, when the column and its views are gone:
+        # a mapped file cannot be removed on Windows
+        weakref.finalize(column.base, _remove_file, path)
+        return column
+
+    def _promote(self, name: str, dtype: np.dtype) -> np.ndarray:
+        """Copies a column to a wider dtype"""
+        old_column = self._columns[name]
+        column = self._new_column(dtype, old_column.shape, self.spilled)
+        column[self._start : self._stop] = old_column[self._start : self._stop]
+        self._columns[name] = column
+        return column
+
+    def _make_room(self, n: int):
+        """Makes room for n more samples, keeping the ones still in the stream"""
+        keep = len(self)
+        if self.maxlen is not None:
+            keep = min(keep, self.maxlen - n)
+        needed = keep + n
+        if self._capacity - keep >= max(n, self._capacity // 2):
+            # ring: move the kept samples back to the front, this frees at
+            # least half of the buffer so it happens once per maxlen samples
+            for column in self._columns.values():
+                column[:keep] = column[self._stop - keep : self._stop]
+        else:
+            old_columns = self._columns
+            old_stop = self._stop
+            capacity = max(2 * needed, 2 * self._capacity)
+            if self.maxlen is not None:
+                capacity = min(capacity, 2 * self.maxlen)
+            self._allocate(old_columns, capacity)
+            for name, column in self._columns.items():
+                old_column = old_columns[name]
+                column[:keep] = old_column[old_stop - keep : old_stop]
+            self.resizes += 1
+        self._start = 0
+        self._stop = keep
+
+    def __getstate__(self) -> dict[str, Any]:
+        # only the samples in the stream, and never the memory-mapped files
+        return {
+            "maxlen": self.maxlen,
+            "spill_bytes": self.spill_bytes,
+            "spill_dir": self.spill_dir,
+            "columns": {
+                name: np.array(column) for name, column in self.to_dict().items()
+            },
+        }
+
+    def __setstate__(self, state: dict[str, Any]):
+        # the samples are loaded in memory, the buffer spills again once it
+        # grows past spill_bytes
+        self.__init__(state["maxlen"], None, state["spill_dir"])
+        if state["columns"]:
+            self.append(**state["columns"])
+        self.spill_bytes = state["spill_bytes"]
+
+    def __repr__(self) -> str:
+        return f"StreamBuffer(columns={self.columns}, length={len(self)})"
@@ -0,0 +1,42 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+"""
+Timing of the phases of a block execution (fetching the inputs, running
+the block, validating its result, ...).
+
+The caller running a block collects the phases with `record_phases`, the
+@flojoy wrapper marks them with `trace_phase`. Nothing is recorded when no
+caller asked for it.
+"""
+
+# phase name, start and end (time.perf_counter)
+Phase = tuple[str, float, float]
+
+_local = threading.local()
+
+
+@contextmanager
+def record_phases(phases: list[Phase]) -> Iterator[list[Phase]]:
+    """Collects the phases traced by the current thread into `phases`"""
+    previous = getattr(_local, "phases", None)
+    _local.phases = phases
+    try:
+        yield phases
+    finally:
+        _local.phases = previous
+
+
+@contextmanager
+def trace_phase(name: str) -> Iterator[None]:
+    phases: list[Phase] | None = getattr(_local, "phases", None)
+    if phases is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases.append((name, start, time.perf_counter()))
@@ -16,6 +16,7 @@ from huggingface_hub import snapshot_download
 
 from flojoy.connection_manager import DeviceConnectionManager
 from .dao import Dao
+from .flojoy_node_venv import shutdown_venv_workers
 from .config import FlojoyConfig, logger
 from .node_init import NodeInit, NodeInitService
 
@@ -94,6 +95,7 @@ def clear_flojoy_memory():
     Dao.get_instance().clear_small_memory()
     Dao.get_instance().clear_node_init_containers()
     DeviceConnectionManager.clear()
+    shutdown_venv_workers()
 
 
 class PlotlyJSONEncoder(_json.JSONEncoder):
@@ -0,0 +1,48 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from flojoy import CloudOutbox, make_measurement_payload
+from flojoy.cloud_outbox import RETRY_BASE_DELAY
+
+
+def test_entries_survive_a_restart(tmp_path):
+    path = str(tmp_path / "outbox.sqlite")
+    outbox = CloudOutbox(path)
+    df = pd.DataFrame({"a": np.arange(3), "b": [0.5, 1.5, 2.5]})
+    first = outbox.enqueue("session/", {"data": make_measurement_payload(df)})
+    outbox.enqueue("measurements", {"data": make_measurement_payload(np.int64(2))})
+    outbox.close()
+
+    outbox = CloudOutbox(path)
+    entries = outbox.due(limit=10)
+    assert [e.endpoint for e in entries] == ["session/", "measurements"]
+    assert entries[0].id == first
+    assert entries[0].payload["data"] == {
+        "type": "dataframe",
+        "value": {"a": [0, 1, 2], "b": [0.5, 1.5, 2.5]},
+    }
+    assert entries[1].payload["data"]["value"] == 2
+    assert len(outbox.due(limit=1)) == 1
+
+    outbox.uploaded([first])
+    assert outbox.count() == 1
+
+
+def test_failed_uploads_back_off(tmp_path):
+    outbox = CloudOutbox(str(tmp_path / "outbox.sqlite"))
+    id = outbox.enqueue("session/", {"pass": True})
+    now = time.time()
+    outbox.retry({id: "503"})
+    assert outbox.due(limit=10) == []
+    # the delay doubles with every attempt
+    assert outbox.due(limit=10, now=now + RETRY_BASE_DELAY)[0].attempts == 1
+    outbox.retry({id: "503"})
+    assert outbox.due(limit=10, now=now + RETRY_BASE_DELAY) == []
+    assert outbox.due(limit=10, now=now + 2 * RETRY_BASE_DELAY + 1)[0].attempts == 2
+
+    # rejected entries are kept but not retried
+    outbox.fail({id: "400"})
+    assert outbox.due(limit=10, now=now + 3600) == []
+    assert outbox.count("failed") == 1
@@ -0,0 +1,67 @@
+import json
+import pickle
+
+import numpy as np
+import pytest
+
+from flojoy import (
+    DataContainer,
+    Image,
+    OrderedPair,
+    ParametricOrderedPair,
+    Scalar,
+)
+
+
+def test_attributes_are_mapped_to_keys():
+    dc = OrderedPair(x=[1, 2, 3], y=np.arange(3))
+    assert dc.type == "OrderedPair"
+    assert isinstance(dc.x, np.ndarray)
+    assert dc["x"] is dc.x
+    dc.extra = {"unit": "V"}
+    assert dc["extra"] == {"unit": "V"}
+    assert not hasattr(dc, "__dict__")
+    with pytest.raises(AttributeError):
+        dc.z
+    assert json.loads(json.dumps(Scalar(c=2))) == {
+        "type": "Scalar",
+        "c": 2,
+        "extra": None,
+    }
+
+
+def test_copy_is_shallow_unless_requested():
+    dc = OrderedPair(x=np.arange(3), y=np.arange(3))
+    copied = dc.copy()
+    assert isinstance(copied, OrderedPair)
+    assert copied.x is dc.x
+    copied.x = np.zeros(3)
+    assert dc.x[1] == 1
+
+    deep = dc.copy(deep=True)
+    assert deep.x is not dc.x
+    np.testing.assert_array_equal(deep.x, dc.x)
+
+
+def test_pickle_roundtrip():
+    dc = Image(r=np.ones((2, 2)), g=np.ones((2, 2)), b=np.ones((2, 2)))
+    loaded = pickle.loads(pickle.dumps(dc))
+    assert isinstance(loaded, Image)
+    assert loaded.keys() == dc.keys()
+    loaded.validate()
+
+
+def test_validate():
+    OrderedPair(x=np.arange(3), y=np.arange(3)).validate()
+    ParametricOrderedPair(x=np.arange(3), y=np.arange(3), t=np.arange(3)).validate()
+
+    with pytest.raises(ValueError, match="ascending"):
+        ParametricOrderedPair(
+            x=np.arange(3), y=np.arange(3), t=np.array([0, 2, 1])
+        ).validate()
+    with pytest.raises(KeyError, match='"y" key must be provided'):
+        DataContainer(type="OrderedPair", x=[1]).validate()
+    with pytest.raises(ValueError, match="can't have 'v' and 'x'"):
+        DataContainer(type="Vector", v=[1], x=[2]).validate()
+    with pytest.raises(ValueError, match='Did you mean: "Vector"'):
+        DataContainer(type="Vectr", v=[1]).validate()  # type: ignore
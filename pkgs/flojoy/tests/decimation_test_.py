@@ -0,0 +1,52 @@
+import numpy as np
+
+from flojoy.decimation import (
+    decimate_figure,
+    decimate_result,
+    lttb_indices,
+    minmax_indices,
+)
+from flojoy.data_container import OrderedPair
+from flojoy.plotly_utils import data_container_to_plotly
+
+
+def test_lttb_keeps_endpoints_and_budget():
+    x = np.linspace(0, 10, 100_000)
+    y = np.sin(x)
+    indices = lttb_indices(x, y, 1000)
+    assert len(indices) <= 1000
+    assert indices[0] == 0 and indices[-1] == len(x) - 1
+    assert np.all(np.diff(indices) > 0)
+    # the peaks of the sine survive
+    assert np.isclose(y[indices].max(), 1, atol=1e-3)
+
+
+def test_minmax_keeps_spikes():
+    y = np.zeros(100_000)
+    y[12_345] = 10
+    y[54_321] = -10
+    indices = minmax_indices(y, 100)
+    assert len(indices) <= 100
+    assert 12_345 in indices and 54_321 in indices
+
+
+def test_small_traces_are_not_decimated():
+    x = np.arange(10)
+    assert np.array_equal(lttb_indices(x, x, 100), x)
+    assert np.array_equal(minmax_indices(x, 100), x)
+
+
+def test_decimate_figure_only_touches_the_sent_figure():
+    dc = OrderedPair(x=np.arange(50_000.0), y=np.random.rand(50_000))
+    fig = data_container_to_plotly(dc)
+    result = {"plotly_fig": fig, "text_blob": None}
+
+    decimated = decimate_result(result, 500)
+    trace = decimated["plotly_fig"]["data"][0]
+    assert len(trace["x"]) == len(trace["y"]) <= 500
+    # the original figure and data container are left untouched
+    assert len(fig["data"][0]["y"]) == 50_000
+    assert len(dc.y) == 50_000
+
+    assert decimate_result(result, 0) is result
+    assert decimate_figure(fig, 500, "none") is fig
@@ -342,3 +342,19 @@ def test_run_in_venv_same_pip_deps_from_two_subprocesses_is_safe(
         p2.wait()
         # Check that the processes have finished successfully
         assert p1.returncode == 0 and p2.returncode == 0
+
+
+def test_run_in_venv_reuses_warm_worker(mock_venv_cache_dir, configure_logging):
+    from flojoy import run_in_venv
+    from flojoy.flojoy_node_venv import shutdown_venv_workers
+
+    @run_in_venv(pip_dependencies=[])
+    def get_pid():
+        import os
+
+        return os.getpid()
+
+    try:
+        assert get_pid() == get_pid() != os.getpid()
+    finally:
+        shutdown_venv_workers()
@@ -0,0 +1,59 @@
+import importlib.metadata
+
+import numpy as np
+
+from flojoy import package_index
+from flojoy.package_index import (
+    block_requirement,
+    get_installed_packages,
+    is_requirement_satisfied,
+    missing_requirements,
+    pinned_requirement,
+)
+
+
+def test_pinned_requirement():
+    assert pinned_requirement("torch", "2.0.1") == "torch==2.0.1"
+    assert pinned_requirement("numpy", ">=1.24, <2") == "numpy>=1.24, <2"
+    assert pinned_requirement("scipy") == "scipy"
+
+
+def test_bare_block_versions_are_not_checked():
+    # any installed numpy does, numpy==0.0.1 is only installed if it is missing
+    assert block_requirement("numpy", "0.0.1") == ("numpy", "numpy==0.0.1")
+    assert block_requirement("numpy", 1) == ("numpy", "numpy==1")
+    assert block_requirement("numpy", ">=1.24") == ("numpy>=1.24", "numpy>=1.24")
+    assert block_requirement("numpy") == ("numpy", "numpy")
+    checked, _ = block_requirement("numpy", "0.0.1")
+    assert missing_requirements([checked]) == []
+
+
+def test_requirements_are_matched_with_specifiers():
+    version = np.__version__
+    assert is_requirement_satisfied(f"numpy=={version}")
+    assert is_requirement_satisfied("NumPy>=1.0")
+    assert not is_requirement_satisfied("numpy<1.0")
+    assert not is_requirement_satisfied("not-a-real-package-flojoy")
+    assert is_requirement_satisfied('not-a-real-package-flojoy; python_version < "3"')
+    assert missing_requirements([f"numpy=={version}", "numpy==0.0.1"]) == [
+        "numpy==0.0.1"
+    ]
+
+
+def test_index_is_built_once(monkeypatch):
+    package_index.invalidate_installed_packages()
+    calls = []
+    distributions = importlib.metadata.distributions
+
+    def counting_distributions():
+        calls.append(1)
+        return distributions()
+
+    monkeypatch.setattr(importlib.metadata, "distributions", counting_distributions)
+    assert "numpy" in get_installed_packages()
+    get_installed_packages()
+    assert len(calls) == 1
+
+    package_index.invalidate_installed_packages()
+    get_installed_packages()
+    assert len(calls) == 2
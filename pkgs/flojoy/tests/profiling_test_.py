@@ -0,0 +1,47 @@
+import os
+import pstats
+import time
+
+import pytest
+
+from flojoy import profiling
+from flojoy.profiling import profile_block
+
+
+@pytest.fixture
+def profiles_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "FLOJOY_CACHE_DIR", str(tmp_path))
+    return tmp_path / "profiles" / "jobset"
+
+
+def busy_block(duration: float):
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        pass
+
+
+def test_sampling_profile_is_written_as_collapsed_stacks(profiles_dir):
+    with profile_block("jobset", "BUSY-1", "sampling"):
+        busy_block(0.1)
+
+    lines = (profiles_dir / "BUSY-1.collapsed").read_text().splitlines()
+    assert lines
+    stacks = [line.rsplit(" ", 1) for line in lines]
+    assert all(count.isdigit() for _, count in stacks)
+    # the stacks start at the block, not at the caller of the profiler
+    assert all(stack.startswith("busy_block ") for stack, _ in stacks)
+
+
+def test_cprofile_profiles_of_a_loop_are_merged(profiles_dir):
+    for _ in range(2):
+        with profile_block("jobset", "BUSY-1", "cprofile"):
+            busy_block(0.01)
+
+    path = os.path.join(profiles_dir, "BUSY-1.prof")
+    stats = pstats.Stats(path).stats  # type: ignore
+    calls = [
+        primitive_calls
+        for (_, _, name), (primitive_calls, *_) in stats.items()
+        if name == "busy_block"
+    ]
+    assert calls == [2]
@@ -0,0 +1,87 @@
+import numpy as np
+
+from flojoy.dao import Dao
+from flojoy.data_container import OrderedPair, Scalar
+from flojoy.shared_memory import (
+    SHARED_ARRAY_MIN_BYTES,
+    Segment,
+    SharedResultStore,
+    dumps,
+    loads,
+)
+
+SIZE = SHARED_ARRAY_MIN_BYTES // 8
+
+
+def test_large_arrays_are_moved_to_shared_memory():
+    store = SharedResultStore()
+    x = np.arange(SIZE, dtype=np.float64)
+    result = OrderedPair(x=x, y=np.arange(10))
+    store.share("A", result)
+
+    assert Segment.of(result.x) is not None
+    assert Segment.of(result.y) is None
+    np.testing.assert_array_equal(result.x, x)
+    assert store.stats()["segments"] == 1
+    assert store.stats()["bytes_in_use"] >= x.nbytes
+
+    store.evict("A")
+    assert store.stats()["segments"] == 0
+    # the array stays valid after the segment has been unlinked
+    np.testing.assert_array_equal(result.x, x)
+
+
+def test_segments_are_shared_between_jobs():
+    store = SharedResultStore()
+    a = OrderedPair(x=np.zeros(SIZE), y=np.ones(SIZE))
+    store.share("A", a)
+    # a block passing its input through
+    b = OrderedPair(x=a.x, y=a.y * 2)
+    store.share("B", b)
+    assert store.stats()["segments"] == 3
+    assert store.stats()["reused_arrays"] == 1
+    assert b.x.ctypes.data == a.x.ctypes.data
+
+    store.evict("A")
+    assert store.stats()["segments"] == 2
+    store.evict("B")
+    assert store.stats()["segments"] == 0
+    assert store.stats()["peak_bytes"] >= 3 * SIZE * 8
+
+
+def test_pickled_handles_do_not_copy_shared_arrays():
+    store = SharedResultStore()
+    result = store.share("A", OrderedPair(x=np.arange(SIZE), y=np.arange(SIZE)))
+    payload = dumps(result)
+    assert len(payload) < SHARED_ARRAY_MIN_BYTES
+    loaded = loads(payload)
+    np.testing.assert_array_equal(loaded.y, result.y)
+    store.clear()
+
+
+def test_dao_releases_results_after_last_consumer():
+    dao = Dao.get_instance()
+    dao.enable_shared_results()
+    try:
+        dao.set_job_consumers("A", 2)
+        dao.post_job_result("A", OrderedPair(x=np.arange(SIZE), y=np.arange(SIZE)))
+        dao.post_job_result("B", Scalar(c=1))
+        assert dao.get_memory_stats()["shared_memory"]["segments"] == 2
+
+        assert not dao.release_job_result("A")
+        assert dao.job_exists("A")
+        assert dao.release_job_result("A")
+        assert not dao.job_exists("A")
+        assert dao.get_memory_stats()["shared_memory"]["segments"] == 0
+
+        # posting the result again (next loop iteration) re-arms the count
+        dao.post_job_result("A", Scalar(c=2))
+        assert not dao.release_job_result("A")
+        assert dao.release_job_result("A")
+
+        # results without consumer count are kept until the end of the run
+        assert not dao.release_job_result("B")
+        assert dao.job_exists("B")
+    finally:
+        dao.clear_job_results()
+        dao.enable_shared_results(False)
@@ -0,0 +1,103 @@
+import json
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from flojoy import OrderedPair, Stream, StreamBuffer, String, data_container_to_plotly
+from flojoy.utils import PlotlyJSONEncoder
+
+
+def test_append_is_amortized():
+    buffer = StreamBuffer()
+    for i in range(10_000):
+        buffer.append(x=i, y=[2.0 * i])
+    assert len(buffer) == 10_000
+    # the capacity doubles, so only a few copies for 10k appends
+    assert buffer.resizes <= 4
+    np.testing.assert_array_equal(buffer["x"], np.arange(10_000))
+    np.testing.assert_array_equal(buffer["y"], 2.0 * np.arange(10_000))
+
+    view = buffer.column("y", 10, 20)
+    assert np.shares_memory(view, buffer["y"])
+    np.testing.assert_array_equal(view, 2.0 * np.arange(10, 20))
+
+
+def test_maxlen_keeps_the_last_samples():
+    buffer = StreamBuffer(maxlen=100)
+    for i in range(0, 10_000, 7):
+        buffer.append(x=np.arange(i, i + 7))
+    assert len(buffer) == 100
+    assert buffer.capacity <= 200
+    np.testing.assert_array_equal(buffer["x"], np.arange(10_003 - 100, 10_003))
+
+    buffer.append(x=np.arange(500))
+    np.testing.assert_array_equal(buffer["x"], np.arange(400, 500))
+
+
+def test_spill_to_memory_mapped_files(tmp_path):
+    buffer = StreamBuffer(spill_bytes=64 * 1024, spill_dir=str(tmp_path))
+    for i in range(20):
+        buffer.append(x=np.arange(i * 1000, (i + 1) * 1000, dtype=np.float64))
+    assert buffer.spilled
+    assert isinstance(buffer["x"], np.memmap)
+    np.testing.assert_array_equal(buffer["x"], np.arange(20_000))
+    # the files of the previous capacities are removed once unmapped
+    (spill_dir,) = os.listdir(tmp_path)
+    assert len(os.listdir(tmp_path / spill_dir)) == 1
+    view = buffer["x"]
+    buffer.append(x=np.arange(20_000, 50_000, dtype=np.float64))
+    assert len(os.listdir(tmp_path / spill_dir)) == 2
+    np.testing.assert_array_equal(view, np.arange(20_000))
+    del view
+    assert len(os.listdir(tmp_path / spill_dir)) == 1
+
+    loaded = pickle.loads(pickle.dumps(buffer))
+    assert not loaded.spilled
+    assert type(loaded["x"]) is np.ndarray
+    np.testing.assert_array_equal(loaded["x"], np.arange(50_000))
+    # it spills again when it grows
+    loaded.append(x=np.arange(50_000, 150_000, dtype=np.float64))
+    assert loaded.spilled
+    assert isinstance(loaded["x"], np.memmap)
+
+
+def test_chunks_must_match():
+    buffer = StreamBuffer()
+    with pytest.raises(ValueError, match="same length"):
+        buffer.append(x=[1, 2], y=[1])
+    buffer.append(x=[1, 2], y=[3, 4])
+    with pytest.raises(ValueError, match="columns"):
+        buffer.append(x=[1])
+    with pytest.raises(ValueError):
+        StreamBuffer(maxlen=0)
+
+
+def test_stream_data_container():
+    dc = Stream()
+    dc.validate()
+    dc.append_container(OrderedPair(x=[0, 1], y=[1, 2]))
+    dc.append_container(OrderedPair(x=[2], y=[3]))
+    with pytest.raises(ValueError, match="Cannot append"):
+        dc.append_container(String(s="a"))
+
+    loaded = pickle.loads(pickle.dumps(dc))
+    assert isinstance(loaded, Stream)
+    np.testing.assert_array_equal(loaded.stream["y"], [1, 2, 3])
+
+    assert json.loads(json.dumps(dc, cls=PlotlyJSONEncoder))["stream"] == {
+        "x": [0, 1, 2],
+        "y": [1, 2, 3],
+    }
+    fig = data_container_to_plotly(dc)
+    assert fig is not None
+    assert list(fig["data"][0]["y"]) == [1, 2, 3]
+
+
+def test_dtype_is_promoted():
+    buffer = StreamBuffer()
+    buffer.append(x=np.arange(3))
+    buffer.append(x=[0.5])
+    assert buffer["x"].dtype == np.float64
+    np.testing.assert_array_equal(buffer["x"], [0, 1, 2, 0.5])
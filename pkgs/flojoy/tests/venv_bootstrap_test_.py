@@ -0,0 +1,65 @@
+import json
+import logging
+import os
+import subprocess
+import venv
+from unittest.mock import patch
+
+from flojoy import flojoy_node_venv
+from flojoy.flojoy_node_venv import _bootstrap_venv, _get_venv_executable_path
+
+logger = logging.getLogger("venv_bootstrap_test")
+
+
+def make_complete_venv(venv_path: str, packages: dict[str, str]):
+    venv.create(venv_path, with_pip=False)
+    with open(os.path.join(venv_path, ".venv_packages.json"), "w") as f:
+        json.dump(packages, f)
+    with open(os.path.join(venv_path, ".venv_is_complete"), "w") as f:
+        f.write("")
+
+
+def no_pip():
+    def fail(*args, **kwargs):
+        raise AssertionError("pip should not run")
+
+    return patch.object(flojoy_node_venv.subprocess, "Popen", fail)
+
+
+def test_superset_venv_is_cloned(tmp_path):
+    source = str(tmp_path / "source")
+    make_complete_venv(
+        source, {"flojoy": "0.1", "cloudpickle": "2.2.1", "numpy": "1.26.4"}
+    )
+
+    target = str(tmp_path / "target")
+    with no_pip():
+        _bootstrap_venv(target, ["cloudpickle==2.2.1", "flojoy", "numpy>=1.26"], logger)
+
+    assert os.path.exists(os.path.join(target, ".venv_is_complete"))
+    executable = _get_venv_executable_path(target)
+    prefix = subprocess.run(
+        [executable, "-c", "import sys; print(sys.prefix)"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+    assert os.path.realpath(prefix) == os.path.realpath(target)
+
+
+def test_complete_venv_is_not_reinstalled(tmp_path):
+    venv_path = str(tmp_path / "complete")
+    make_complete_venv(venv_path, {"flojoy": "0.1", "cloudpickle": "2.2.1"})
+    with no_pip():
+        _bootstrap_venv(venv_path, ["cloudpickle==2.2.1", "flojoy"], logger)
+
+
+def test_venv_missing_pins_is_not_cloned(tmp_path):
+    make_complete_venv(str(tmp_path / "source"), {"numpy": "1.25.0"})
+    assert (
+        flojoy_node_venv._find_superset_venv(str(tmp_path / "target"), ["numpy==1.26"])
+        is None
+    )
+    assert flojoy_node_venv._find_superset_venv(
+        str(tmp_path / "target"), ["numpy<1.26"]
+    ) == str(tmp_path / "source")
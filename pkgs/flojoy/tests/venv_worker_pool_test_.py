@@ -0,0 +1,62 @@
+import io
+import logging
+import os
+import sys
+
+import numpy as np
+import pytest
+
+from flojoy import shared_memory
+from flojoy.flojoy_node_venv import _VenvWorkerPool, shutdown_venv_workers
+
+
+def pid_and_sum(x: np.ndarray):
+    import os
+
+    print(f"summing {len(x)} values")
+    return os.getpid(), float(x.sum())
+
+
+def failing(x: int):
+    return 1 / x
+
+
+@pytest.fixture
+def logger():
+    logger = logging.getLogger("venv_worker_pool_test")
+    logger.setLevel(logging.INFO)
+    buffer = io.StringIO()
+    handler = logging.StreamHandler(buffer)
+    logger.addHandler(handler)
+    yield logger, buffer
+    logger.removeHandler(handler)
+
+
+def test_workers_are_reused_until_shutdown(logger):
+    logger, buffer = logger
+    pool = _VenvWorkerPool(pid_and_sum, logger)
+    x = np.ones(100_000)
+    try:
+        first_pid, total = shared_memory.loads(pool.call(sys.executable, {"x": x}))
+        second_pid, _ = shared_memory.loads(pool.call(sys.executable, {"x": x}))
+        assert total == 100_000
+        assert first_pid == second_pid != os.getpid()
+        worker = pool.idle[0]
+    finally:
+        shutdown_venv_workers()
+    assert not pool.idle
+    assert not worker.process.is_alive()
+    assert "summing 100000 values" in buffer.getvalue()
+
+
+def test_worker_survives_exceptions(logger):
+    logger, _ = logger
+    pool = _VenvWorkerPool(failing, logger)
+    try:
+        exception, tcb = shared_memory.loads(pool.call(sys.executable, {"x": 0}))
+        assert isinstance(exception, ChildProcessError)
+        assert "ZeroDivisionError" in "".join(tcb)
+        assert shared_memory.loads(pool.call(sys.executable, {"x": 2})) == 0.5
+        assert len(pool.idle) == 1
+    finally:
+        pool.shutdown()
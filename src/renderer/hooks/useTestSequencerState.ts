@@ -381,10 +381,10 @@ export function useSequencerState() {
         );
       };
       toast.promise(upload, {
-        loading: "Uploading result...",
+        loading: "Queuing result for upload...",
         success: () => {
           setIsUploaded(true);
-          return "Uploaded result to cloud";
+          return "Result queued for upload to cloud";
         },
         error: (err) => {
           return `Failed to upload result: ${err}`;
@@ -11,9 +11,15 @@ import { BlockData } from "@/renderer/types/block";
 import { Edge, Node } from "reactflow";
 import { BackendSettings } from "@/renderer/stores/settings";
 import _ from "lodash";
-import { ResultAsync, fromPromise } from "neverthrow";
+import { Result, ResultAsync, err, fromPromise, ok } from "neverthrow";
 import { Options } from "ky";
-import { DeviceInfo } from "@/renderer/types/hardware";
+import {
+  Device,
+  DeviceDiscoveryMessage,
+  DeviceInfo,
+  DeviceKind,
+} from "@/renderer/types/hardware";
+import { env } from "@/env";
 import {
   TestDiscoverContainer,
   TestSequenceContainer,
@@ -123,6 +129,63 @@ export async function getDeviceInfo(
   });
 }
 
+/**
+ * Same discovery as `getDeviceInfo`, but `onDevice` is called with each
+ * device as soon as captain finds it.
+ */
+export function streamDeviceInfo(
+  discoverNIDAQmxDevices: boolean,
+  discoverNIDMMDevices: boolean,
+  onDevice: (kind: DeviceKind, device: Device) => void,
+): Promise<Result<DeviceInfo, Error | ZodError>> {
+  const searchParams = new URLSearchParams({
+    include_nidaqmx_drivers: String(discoverNIDAQmxDevices),
+    include_nidmm_drivers: String(discoverNIDMMDevices),
+  });
+  return new Promise((resolve) => {
+    const ws = new WebSocket(
+      `ws://${env.VITE_BACKEND_HOST}:${env.VITE_BACKEND_PORT}/devices/ws?${searchParams}`,
+    );
+    let settled = false;
+    const settle = (result: Result<DeviceInfo, Error | ZodError>) => {
+      if (settled) return;
+      settled = true;
+      resolve(result);
+      ws.close();
+    };
+
+    ws.onmessage = (event) => {
+      const parsed = tryParse(DeviceDiscoveryMessage)(JSON.parse(event.data));
+      if (parsed.isErr()) {
+        settle(err(parsed.error));
+        return;
+      }
+      const message = parsed.value;
+      switch (message.type) {
+        case "device": {
+          const schema = DeviceInfo.shape[message.kind].element;
+          const device = (schema as z.ZodTypeAny).safeParse(message.device);
+          // the final list is validated as well, skip the invalid ones
+          if (device.success) {
+            onDevice(message.kind, device.data);
+          }
+          break;
+        }
+        case "done":
+          settle(ok(message.devices));
+          break;
+        case "error":
+          settle(err(new Error(message.error)));
+          break;
+      }
+    };
+    ws.onerror = () =>
+      settle(err(new Error("Could not connect to the device discovery")));
+    ws.onclose = () =>
+      settle(err(new Error("The device discovery was interrupted")));
+  });
+}
+
 const LogLevel = z.object({
   level: z.string(),
 });
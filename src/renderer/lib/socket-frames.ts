@@ -0,0 +1,102 @@
+// Decoder for the binary WebSocket frames sent by captain,
+// see captain/internal/ws_protocol.py for the layout of a frame.
+
+const NDARRAY_KEY = "__ndarray__";
+const BUFFERS_KEY = "__buffers__";
+const ALIGNMENT = 8;
+
+type TypedArray =
+  | Int8Array
+  | Int16Array
+  | Int32Array
+  | Uint8Array
+  | Uint16Array
+  | Uint32Array
+  | Float32Array
+  | Float64Array;
+
+const typedArrays = {
+  int8: Int8Array,
+  int16: Int16Array,
+  int32: Int32Array,
+  uint8: Uint8Array,
+  uint16: Uint16Array,
+  uint32: Uint32Array,
+  float32: Float32Array,
+  float64: Float64Array,
+  bool: Uint8Array,
+} as const;
+
+type ArrayPlaceholder = {
+  [NDARRAY_KEY]: number;
+  dtype: keyof typeof typedArrays;
+  shape: number[];
+};
+
+const align = (offset: number) => Math.ceil(offset / ALIGNMENT) * ALIGNMENT;
+
+const isPlaceholder = (value: object): value is ArrayPlaceholder =>
+  NDARRAY_KEY in value;
+
+// plotly accepts typed arrays, everything else gets plain arrays
+const toArray = (
+  flat: TypedArray,
+  placeholder: ArrayPlaceholder,
+  typed: boolean,
+): unknown => {
+  const { dtype, shape } = placeholder;
+  const convert = (values: TypedArray) =>
+    dtype === "bool"
+      ? Array.from(values, (v) => v !== 0)
+      : typed
+        ? values
+        : Array.from(values);
+
+  const build = (offset: number, dim: number): unknown => {
+    const stride = shape.slice(dim + 1).reduce((a, b) => a * b, 1);
+    if (dim === shape.length - 1) {
+      return convert(flat.subarray(offset, offset + shape[dim]));
+    }
+    return Array.from({ length: shape[dim] }, (_, i) =>
+      build(offset + i * stride, dim + 1),
+    );
+  };
+  return shape.length <= 1 ? convert(flat) : build(0, 0);
+};
+
+export const decodeBinaryFrame = (frame: ArrayBuffer): unknown => {
+  const view = new DataView(frame);
+  const headerLength = view.getUint32(0, true);
+  const header = JSON.parse(
+    new TextDecoder().decode(new Uint8Array(frame, 4, headerLength)),
+  );
+  const dataStart = align(4 + headerLength);
+  const offsets: number[] = header[BUFFERS_KEY] ?? [];
+  delete header[BUFFERS_KEY];
+
+  const revive = (value: unknown, typed: boolean): unknown => {
+    if (Array.isArray(value)) {
+      return value.map((v) => revive(v, typed));
+    }
+    if (value === null || typeof value !== "object") {
+      return value;
+    }
+    if (isPlaceholder(value)) {
+      const length = value.shape.reduce((a, b) => a * b, 1);
+      const flat = new typedArrays[value.dtype](
+        frame,
+        dataStart + offsets[value[NDARRAY_KEY]],
+        length,
+      );
+      return toArray(flat, value, typed);
+    }
+    return Object.fromEntries(
+      Object.entries(value).map(([k, v]) => [
+        k,
+        revive(v, typed || k === "plotly_fig"),
+      ]),
+    );
+  };
+
+  return revive(header, false);
+};
@@ -18,6 +18,7 @@ import { ExportResultButton } from "./ControlBar/ExportResultButton";
 import { DebugSettingsModal } from "./DebugSettingsModal";
 import DepManagerModal from "./DepManagerModal";
 import { DeviceSettingsModal } from "./DeviceSettingsModal";
+import { SequencerSettingsModal } from "./SequencerSettingsModal";
 import ProfileMenu from "./user-profile/ProfileMenu";
 import { useAppStore } from "@/renderer/stores/app";
 import { useShallow } from "zustand/react/shallow";
@@ -37,6 +38,8 @@ const ControlBar = () => {
   const [isBlockSettingsOpen, setIsBlockSettingsOpen] = useState(false);
   const [isEditorSettingsOpen, setIsEditorSettingsOpen] = useState(false);
   const [isDeviceSettingsOpen, setIsDeviceSettingsOpen] = useState(false);
+  const [isSequencerSettingsOpen, setIsSequencerSettingsOpen] =
+    useState(false);
   const [isDebugSettingsOpen, setIsDebugSettingsOpen] = useState(false);
 
   const [isFeedbackModalOpen, setIsFeedbackModalOpen] = useState(false);
@@ -71,6 +74,10 @@ const ControlBar = () => {
         isDeviceSettingsOpen={isDeviceSettingsOpen}
         setIsDeviceSettingsOpen={setIsDeviceSettingsOpen}
       />
+      <SequencerSettingsModal
+        isSequencerSettingsOpen={isSequencerSettingsOpen}
+        setIsSequencerSettingsOpen={setIsSequencerSettingsOpen}
+      />
       <DebugSettingsModal
         isDebugSettingsOpen={isDebugSettingsOpen}
         setIsDebugSettingsOpen={setIsDebugSettingsOpen}
@@ -147,6 +154,14 @@ const ControlBar = () => {
                   </MenubarItem>
                 </>
               )}
+              {activeTab === "Test Sequencer" && (
+                <MenubarItem
+                  data-testid="btn-sequencer-settings"
+                  onClick={() => setIsSequencerSettingsOpen(true)}
+                >
+                  Sequencer Settings
+                </MenubarItem>
+              )}
               <MenubarItem
                 data-testid="btn-debug-settings"
                 onClick={() => setIsDebugSettingsOpen(true)}
@@ -0,0 +1,28 @@
+import { SettingsModal } from "./SettingsModal";
+import { useSettingsStore } from "@/renderer/stores/settings";
+
+type Props = {
+  isSequencerSettingsOpen: boolean;
+  setIsSequencerSettingsOpen: (val: boolean) => void;
+};
+
+export const SequencerSettingsModal = ({
+  isSequencerSettingsOpen,
+  setIsSequencerSettingsOpen,
+}: Props) => {
+  const { settings, updateSettings } = useSettingsStore((state) => ({
+    settings: state.sequencer,
+    updateSettings: state.updateSequencerSettings,
+  }));
+
+  return (
+    <SettingsModal
+      isSettingsModalOpen={isSequencerSettingsOpen}
+      handleSettingsModalOpen={setIsSequencerSettingsOpen}
+      settings={settings}
+      updateSettings={updateSettings}
+      title="Sequencer Settings"
+      description="Applies when running a test sequence."
+    />
+  );
+};
@@ -72,6 +72,17 @@ export const SettingsModal = <
                   }
                 />
               )}
+              {setting.type === "string" && (
+                <Input
+                  name={settingName}
+                  className="mt-2 rounded-sm"
+                  data-testid="settings-input"
+                  value={setting.value}
+                  onChange={(e) =>
+                    updateSettings(key, e.target.value as SettingsState[K][S])
+                  }
+                />
+              )}
               {setting.type === "boolean" && (
                 <Switch
                   name={settingName}
@@ -1,4 +1,5 @@
 import { TestRootNode } from "@/renderer/types/test-sequencer";
+import { useSettingsStore } from "@/renderer/stores/settings";
 
 export type TestSequenceEvents =
   | "run"
@@ -12,12 +13,28 @@ export type TestSequenceRun = {
   data: TestRootNode;
 };
 
+// the sequencer settings apply to every sequence that is run
+const withSequencerSettings = (tree: TestRootNode): TestRootNode => {
+  const { useInterpreterPool, preloadModules, testTimeout } =
+    useSettingsStore.getState().sequencer;
+  const modules = preloadModules.value
+    .split(",")
+    .map((module) => module.trim())
+    .filter((module) => module !== "");
+  return {
+    ...tree,
+    useInterpreterPool: useInterpreterPool.value,
+    preloadModules: modules.length > 0 ? modules : undefined,
+    testTimeout: testTimeout.value > 0 ? testTimeout.value : undefined,
+  };
+};
+
 export const testSequenceRunRequest: (tree: TestRootNode) => TestSequenceRun = (
   tree: TestRootNode,
 ) => {
   return {
     event: "run",
-    data: tree,
+    data: withSequencerSettings(tree),
   };
 };
 
@@ -10,6 +10,7 @@ import { ServerStatus, WorkerJobResponse } from "@/renderer/types/socket";
 import { useSocketStore } from "@/renderer/stores/socket";
 import { useHardwareStore } from "@/renderer/stores/hardware";
 import { toastQueryError } from "@/renderer/utils/report-error";
+import { decodeBinaryFrame } from "@/renderer/lib/socket-frames";
 
 export const SocketReceiver = () => {
   const [socket, setSocket] = useState<WebSocket>();
@@ -60,11 +61,17 @@ export const SocketReceiver = () => {
 
   useEffect(() => {
     if (socket !== undefined) return;
+    // binary frames carry the plot arrays without JSON encoding them
     const ws = new WebSocket(
-      `ws://${env.VITE_BACKEND_HOST}:${env.VITE_BACKEND_PORT}/ws/${UUID()}`,
+      `ws://${env.VITE_BACKEND_HOST}:${env.VITE_BACKEND_PORT}/ws/${UUID()}?protocol=binary`,
     );
+    ws.binaryType = "arraybuffer";
     ws.onmessage = (ev) => {
-      const data = JSON.parse(ev.data) as WorkerJobResponse;
+      const data = (
+        ev.data instanceof ArrayBuffer
+          ? decodeBinaryFrame(ev.data)
+          : JSON.parse(ev.data)
+      ) as WorkerJobResponse;
       switch (data.type) {
         case "worker_response": {
           processWorkerResponse(data);
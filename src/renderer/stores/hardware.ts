@@ -1,9 +1,9 @@
 import { create } from "zustand";
 import { immer } from "zustand/middleware/immer";
 import { DeviceInfo } from "@/renderer/types/hardware";
-import { getDeviceInfo } from "@/renderer/lib/api";
+import { getDeviceInfo, streamDeviceInfo } from "@/renderer/lib/api";
 import { ZodError } from "zod";
-import { Result } from "neverthrow";
+import { Result, err, ok } from "neverthrow";
 import { HTTPError } from "ky";
 
 type State = {
@@ -25,6 +25,32 @@ export const useHardwareStore = create<State & Actions>()(
       discoverNIDMMDevices = false,
     ) => {
       set({ devices: undefined });
+      // the devices are shown as soon as they are found
+      const streamed = await streamDeviceInfo(
+        discoverNIDAQmxDevices,
+        discoverNIDMMDevices,
+        (kind, device) =>
+          set((state) => {
+            state.devices ??= {
+              cameras: [],
+              serialDevices: [],
+              visaDevices: [],
+              nidaqmxDevices: [],
+              nidmmDevices: [],
+            };
+            (state.devices[kind] as unknown[]).push(device);
+          }),
+      );
+      if (streamed.isOk()) {
+        set({ devices: streamed.value });
+        return ok(undefined);
+      }
+      if (streamed.error instanceof ZodError) {
+        return err(streamed.error);
+      }
+
+      // the discovery failed or the websocket is not available, the error
+      // is reported by the request
       const res = await getDeviceInfo(
         discoverNIDAQmxDevices,
         discoverNIDMMDevices,
@@ -17,7 +17,12 @@ type NumberSetting = SettingBase & {
   value: number;
 };
 
-export type Setting = BooleanSetting | NumberSetting;
+type StringSetting = SettingBase & {
+  type: "string";
+  value: string;
+};
+
+export type Setting = BooleanSetting | NumberSetting | StringSetting;
 
 const backendSettings = {
   nodeDelay: {
@@ -38,6 +43,24 @@ const backendSettings = {
     desc: "Maximum number of nodes that can be executed at the same time",
     value: 1,
   },
+  useProcessPool: {
+    type: "boolean",
+    title: "Process Pool for CPU-bound Blocks",
+    desc: "Run blocks marked as CPU-bound in separate processes so they can execute in parallel",
+    value: false,
+  },
+  maxPlotPoints: {
+    type: "number",
+    title: "Maximum Plot Points",
+    desc: "Maximum number of points per plot trace sent to the UI, traces are downsampled beyond this (0 to disable)",
+    value: 10000,
+  },
+  fastLoops: {
+    type: "boolean",
+    title: "Fast Loops",
+    desc: "Run the body of loops without hardware or flow control blocks in a tight loop, the UI is only updated every so often",
+    value: false,
+  },
 } satisfies Record<string, Setting>;
 
 const frontendSettings = {
@@ -70,14 +93,37 @@ const deviceSettings = {
   },
 } satisfies Record<string, Setting>;
 
+const sequencerSettings = {
+  useInterpreterPool: {
+    type: "boolean",
+    title: "Warm Interpreters",
+    desc: "Run the Python and pytest tests in interpreters kept alive between tests, the preloaded modules are imported once. The tests run with the Python interpreter of Studio instead of the one found on the PATH",
+    value: false,
+  },
+  preloadModules: {
+    type: "string",
+    title: "Preloaded Modules",
+    desc: "Comma-separated modules imported by the warm interpreters beforehand (empty for numpy, pytest and flojoy_cloud)",
+    value: "",
+  },
+  testTimeout: {
+    type: "number",
+    title: "Test Timeout",
+    desc: "Time before a test is stopped and marked as failed in seconds (0 to disable)",
+    value: 0,
+  },
+} satisfies Record<string, Setting>;
+
 export type BackendSettings = typeof backendSettings;
 export type FrontendSettings = typeof frontendSettings;
 export type DeviceSettings = typeof deviceSettings;
+export type SequencerSettings = typeof sequencerSettings;
 
 export type SettingsState = {
   frontend: FrontendSettings;
   backend: BackendSettings;
   device: DeviceSettings;
+  sequencer: SequencerSettings;
 };
 
 export type SettingsActions = {
@@ -93,6 +139,10 @@ export type SettingsActions = {
     key: K,
     value: DeviceSettings[K]["value"],
   ) => void;
+  updateSequencerSettings: <K extends keyof SequencerSettings>(
+    key: K,
+    value: SequencerSettings[K]["value"],
+  ) => void;
 };
 
 export const useSettingsStore = create<SettingsState & SettingsActions>()(
@@ -102,6 +152,7 @@ export const useSettingsStore = create<SettingsState & SettingsActions>()(
         frontend: frontendSettings,
         backend: backendSettings,
         device: deviceSettings,
+        sequencer: sequencerSettings,
 
         updateFrontendSettings: <K extends keyof FrontendSettings>(
           key: K,
@@ -127,6 +178,14 @@ export const useSettingsStore = create<SettingsState & SettingsActions>()(
             state.device[key].value = value;
           });
         },
+        updateSequencerSettings: <K extends keyof SequencerSettings>(
+          key: K,
+          value: SequencerSettings[K]["value"],
+        ) => {
+          set((state) => {
+            state.sequencer[key].value = value;
+          });
+        },
       }),
       {
         name: "flojoy-settings",
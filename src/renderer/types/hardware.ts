@@ -49,3 +49,18 @@ export const DeviceInfo = z.object({
 });
 
 export type DeviceInfo = z.infer<typeof DeviceInfo>;
+
+export type DeviceKind = keyof DeviceInfo;
+
+export type Device = DeviceInfo[DeviceKind][number];
+
+// messages of the `/devices/ws` discovery, the devices are sent as found
+export const DeviceDiscoveryMessage = z.discriminatedUnion("type", [
+  z.object({
+    type: z.literal("device"),
+    kind: DeviceInfo.keyof(),
+    device: z.unknown(),
+  }),
+  z.object({ type: z.literal("done"), devices: DeviceInfo }),
+  z.object({ type: z.literal("error"), error: z.string() }),
+]);
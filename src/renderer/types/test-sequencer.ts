@@ -126,6 +126,10 @@ export type TestRootNode = {
   type: "root";
   children: TestSequenceElementNode[];
   identifiers: string[];
+  maxParallel?: number;
+  useInterpreterPool?: boolean;
+  preloadModules?: string[];
+  testTimeout?: number;
 };
 
 export type TestSequenceElementNode = ConditionalNode | TestNode | TestRootNode;